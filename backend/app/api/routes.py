@@ -4,20 +4,52 @@ API routes for the financial analysis application.
 This defines the endpoints that the frontend will call.
 """
 
+import json
 from fastapi import APIRouter, HTTPException
-from app.models.schemas import AnalysisResponse
-from app.services.ratio_fetcher import fetch_analysis
+from fastapi.responses import StreamingResponse
+from app.models.schemas import AnalysisResponse, BatchAnalysisRequest, BatchAnalysisResponse
+from app.services.ratio_fetcher import fetch_analysis_async, fetch_batch_async, stream_analysis_async
 
 router = APIRouter()
 
+# Maximum number of tickers accepted by one batch request
+MAX_BATCH_SIZE = 500
+
+
+@router.post("/analyze/batch", response_model=BatchAnalysisResponse)
+async def analyze_batch(request: BatchAnalysisRequest):
+    """
+    Analyze several tickers in one call (for screening jobs).
+    
+    All scraper calls of the batch share the same executor and per-source
+    limits, so this is much faster than calling /analyze/{ticker} in a loop.
+    A ticker that fails is reported in "errors" without failing the batch.
+    
+    Args:
+        request: List of ticker symbols
+    
+    Returns:
+        BatchAnalysisResponse with an AnalysisResponse per ticker
+    """
+    if not request.tickers:
+        raise HTTPException(status_code=400, detail="No tickers given")
+    if len(request.tickers) > MAX_BATCH_SIZE:
+        raise HTTPException(status_code=400, detail=f"Too many tickers (max {MAX_BATCH_SIZE})")
+    
+    invalid = [t for t in request.tickers if not t.strip() or len(t.strip()) > 10]
+    if invalid:
+        raise HTTPException(status_code=400, detail=f"Invalid ticker symbols: {', '.join(invalid)}")
+    
+    return await fetch_batch_async(request.tickers)
+
 
 @router.get("/analyze/{ticker}", response_model=AnalysisResponse)
 async def analyze_ticker(ticker: str):
     """
     Analyze a stock ticker and return financial ratios from multiple sources.
     
-    This now uses real scrapers (Finviz for Gross Margin and P/E Ratio).
-    Other sources will be added incrementally.
+    Scrapers run on a bounded thread pool and are awaited here, so this
+    route doesn't block the event loop while a ticker is being scraped.
     
     Args:
         ticker: Stock ticker symbol (e.g., PLTR, NVDA, AAPL)
@@ -29,12 +61,52 @@ async def analyze_ticker(ticker: str):
         raise HTTPException(status_code=400, detail="Invalid ticker symbol")
     
     try:
-        analysis = fetch_analysis(ticker)
+        analysis = await fetch_analysis_async(ticker)
         return analysis
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error analyzing ticker: {str(e)}")
 
 
+def _sse_event(event: str, data) -> str:
+    """Format one Server-Sent Event."""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+@router.get("/analyze/{ticker}/stream")
+async def analyze_ticker_stream(ticker: str):
+    """
+    Analyze a stock ticker, streaming results as Server-Sent Events.
+    
+    Same analysis as /analyze/{ticker}, but each source value is sent as soon
+    as its scraper finishes, so the page can fill in fast sources right away.
+    
+    Events: "start" (table layout), "source" (one source value), "ratio"
+    (a completed RatioResult), "done" (full AnalysisResponse with the score),
+    or "analysis_error" if the analysis failed ("error" is reserved by EventSource).
+    
+    Args:
+        ticker: Stock ticker symbol (e.g., PLTR, NVDA, AAPL)
+    """
+    if not ticker or len(ticker) > 10:
+        raise HTTPException(status_code=400, detail="Invalid ticker symbol")
+    
+    async def events():
+        try:
+            async for event, data in stream_analysis_async(ticker):
+                yield _sse_event(event, data)
+        except Exception as e:
+            yield _sse_event("analysis_error", {"detail": f"Error analyzing ticker: {str(e)}"})
+    
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "X-Accel-Buffering": "no",  # Don't let a proxy buffer the stream
+        }
+    )
+
+
 @router.get("/health")
 async def health_check():
     """Health check endpoint to verify the API is running."""
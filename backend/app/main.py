@@ -4,14 +4,91 @@ FastAPI application entry point.
 This starts the web server that the frontend will connect to.
 """
 
+import asyncio
+import os
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from app.api import routes
+from app.scrapers.async_http import async_http_client
+from app.scrapers.browser_pool import browser_pool
+from app.scrapers.registry import scraper_registry
+from app.services.cache import page_cache, scraper_cache, yahoo_cache
+from app.services.cache_warmer import cache_warmer, load_watchlist
+from app.services.executor import scraper_executor
+from app.services.persistent_cache import SQLiteCacheTier
+from app.services.symbol_metadata import symbol_index
+
+# Number of Chrome browsers started at startup (the pool grows on demand up to its max size)
+BROWSER_POOL_WARM = 1
+
+# SQLite file holding the persistent scraper cache (shared by all workers, survives restarts)
+CACHE_DB_PATH = os.environ.get(
+    "GROSS_CACHE_DB",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), ".cache", "scraper_cache.sqlite3")
+)
+
+# JSON file holding the symbol metadata index (exchanges, Macrotrends slugs learned so far)
+SYMBOL_INDEX_PATH = os.environ.get(
+    "GROSS_SYMBOL_INDEX",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), ".cache", "symbols.json")
+)
+
+# Optional JSON/CSV file of symbols to bulk-load at startup (e.g., an exchange listing)
+SYMBOL_FILE = os.environ.get("GROSS_SYMBOL_FILE")
+
+# Tickers kept warm in the cache (comma-separated, and/or a file with one ticker per line)
+WATCHLIST = os.environ.get("GROSS_WATCHLIST")
+WATCHLIST_FILE = os.environ.get("GROSS_WATCHLIST_FILE")
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Start shared resources on startup and release them on shutdown."""
+    # Back the scraper cache with the on-disk tier so warm data survives restarts
+    scraper_cache.attach_tier(SQLiteCacheTier(CACHE_DB_PATH))
+    
+    # Symbol metadata learned by previous runs, plus the bulk file if configured
+    symbol_index.open(SYMBOL_INDEX_PATH)
+    if SYMBOL_FILE:
+        symbol_index.load_file(SYMBOL_FILE)
+    
+    # One instance of each scraper for the whole app (HTTP sessions are reused)
+    scraper_registry.start()
+    
+    # Pre-warm the browser pool in the background so startup isn't delayed by Chrome
+    loop = asyncio.get_running_loop()
+    loop.run_in_executor(None, browser_pool.start, BROWSER_POOL_WARM)
+    
+    # Remove expired cache entries in the background (not only when read again)
+    scraper_cache.start_sweeper(interval_seconds=300)
+    page_cache.start_sweeper(interval_seconds=60)
+    yahoo_cache.start_sweeper(interval_seconds=300)
+    
+    # Keep the watchlist's cached values fresh (no-op without a watchlist)
+    cache_warmer.start(load_watchlist(WATCHLIST, WATCHLIST_FILE))
+    
+    yield
+    
+    cache_warmer.stop()
+    scraper_cache.stop_sweeper()
+    page_cache.stop_sweeper()
+    yahoo_cache.stop_sweeper()
+    browser_pool.shutdown()
+    scraper_executor.shutdown(wait=False)
+    scraper_registry.shutdown()
+    await async_http_client.aclose()
+    symbol_index.close()
+    tier = scraper_cache.detach_tier()
+    if tier is not None:
+        tier.close()
+
 
 app = FastAPI(
     title="Gross Financial Analysis API",
     description="API for analyzing financial ratios from multiple sources",
-    version="0.1.0"
+    version="0.1.0",
+    lifespan=lifespan
 )
 
 # Configure CORS - Allow frontend to connect
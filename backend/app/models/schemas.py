@@ -6,13 +6,14 @@ The frontend will use this same structure to know what to expect.
 """
 
 from pydantic import BaseModel
-from typing import List, Optional
+from typing import Dict, List, Optional
 
 
 class SourceValue(BaseModel):
     """Value from a single data source (e.g., Finviz, Morningstar, etc.)."""
     source: str
     value: Optional[float] = None
+    stale: bool = False  # True if this is an expired cached value (a refresh is running in the background)
 
 
 class RatioResult(BaseModel):
@@ -36,3 +37,14 @@ class AnalysisResponse(BaseModel):
     max_score: int  # Maximum possible score (4, since P/E is info only)
     execution_time: Optional[float] = None  # Time taken to fetch all data (in seconds)
 
+
+class BatchAnalysisRequest(BaseModel):
+    """Request body for POST /api/analyze/batch."""
+    tickers: List[str]  # Ticker symbols to analyze (duplicates are analyzed once)
+
+
+class BatchAnalysisResponse(BaseModel):
+    """Results of a batch analysis, keyed by (uppercased) ticker."""
+    results: Dict[str, AnalysisResponse]  # Successful analyses
+    errors: Dict[str, str] = {}  # Tickers that couldn't be analyzed, with the reason
+    execution_time: Optional[float] = None  # Time taken for the whole batch (in seconds)
@@ -0,0 +1,135 @@
+"""
+Async HTTP client for the HTML scrapers (Finviz, Macrotrends).
+
+requests.Session is blocking: each page download ties up a worker thread, and
+rate limiting/backoff sleep that thread. This module downloads pages from the
+event loop instead, with a pooled httpx.AsyncClient:
+- Keep-alive connection pool with configurable size and timeouts
+- HTTP/2 when the h2 package is installed and the site supports it
+- Rate limiting and retry backoff are awaited, never slept
+
+Hundreds of downloads can then wait on one event loop at the same time; only
+HTML parsing still runs in a thread (it's CPU work).
+
+httpx connections belong to the event loop that opened them, so one client is
+kept per event loop.
+"""
+
+from typing import Any, Callable, Optional
+import asyncio
+import os
+import weakref
+import httpx
+from app.services.rate_limiter import rate_limiter
+from .replay import cassettes
+
+try:
+    import h2  # noqa: F401 - only needed by httpx for HTTP/2
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+
+# Connection pool limits (all hosts combined), overridable by environment
+DEFAULT_MAX_CONNECTIONS = int(os.environ.get("GROSS_HTTP_MAX_CONNECTIONS", "100"))
+DEFAULT_MAX_KEEPALIVE = int(os.environ.get("GROSS_HTTP_MAX_KEEPALIVE", "20"))
+
+# Timeouts (seconds): connecting, and the whole request otherwise
+DEFAULT_CONNECT_TIMEOUT = float(os.environ.get("GROSS_HTTP_CONNECT_TIMEOUT", "5"))
+DEFAULT_TIMEOUT = float(os.environ.get("GROSS_HTTP_TIMEOUT", "10"))
+
+DEFAULT_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
+}
+
+
+class AsyncHttpClient:
+    """Pooled async HTTP client (one httpx.AsyncClient per event loop)."""
+    
+    def __init__(
+        self,
+        max_connections: int = DEFAULT_MAX_CONNECTIONS,
+        max_keepalive: int = DEFAULT_MAX_KEEPALIVE,
+        connect_timeout: float = DEFAULT_CONNECT_TIMEOUT,
+        timeout: float = DEFAULT_TIMEOUT,
+        http2: bool = HTTP2_AVAILABLE,
+        transport: Optional[httpx.AsyncBaseTransport] = None
+    ):
+        """
+        Initialize client settings (connections are opened on first use).
+        
+        Args:
+            max_connections: Maximum open connections (all hosts combined)
+            max_keepalive: Maximum idle connections kept for reuse
+            connect_timeout: Maximum time to open a connection (seconds)
+            timeout: Maximum time for reads/writes/pool waits (seconds)
+            http2: Use HTTP/2 when the server supports it (requires the h2 package)
+            transport: Custom httpx transport (tests; default: real traffic, or cassettes, see replay.py)
+        """
+        self.limits = httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_keepalive)
+        self.timeout = httpx.Timeout(timeout, connect=connect_timeout)
+        self.http2 = http2 and HTTP2_AVAILABLE
+        self._transport = transport
+        self._clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncClient]" = weakref.WeakKeyDictionary()
+    
+    def _get_client(self) -> httpx.AsyncClient:
+        """Get or create the httpx client of the running event loop."""
+        loop = asyncio.get_running_loop()
+        client = self._clients.get(loop)
+        if client is None or client.is_closed:
+            client = httpx.AsyncClient(
+                http2=self.http2,
+                limits=self.limits,
+                timeout=self.timeout,
+                headers=DEFAULT_HEADERS,
+                follow_redirects=True,
+                # Recorded/replayed cassettes in record/replay mode (see replay.py)
+                transport=self._transport or cassettes.async_transport(self.http2, self.limits)
+            )
+            self._clients[loop] = client
+        return client
+    
+    async def fetch(
+        self,
+        url: str,
+        retries: int = 3,
+        on_redirect: Optional[Callable[[str], Any]] = None
+    ) -> Optional[bytes]:
+        """
+        Download a page, with rate limiting and exponential backoff.
+        
+        Args:
+            url: Page URL
+            retries: Number of attempts
+            on_redirect: Called with the final URL if the request was redirected
+            
+        Returns:
+            Response body, or None if all attempts failed
+        """
+        client = self._get_client()
+        for attempt in range(retries):
+            try:
+                # Rate limiting: shared with the sync scrapers hitting this host
+                await rate_limiter.acquire_async(url)
+                response = await client.get(url)
+                response.raise_for_status()
+                if on_redirect is not None and str(response.url) != url:
+                    on_redirect(str(response.url))
+                return response.content
+            except Exception as e:
+                if attempt < retries - 1:
+                    await asyncio.sleep(2 ** attempt)  # Exponential backoff
+                    continue
+                print(f"Error fetching {url}: {e}")
+                return None
+    
+    async def aclose(self) -> None:
+        """Close the client of the running event loop (call on app shutdown)."""
+        loop = asyncio.get_running_loop()
+        client = self._clients.pop(loop, None)
+        if client is not None:
+            await client.aclose()
+
+
+# Global async client shared by the HTML scrapers
+async_http_client = AsyncHttpClient()
@@ -1,44 +1,108 @@
 """
 Base scraper class with common functionality.
+
+Pages can be fetched two ways:
+- fetch_page: blocking (requests), used from scraper worker threads and scripts
+- fetch_page_async: awaited (httpx, see async_http.py), used from the event loop
+
+Getters are split into fetching pages and parsing values out of them, so the
+sync and async versions share the same parsing and caching rules.
+
+Scrapers can set PARSE_ONLY (an XPath) to build the BeautifulSoup tree only for
+the parts of the page they read (e.g., Finviz's snapshot cells). lxml finds
+those parts in C, so the slow BeautifulSoup tree is built for a few KB instead
+of the whole 200-500 KB page (see benchmarks/bench_parsing.py).
 """
 
+import asyncio
 import requests
 from bs4 import BeautifulSoup
-from typing import Optional
+from typing import Any, Awaitable, Callable, Optional, Union
+import lxml.etree
+import lxml.html
 import time
 import re
+from app.services.cache import MISSING, page_cache, scraper_cache
+from app.services.rate_limiter import rate_limiter
+from app.services.singleflight import SingleFlight
+from app.services.symbol_metadata import symbol_index
+from .async_http import async_http_client
+from .replay import CassetteAdapter
+
+# Keep-alive connections kept per host; scraper instances are shared by all
+# analyses (see registry.py), so several worker threads use one session at once
+SESSION_POOL_SIZE = 8
+
+# Concurrent async downloads of the same URL share one request
+_page_flight = SingleFlight()
+
+
+def parse_html(content: Union[bytes, str], parse_only: Optional[str] = None) -> BeautifulSoup:
+    """
+    Parse HTML, optionally keeping only the elements matching an XPath.
+    
+    Matching elements become siblings at the top of the tree, in page order.
+    If nothing matches (e.g., the site changed its layout), the whole page is
+    parsed so the scraper's fallbacks still see everything.
+    
+    Args:
+        content: Page HTML
+        parse_only: XPath of the elements to keep (None = whole page)
+        
+    Returns:
+        Parsed page
+    """
+    if parse_only is None:
+        return BeautifulSoup(content, 'lxml')
+    try:
+        elements = lxml.html.fromstring(content).xpath(parse_only)
+    except (ValueError, lxml.etree.LxmlError):
+        elements = []
+    if not elements:
+        return BeautifulSoup(content, 'lxml')
+    fragment = b"".join(lxml.html.tostring(element, with_tail=False) for element in elements)
+    return BeautifulSoup(fragment, 'lxml')
 
 
 class BaseScraper:
     """Base class for all financial data scrapers."""
     
+    # XPath of the elements the scraper reads from its pages (None = parse the whole page)
+    PARSE_ONLY: Optional[str] = None
+    
     def __init__(self):
         self.session = requests.Session()
+        # Real traffic, or recorded/replayed cassettes (see replay.py)
+        adapter = CassetteAdapter(pool_connections=4, pool_maxsize=SESSION_POOL_SIZE)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
         self.session.headers.update({
             'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
         })
-        self._last_request_time = 0
-        self._min_delay = 2  # Minimum delay between requests (seconds) to respect rate limits
     
     def fetch_page(self, url: str, retries: int = 3) -> Optional[BeautifulSoup]:
         """
         Fetch and parse a web page with rate limiting protection.
         
-        Adds a delay between requests to avoid being blocked by the website.
+        Requests go through the process-wide per-host rate limiter to avoid
+        being blocked by the website.
+        Parsed pages are kept in page_cache for a few minutes, so several
+        getters reading the same URL share one download and one parse.
         """
-        # Rate limiting: wait if we made a request too recently
-        current_time = time.time()
-        time_since_last = current_time - self._last_request_time
-        if time_since_last < self._min_delay:
-            sleep_time = self._min_delay - time_since_last
-            time.sleep(sleep_time)
-        
+        return page_cache.get_or_set(url, lambda: self._download_page(url, retries))
+    
+    def _download_page(self, url: str, retries: int = 3) -> Optional[BeautifulSoup]:
+        """Download and parse a web page (no caching)."""
         for attempt in range(retries):
             try:
+                # Rate limiting: shared by every scraper hitting this host
+                rate_limiter.acquire(url)
                 response = self.session.get(url, timeout=10)
                 response.raise_for_status()
-                self._last_request_time = time.time()  # Update last request time
-                return BeautifulSoup(response.content, 'lxml')
+                if response.url != url:
+                    # Redirected (e.g., wrong Macrotrends slug): build the right URL next time
+                    symbol_index.learn_from_url(response.url)
+                return self.parse_page(response.content)
             except Exception as e:
                 if attempt < retries - 1:
                     time.sleep(2 ** attempt)  # Exponential backoff
@@ -46,6 +110,82 @@ class BaseScraper:
                 print(f"Error fetching {url}: {e}")
                 return None
     
+    async def fetch_page_async(self, url: str, retries: int = 3) -> Optional[BeautifulSoup]:
+        """
+        Async version of fetch_page (doesn't hold a thread while downloading).
+        
+        Shares page_cache with fetch_page. The download is awaited on the event
+        loop; only the HTML parsing runs in a worker thread.
+        """
+        soup = page_cache.get(url)
+        if soup is not None:
+            return soup
+        return await _page_flight.do_async(url, lambda: self._download_page_async(url, retries))
+    
+    async def _download_page_async(self, url: str, retries: int = 3) -> Optional[BeautifulSoup]:
+        """Download and parse a web page asynchronously, then cache the parsed page."""
+        content = await async_http_client.fetch(url, retries, on_redirect=symbol_index.learn_from_url)
+        if content is None:
+            return None
+        soup = await asyncio.to_thread(self.parse_page, content)
+        page_cache.set(url, soup)
+        return soup
+    
+    def parse_page(self, content: Union[bytes, str]) -> BeautifulSoup:
+        """Parse downloaded HTML (only the PARSE_ONLY parts, if set)."""
+        return parse_html(content, self.PARSE_ONLY)
+    
+    def _get_cached_metric(
+        self,
+        cache_key: str,
+        fetch: Callable[[], Any],
+        parse: Callable[..., Any]
+    ) -> Any:
+        """
+        Get a metric: from scraper_cache, or by fetching page(s) and parsing them.
+        
+        Args:
+            cache_key: scraper_cache key of the metric
+            fetch: Returns the page (or a tuple of pages) the metric is read from
+            parse: Takes the page(s) and returns the value (None if not on the page);
+                   the value can be any JSON-serializable data (e.g., a statement matrix)
+            
+        Returns:
+            Metric value, or None if not available or fetching failed
+        """
+        # Check cache first (also returns known "not available"/"failed" results)
+        cached_value = scraper_cache.lookup(cache_key)
+        if cached_value is not MISSING:
+            return cached_value
+        return self._parse_and_cache(cache_key, fetch(), parse)
+    
+    async def _get_cached_metric_async(
+        self,
+        cache_key: str,
+        fetch: Callable[[], Awaitable[Any]],
+        parse: Callable[..., Any]
+    ) -> Any:
+        """Async version of _get_cached_metric (fetch returns an awaitable)."""
+        cached_value = scraper_cache.lookup(cache_key)
+        if cached_value is not MISSING:
+            return cached_value
+        return self._parse_and_cache(cache_key, await fetch(), parse)
+    
+    def _parse_and_cache(self, cache_key: str, pages: Any, parse: Callable[..., Any]) -> Any:
+        """Parse fetched page(s) and cache the value, "not available" or "failed"."""
+        pages = pages if isinstance(pages, tuple) else (pages,)
+        if any(page is None for page in pages):
+            scraper_cache.set_failed(cache_key)
+            return None
+        
+        value = parse(*pages)
+        if value is not None:
+            scraper_cache.set(cache_key, value)  # Cache the result
+            return value
+        
+        scraper_cache.set_not_available(cache_key)
+        return None
+    
     def extract_number(self, text: str) -> Optional[float]:
         """Extract a number from text, handling percentages and formatting."""
         if not text:
@@ -0,0 +1,333 @@
+"""
+Shared pool of headless Chrome browsers for the Selenium scrapers.
+
+Morningstar, QuickFS and Koyfin render their data with JavaScript, so we need a
+real browser. Starting Chrome costs 2-3 seconds, so instead of each scraper
+launching (and quitting) its own browser, all of them check a browser out of
+this process-wide pool for one page load and give it back afterwards.
+
+The pool:
+- Has a maximum size (caps memory when several analyses run at once)
+- Can be pre-warmed at app startup (first request doesn't pay the Chrome start)
+- Health-checks a browser before handing it out (dead browsers are replaced)
+- Recycles a browser after N navigations or when its memory (RSS) gets too high
+- Blocks, per page load, the requests a source doesn't need (images, fonts,
+  ads, analytics...) through DevTools request blocking
+- Loads pages with the "eager" page load strategy: driver.get() returns once
+  the HTML is parsed, and scrapers wait for their data (see page_wait.py)
+- In replay mode, hands out drivers answering from recorded pages instead of
+  Chrome; in record mode, saves what is read from each page (see replay.py)
+"""
+
+from contextlib import contextmanager
+from typing import Iterable, List, Optional
+import os
+import threading
+import time
+import psutil
+import undetected_chromedriver as uc
+from .replay import RecordingDriver, ReplayDriver, cassettes
+
+
+# Maximum number of Chrome instances alive at the same time
+DEFAULT_MAX_SIZE = 3
+
+# Recycle a browser after this many page loads (Chrome slowly leaks memory)
+DEFAULT_MAX_NAVIGATIONS = 50
+
+# Recycle a browser when Chrome (all its processes) uses more than this (MB)
+DEFAULT_MAX_RSS_MB = 1024
+
+# Maximum time to wait for a free browser (seconds)
+DEFAULT_CHECKOUT_TIMEOUT = 60
+
+# When driver.get() returns: "eager" (HTML parsed), "none" (right away) or "normal" (everything loaded)
+PAGE_LOAD_STRATEGY = os.environ.get("GROSS_PAGE_LOAD_STRATEGY", "eager")
+
+# Requests that never carry the data we read (Network.setBlockedURLs patterns, "*" = wildcard):
+# images, fonts, media, ads and analytics. Scrapers extend this list with their own patterns.
+DEFAULT_BLOCKED_URLS = [
+    "*.png", "*.jpg", "*.jpeg", "*.gif", "*.webp", "*.avif", "*.svg", "*.ico",
+    "*.woff", "*.woff2", "*.ttf", "*.otf", "*.eot",
+    "*.mp4", "*.webm", "*.m3u8",
+    "*googletagmanager.com*", "*google-analytics.com*", "*doubleclick.net*",
+    "*googlesyndication.com*", "*googleadservices.com*", "*amazon-adsystem.com*",
+    "*adsrvr.org*", "*taboola.com*", "*outbrain.com*", "*criteo.*",
+    "*facebook.net*", "*connect.facebook.*", "*hotjar.com*", "*scorecardresearch.com*",
+    "*chartbeat.com*", "*newrelic.com*", "*nr-data.net*", "*segment.com*", "*segment.io*",
+    "*optimizely.com*", "*quantserve.com*", "*mixpanel.com*", "*fullstory.com*",
+]
+
+
+def block_urls(driver, patterns: Iterable[str]) -> bool:
+    """
+    Set the URL patterns Chrome must not load (replaces the previous list).
+    
+    Args:
+        driver: Chrome WebDriver
+        patterns: Network.setBlockedURLs patterns (empty = block nothing)
+        
+    Returns:
+        True if applied, False if the browser doesn't support it
+    """
+    try:
+        driver.execute_cdp_cmd("Network.enable", {})
+        driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": list(patterns)})
+        return True
+    except Exception as e:
+        print(f"Could not set blocked URLs: {e}")
+        return False
+
+
+class PooledBrowser:
+    """A Chrome WebDriver owned by the pool, with usage statistics."""
+    
+    def __init__(self, driver):
+        self.driver = driver
+        self.navigations = 0
+        self.created_at = time.time()
+        self.blocked_urls: List[str] = []  # Blocklist currently set in Chrome
+    
+    def is_healthy(self) -> bool:
+        """Check the browser still responds (Chrome may have crashed)."""
+        try:
+            self.driver.current_url
+            return True
+        except Exception:
+            return False
+    
+    def rss_mb(self) -> Optional[float]:
+        """
+        Get memory used by this browser (Chrome and its child processes).
+        
+        Returns:
+            Resident memory in MB, or None if it can't be measured
+        """
+        pid = getattr(self.driver, 'browser_pid', None)
+        if not pid:
+            return None
+        try:
+            process = psutil.Process(pid)
+            processes = [process] + process.children(recursive=True)
+            total = 0
+            for p in processes:
+                try:
+                    total += p.memory_info().rss
+                except psutil.Error:
+                    continue
+            return total / (1024 * 1024)
+        except psutil.Error:
+            return None
+    
+    def quit(self) -> None:
+        """Close the browser, ignoring errors (it may already be dead)."""
+        try:
+            self.driver.quit()
+        except Exception:
+            pass
+
+
+class BrowserPool:
+    """Process-wide pool of headless Chrome browsers."""
+    
+    def __init__(
+        self,
+        max_size: int = DEFAULT_MAX_SIZE,
+        max_navigations: int = DEFAULT_MAX_NAVIGATIONS,
+        max_rss_mb: float = DEFAULT_MAX_RSS_MB,
+        checkout_timeout: float = DEFAULT_CHECKOUT_TIMEOUT,
+        page_load_strategy: str = PAGE_LOAD_STRATEGY
+    ):
+        """
+        Initialize pool (no browser is started until start() or first checkout).
+        
+        Args:
+            max_size: Maximum number of browsers alive at the same time
+            max_navigations: Recycle a browser after this many page loads
+            max_rss_mb: Recycle a browser when it uses more memory than this (MB)
+            checkout_timeout: Maximum time to wait for a free browser (seconds)
+            page_load_strategy: When driver.get() returns ("eager", "none" or "normal")
+        """
+        self.max_size = max_size
+        self.max_navigations = max_navigations
+        self.max_rss_mb = max_rss_mb
+        self.checkout_timeout = checkout_timeout
+        self.page_load_strategy = page_load_strategy
+        self._idle: List[PooledBrowser] = []
+        self._total = 0  # Browsers alive (idle + checked out + being started)
+        self._condition = threading.Condition()
+        self._closed = False
+    
+    def _create_driver(self):
+        """Create a new undetected Chrome WebDriver instance (bypasses bot detection)."""
+        if cassettes.replaying:
+            # Replay mode: recorded pages, no Chrome (see replay.py)
+            return ReplayDriver(cassettes)
+        try:
+            options = uc.ChromeOptions()
+            # Use headless mode to avoid window popup and improve speed
+            options.add_argument('--headless=new')
+            options.add_argument('--no-sandbox')
+            options.add_argument('--disable-dev-shm-usage')
+            options.add_argument('--disable-gpu')
+            options.add_argument('--window-size=1920,1080')
+            options.add_argument('--disable-blink-features=AutomationControlled')
+            # Reduce resource usage
+            options.add_argument('--disable-extensions')
+            options.add_argument('--disable-plugins')
+            # Images, fonts, ads... are blocked per page load (see block_urls)
+            # Don't wait for every subresource: scrapers poll for their data instead
+            options.page_load_strategy = self.page_load_strategy
+            # Network events in the performance log (JSON capture, see network_capture.py)
+            options.set_capability('goog:loggingPrefs', {'performance': 'ALL'})
+            
+            driver = uc.Chrome(options=options, version_main=None, use_subprocess=True)
+            return RecordingDriver(driver, cassettes) if cassettes.recording else driver
+        except Exception as e:
+            print(f"Error initializing undetected Chrome WebDriver: {e}")
+            print("Make sure Chrome is installed")
+            raise
+    
+    def _new_browser(self) -> PooledBrowser:
+        """Start a browser for a slot already reserved in self._total."""
+        try:
+            return PooledBrowser(self._create_driver())
+        except Exception:
+            with self._condition:
+                self._total -= 1
+                self._condition.notify()
+            raise
+    
+    def _discard(self, browser: PooledBrowser) -> None:
+        """Quit a browser and free its slot."""
+        browser.quit()
+        with self._condition:
+            self._total -= 1
+            self._condition.notify()
+    
+    def _should_recycle(self, browser: PooledBrowser) -> bool:
+        """Check if a browser has been used enough to be replaced."""
+        if browser.navigations >= self.max_navigations:
+            return True
+        rss = browser.rss_mb()
+        return rss is not None and rss > self.max_rss_mb
+    
+    def start(self, warm: int = 1) -> None:
+        """
+        Pre-warm the pool by starting browsers now (call at app startup).
+        
+        Args:
+            warm: Number of browsers to start (capped at max_size)
+        """
+        with self._condition:
+            self._closed = False
+            count = max(0, min(warm, self.max_size) - self._total)
+            self._total += count
+        
+        for _ in range(count):
+            try:
+                browser = self._new_browser()
+            except Exception:
+                continue
+            if self._closed:
+                # Shut down while this browser was starting
+                self._discard(browser)
+                continue
+            with self._condition:
+                self._idle.append(browser)
+                self._condition.notify()
+    
+    def checkout(self) -> PooledBrowser:
+        """
+        Take a browser out of the pool (waits if all browsers are busy).
+        
+        Prefer the driver() context manager, which always gives it back.
+        
+        Returns:
+            A healthy browser
+            
+        Raises:
+            TimeoutError: If no browser became free within checkout_timeout
+        """
+        deadline = time.time() + self.checkout_timeout
+        while True:
+            with self._condition:
+                if self._closed:
+                    raise RuntimeError("Browser pool is shut down")
+                
+                browser = None
+                if self._idle:
+                    browser = self._idle.pop()
+                elif self._total < self.max_size:
+                    self._total += 1  # Reserve a slot, start Chrome outside the lock
+                else:
+                    remaining = deadline - time.time()
+                    if remaining <= 0:
+                        raise TimeoutError("No browser available in the pool")
+                    self._condition.wait(remaining)
+                    continue
+            
+            if browser is None:
+                return self._new_browser()
+            if browser.is_healthy():
+                return browser
+            # Dead browser (crashed Chrome) - replace it
+            self._discard(browser)
+    
+    def checkin(self, browser: PooledBrowser, broken: bool = False) -> None:
+        """
+        Give a browser back to the pool after one page load.
+        
+        Args:
+            browser: Browser from checkout()
+            broken: True if the page load failed badly and the browser should not be reused
+        """
+        browser.navigations += 1
+        if broken or self._closed or self._should_recycle(browser):
+            self._discard(browser)
+            return
+        
+        with self._condition:
+            self._idle.append(browser)
+            self._condition.notify()
+    
+    @contextmanager
+    def driver(self, blocked_urls: Optional[List[str]] = None):
+        """
+        Check out a WebDriver for one page load.
+        
+        Usage:
+            with browser_pool.driver(blocked_urls=BLOCKED_URLS) as driver:
+                driver.get(url)
+                page_source = driver.page_source
+        
+        Args:
+            blocked_urls: URL patterns not to load for this page (None = block nothing)
+        """
+        browser = self.checkout()
+        # Browsers are shared by all sources: set this source's blocklist (if it changed)
+        wanted = list(blocked_urls or [])
+        if wanted != browser.blocked_urls and block_urls(browser.driver, wanted):
+            browser.blocked_urls = wanted
+        try:
+            yield browser.driver
+        except Exception:
+            self.checkin(browser, broken=True)
+            raise
+        else:
+            self.checkin(browser)
+    
+    def shutdown(self) -> None:
+        """Quit all idle browsers (checked-out ones are quit when given back)."""
+        with self._condition:
+            self._closed = True
+            idle = self._idle
+            self._idle = []
+            self._total -= len(idle)
+            self._condition.notify_all()
+        for browser in idle:
+            browser.quit()
+
+
+# Global browser pool shared by all Selenium scrapers
+browser_pool = BrowserPool()
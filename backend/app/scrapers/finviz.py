@@ -9,10 +9,15 @@ IMPORTANT: This is web scraping, not an official API.
 - Cache results when possible to avoid repeated requests
 """
 
-from typing import Optional
+from typing import Dict, Optional, Tuple
 from bs4 import BeautifulSoup
 from .base import BaseScraper
-from app.services.cache import scraper_cache
+from app.services.cache import page_cache
+
+# Snapshot labels of the metrics we use (alternative spellings tried in order)
+GROSS_MARGIN_LABELS = ("Gross Margin", "Gross M.")
+PE_LABELS = ("P/E", "Trailing P/E")
+ROIC_LABELS = ("ROIC",)
 
 
 class FinvizScraper(BaseScraper):
@@ -20,55 +25,120 @@ class FinvizScraper(BaseScraper):
     
     BASE_URL = "https://finviz.com/quote.ashx"
     
+    # Only the snapshot table cells (labels and values are both "snapshot-td2",
+    # possibly with extra classes like "snapshot-td2 cursor-pointer")
+    PARSE_ONLY = "//td[contains(concat(' ', normalize-space(@class), ' '), ' snapshot-td2 ')]"
+    
     def _get_quote_page(self, ticker: str) -> Optional[BeautifulSoup]:
         """Fetch the quote page for a ticker."""
         ticker = self.clean_ticker(ticker)
         url = f"{self.BASE_URL}?t={ticker}"
         return self.fetch_page(url)
     
-    def _find_metric_value(self, soup: BeautifulSoup, metric_label: str) -> Optional[float]:
+    async def _get_quote_page_async(self, ticker: str) -> Optional[BeautifulSoup]:
+        """Async version of _get_quote_page."""
+        ticker = self.clean_ticker(ticker)
+        url = f"{self.BASE_URL}?t={ticker}"
+        return await self.fetch_page_async(url)
+    
+    def _snapshot_key(self, ticker: str) -> str:
+        """page_cache key of the parsed snapshot of a ticker."""
+        return f"{self.BASE_URL}?t={self.clean_ticker(ticker)}#snapshot"
+    
+    def _build_snapshot(self, soup: BeautifulSoup) -> Dict[str, str]:
         """
-        Find a metric value in the Finviz quote page.
+        Parse the snapshot table of a quote page into {label: value text}.
+        
+        Finviz shows its metrics as a grid of label/value cell pairs
+        (e.g., "Gross Margin" | "80.81%"), all with the "snapshot-td2" class.
         
-        Finviz displays metrics in a table. We search for the label text
-        and then get the value from the adjacent cell.
+        Args:
+            soup: Quote page
+            
+        Returns:
+            Value text by label (e.g., {"P/E": "406.95", "ROE": "19.50%"}), empty if no table
         """
-        if not soup:
-            return None
+        cells = [cell.get_text(strip=True) for cell in soup.find_all('td', class_='snapshot-td2')]
+        return dict(zip(cells[0::2], cells[1::2]))
+    
+    def get_snapshot(self, ticker: str) -> Optional[Dict[str, str]]:
+        """
+        Get every metric of the Finviz snapshot table (one page load, parsed once).
         
-        # Find all table cells
-        cells = soup.find_all('td', class_='snapshot-td2')
+        The parsed table is kept in page_cache, so all getters (and get_metric
+        calls) for a ticker share one download and one parse.
         
-        # Look for the metric label
-        for i, cell in enumerate(cells):
-            text = cell.get_text(strip=True)
-            if metric_label.lower() in text.lower():
-                # The value is typically in the next cell or in the same cell after the label
-                # Try next sibling or next cell
-                next_cell = cell.find_next_sibling('td')
-                if not next_cell:
-                    # Sometimes the value is in the same cell after a space or separator
-                    # Extract number from the cell text
-                    value_text = cell.get_text(strip=True)
-                    # Remove the label part and get the value
-                    value_text = value_text.replace(metric_label, '').strip()
-                    return self.extract_number(value_text)
-                else:
-                    value_text = next_cell.get_text(strip=True)
-                    return self.extract_number(value_text)
+        Args:
+            ticker: Stock ticker symbol (e.g., 'PLTR')
+            
+        Returns:
+            Value text by label, or None if the page couldn't be fetched
+        """
+        def load():
+            soup = self._get_quote_page(ticker)
+            return self._build_snapshot(soup) if soup else None
         
-        # Alternative: search in all text and find pattern
-        # Gross Margin might be displayed as "Gross Margin 80.81%"
-        page_text = soup.get_text()
-        import re
-        # Pattern: "Gross Margin" followed by a number and %
-        pattern = rf'{re.escape(metric_label)}[:\s]+([\d.]+)%'
-        match = re.search(pattern, page_text, re.IGNORECASE)
-        if match:
-            return float(match.group(1))
+        return page_cache.get_or_set(self._snapshot_key(ticker), load)
+    
+    async def get_snapshot_async(self, ticker: str) -> Optional[Dict[str, str]]:
+        """Async version of get_snapshot."""
+        key = self._snapshot_key(ticker)
+        snapshot = page_cache.get(key)
+        if snapshot is not None:
+            return snapshot
+        soup = await self._get_quote_page_async(ticker)
+        if not soup:
+            return None
+        snapshot = self._build_snapshot(soup)
+        page_cache.set(key, snapshot)
+        return snapshot
+    
+    def _read_metric(self, snapshot: Dict[str, str], labels: Tuple[str, ...]) -> Optional[float]:
+        """
+        Read a metric from a parsed snapshot.
         
+        Args:
+            snapshot: Value text by label (from get_snapshot)
+            labels: Label and its alternative spellings, tried in order
+            
+        Returns:
+            Value as a float, or None if missing or shown as "-"
+        """
+        for label in labels:
+            value_text = snapshot.get(label)
+            if value_text is not None:
+                return self.extract_number(value_text)
         return None
     
+    def get_metric(self, ticker: str, *labels: str) -> Optional[float]:
+        """
+        Get any metric of the Finviz snapshot table by its label.
+        
+        Args:
+            ticker: Stock ticker symbol (e.g., 'PLTR')
+            labels: Label as shown on Finviz (e.g., "ROE", "Debt/Eq", "Oper. Margin"),
+                    alternatives can follow and are tried in order
+            
+        Returns:
+            Value as a float (percentages without the %), or None if not available
+        """
+        snapshot = self.get_snapshot(ticker)
+        if not snapshot:
+            return None
+        return self._read_metric(snapshot, labels)
+    
+    def _parse_gross_margin(self, snapshot: Dict[str, str]) -> Optional[float]:
+        """Read Gross Margin from a snapshot (tries label variations)."""
+        return self._read_metric(snapshot, GROSS_MARGIN_LABELS)
+    
+    def _parse_pe_ratio(self, snapshot: Dict[str, str]) -> Optional[float]:
+        """Read P/E Ratio from a snapshot (tries label variations)."""
+        return self._read_metric(snapshot, PE_LABELS)
+    
+    def _parse_roic(self, snapshot: Dict[str, str]) -> Optional[float]:
+        """Read ROIC from a snapshot ("ROI" is a different metric: no ROIC label means not available)."""
+        return self._read_metric(snapshot, ROIC_LABELS)
+    
     def get_gross_margin(self, ticker: str) -> Optional[float]:
         """
         Get Gross Margin percentage from Finviz.
@@ -83,31 +153,20 @@ class FinvizScraper(BaseScraper):
             Returns None if not found or error occurs
         """
         ticker_upper = self.clean_ticker(ticker)
-        cache_key = f"finviz_gross_margin_{ticker_upper}"
-        
-        # Check cache first
-        cached_value = scraper_cache.get(cache_key)
-        if cached_value is not None:
-            return cached_value
-        
-        # Fetch from website
-        soup = self._get_quote_page(ticker_upper)
-        if not soup:
-            return None
-        
-        # Try different label variations
-        value = self._find_metric_value(soup, "Gross Margin")
-        if value is not None:
-            scraper_cache.set(cache_key, value)  # Cache the result
-            return value
-        
-        # Try alternative labels
-        value = self._find_metric_value(soup, "Gross M.")
-        if value is not None:
-            scraper_cache.set(cache_key, value)  # Cache the result
-            return value
-        
-        return None
+        return self._get_cached_metric(
+            f"finviz_gross_margin_{ticker_upper}",
+            lambda: self.get_snapshot(ticker_upper),
+            self._parse_gross_margin
+        )
+    
+    async def get_gross_margin_async(self, ticker: str) -> Optional[float]:
+        """Async version of get_gross_margin (page downloaded on the event loop)."""
+        ticker_upper = self.clean_ticker(ticker)
+        return await self._get_cached_metric_async(
+            f"finviz_gross_margin_{ticker_upper}",
+            lambda: self.get_snapshot_async(ticker_upper),
+            self._parse_gross_margin
+        )
     
     def get_pe_ratio(self, ticker: str) -> Optional[float]:
         """
@@ -123,28 +182,46 @@ class FinvizScraper(BaseScraper):
             Returns None if not found or error occurs
         """
         ticker_upper = self.clean_ticker(ticker)
-        cache_key = f"finviz_pe_{ticker_upper}"
-        
-        # Check cache first
-        cached_value = scraper_cache.get(cache_key)
-        if cached_value is not None:
-            return cached_value
-        
-        # Fetch from website
-        soup = self._get_quote_page(ticker_upper)
-        if not soup:
-            return None
-        
-        # Try different label variations
-        value = self._find_metric_value(soup, "P/E")
-        if value is not None:
-            scraper_cache.set(cache_key, value)  # Cache the result
-            return value
+        return self._get_cached_metric(
+            f"finviz_pe_{ticker_upper}",
+            lambda: self.get_snapshot(ticker_upper),
+            self._parse_pe_ratio
+        )
+    
+    async def get_pe_ratio_async(self, ticker: str) -> Optional[float]:
+        """Async version of get_pe_ratio (page downloaded on the event loop)."""
+        ticker_upper = self.clean_ticker(ticker)
+        return await self._get_cached_metric_async(
+            f"finviz_pe_{ticker_upper}",
+            lambda: self.get_snapshot_async(ticker_upper),
+            self._parse_pe_ratio
+        )
+    
+    def get_roic(self, ticker: str) -> Optional[float]:
+        """
+        Get ROIC (Return on Invested Capital) percentage from Finviz.
         
-        value = self._find_metric_value(soup, "Trailing P/E")
-        if value is not None:
-            scraper_cache.set(cache_key, value)  # Cache the result
-            return value
+        Read from the same snapshot table as the other metrics (no extra request).
         
-        return None
-
+        Args:
+            ticker: Stock ticker symbol (e.g., 'PLTR')
+            
+        Returns:
+            ROIC as a percentage (e.g., 15.5 for 15.5%)
+            Returns None if not found or error occurs
+        """
+        ticker_upper = self.clean_ticker(ticker)
+        return self._get_cached_metric(
+            f"finviz_roic_{ticker_upper}",
+            lambda: self.get_snapshot(ticker_upper),
+            self._parse_roic
+        )
+    
+    async def get_roic_async(self, ticker: str) -> Optional[float]:
+        """Async version of get_roic (page downloaded on the event loop)."""
+        ticker_upper = self.clean_ticker(ticker)
+        return await self._get_cached_metric_async(
+            f"finviz_roic_{ticker_upper}",
+            lambda: self.get_snapshot_async(ticker_upper),
+            self._parse_roic
+        )
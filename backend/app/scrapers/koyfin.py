@@ -14,13 +14,19 @@ to execute JavaScript and extract the rendered content.
 
 from typing import Optional
 from bs4 import BeautifulSoup
-from app.services.cache import scraper_cache
-import time
-import undetected_chromedriver as uc
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.common.exceptions import TimeoutException, WebDriverException
+from app.services.cache import MISSING, page_cache, scraper_cache
+from app.services.rate_limiter import rate_limiter
+from .browser_pool import DEFAULT_BLOCKED_URLS, browser_pool
+from .page_wait import metric_value_present, wait_until_ready
+
+
+# Requests not needed for the data (stylesheets, support chat, error/session tracking)
+BLOCKED_URLS = DEFAULT_BLOCKED_URLS + [
+    "*.css", "*intercom*", "*sentry.io*", "*sentry-cdn*", "*logrocket*", "*heapanalytics*", "*amplitude.com*",
+]
+
+# Readiness predicate: the page is read as soon as the ROIC row shows a value
+ROIC_READY = metric_value_present("Return on Invested Capital", "ROIC")
 
 
 class KoyfinScraper:
@@ -29,34 +35,8 @@ class KoyfinScraper:
     BASE_URL = "https://app.koyfin.com/company"
     
     def __init__(self):
-        """Initialize Koyfin scraper with Selenium WebDriver."""
-        self._driver = None
-        self._last_request_time = 0
-        self._min_delay = 2  # Minimum delay between requests (seconds)
-    
-    def _get_driver(self):
-        """Get or create undetected Chrome WebDriver instance (bypasses bot detection)."""
-        if self._driver is None:
-            try:
-                # Use undetected-chromedriver to bypass bot detection
-                options = uc.ChromeOptions()
-                options.add_argument('--headless=new')
-                options.add_argument('--no-sandbox')
-                options.add_argument('--disable-dev-shm-usage')
-                options.add_argument('--disable-gpu')
-                options.add_argument('--window-size=1920,1080')
-                options.add_argument('--disable-blink-features=AutomationControlled')
-                options.add_argument('--disable-extensions')
-                options.add_argument('--disable-plugins')
-                options.add_argument('--disable-images')
-                
-                self._driver = uc.Chrome(options=options, version_main=None, use_subprocess=True)
-            except Exception as e:
-                print(f"Error initializing undetected Chrome WebDriver: {e}")
-                print("Make sure Chrome is installed")
-                raise
-        
-        return self._driver
+        """Initialize Koyfin scraper (browsers come from the shared browser pool)."""
+        pass
     
     def clean_ticker(self, ticker: str) -> str:
         """Clean and uppercase ticker symbol."""
@@ -91,59 +71,24 @@ class KoyfinScraper:
         ticker_upper = self.clean_ticker(ticker)
         url = f"{self.BASE_URL}/{ticker_upper}/overview"
         
-        # Rate limiting
-        current_time = time.time()
-        time_since_last = current_time - self._last_request_time
-        if time_since_last < self._min_delay:
-            time.sleep(self._min_delay - time_since_last)
+        # Rendered pages are shared by all getters (one browser navigation per URL)
+        return page_cache.get_or_set(url, lambda: self._render_company_page(url))
+    
+    def _render_company_page(self, url: str) -> Optional[BeautifulSoup]:
+        """Load a company overview page in a pooled browser and parse it (no caching)."""
+        # Rate limiting (shared by every scraper hitting this host)
+        rate_limiter.acquire(url)
         
-        driver = None
         try:
-            driver = self._get_driver()
-            
-            # Check if driver is still valid
-            try:
-                driver.current_url
-            except:
-                if self._driver:
-                    try:
-                        self._driver.quit()
-                    except:
-                        pass
-                self._driver = None
-                driver = self._get_driver()
-            
-            driver.get(url)
-            
-            # Wait for page to load
-            try:
-                WebDriverWait(driver, 10).until(
-                    lambda d: d.execute_script("return document.readyState") == "complete"
-                )
+            with browser_pool.driver(blocked_urls=BLOCKED_URLS) as driver:
+                driver.get(url)
                 
-                # Wait for JavaScript to render content
-                time.sleep(3)
+                # Wait until the ROIC row is rendered with a value (no fixed sleeps)
+                if not wait_until_ready(driver, ROIC_READY):
+                    print(f"Warning: Could not find ROIC value on {url}")
                 
-                # Try to find ROIC or table content
-                try:
-                    WebDriverWait(driver, 8).until(
-                        EC.any_of(
-                            EC.presence_of_element_located((By.XPATH, "//*[contains(text(), 'ROIC')]")),
-                            EC.presence_of_element_located((By.XPATH, "//*[contains(text(), 'Return on Invested Capital')]")),
-                            EC.presence_of_element_located((By.TAG_NAME, "table"))
-                        )
-                    )
-                except TimeoutException:
-                    print(f"Warning: Could not find ROIC or table on {url}")
-                    # Continue anyway
-                
-            except TimeoutException:
-                print(f"Timeout waiting for page to load on {url}")
-                time.sleep(2)
-            
-            # Get page source after JavaScript execution
-            page_source = driver.page_source
-            self._last_request_time = time.time()
+                # Get page source after JavaScript execution
+                page_source = driver.page_source
             
             return BeautifulSoup(page_source, 'lxml')
             
@@ -151,14 +96,6 @@ class KoyfinScraper:
             print(f"Error fetching Koyfin page with Selenium: {e}")
             return None
     
-    def __del__(self):
-        """Clean up WebDriver on deletion."""
-        if self._driver is not None:
-            try:
-                self._driver.quit()
-            except:
-                pass
-    
     def _find_metric_value(self, soup: BeautifulSoup, metric_label: str) -> Optional[float]:
         """
         Find a metric value in the Koyfin company page.
@@ -234,14 +171,15 @@ class KoyfinScraper:
         ticker_upper = self.clean_ticker(ticker)
         cache_key = f"koyfin_roic_{ticker_upper}"
         
-        # Check cache first
-        cached_value = scraper_cache.get(cache_key)
-        if cached_value is not None:
+        # Check cache first (also returns known "not available"/"failed" results)
+        cached_value = scraper_cache.lookup(cache_key)
+        if cached_value is not MISSING:
             return cached_value
         
         # Fetch from website using Selenium (renders JavaScript)
         soup = self._get_company_page_selenium(ticker_upper)
         if not soup:
+            scraper_cache.set_failed(cache_key)
             return None
         
         # Try different label variations (prioritize full label)
@@ -256,5 +194,6 @@ class KoyfinScraper:
             scraper_cache.set(cache_key, value)
             return value
         
+        scraper_cache.set_not_available(cache_key)
         return None
 
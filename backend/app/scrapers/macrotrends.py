@@ -3,9 +3,12 @@ Macrotrends scraper for financial ratios.
 
 Macrotrends URL format: https://www.macrotrends.net/stocks/charts/{TICKER}/{company-name}/{metric}
 
-Examples:
-- Gross Margin: https://www.macrotrends.net/stocks/charts/PLTR/palantir/gross-margin
-- FCF Margin: https://www.macrotrends.net/stocks/charts/PLTR/palantir/free-cash-flow-margin
+Metrics are computed from the annual financial statements:
+- Income statement: https://www.macrotrends.net/stocks/charts/PLTR/palantir-technologies/financial-statements
+- Cash flow statement: https://www.macrotrends.net/stocks/charts/PLTR/palantir-technologies/cash-flow-statement
+
+Each statement page is parsed once into a line item x year matrix and cached,
+so every metric read from it (Gross Margin, FCF Margin, ...) costs no extra request.
 
 IMPORTANT: This is web scraping, not an official API.
 - Be respectful: Add delays between requests
@@ -13,10 +16,31 @@ IMPORTANT: This is web scraping, not an official API.
 - Cache results when possible to avoid repeated requests
 """
 
-from typing import Optional
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
+from typing import Dict, Optional, Tuple
+import asyncio
+import json
+import re
 from bs4 import BeautifulSoup
 from .base import BaseScraper
 from app.services.cache import scraper_cache
+from app.services.symbol_metadata import symbol_index
+
+# Statement pages (annual data, values in millions USD)
+STATEMENTS = ("financial-statements", "balance-sheet", "cash-flow-statement", "financial-ratios")
+
+# Line item names, with the alternative spellings tried in order
+REVENUE_ITEMS = ("Revenue", "Total Revenue")
+OPERATING_CASH_FLOW_ITEMS = ("Cash Flow From Operating Activities", "Operating Cash Flow")
+CAPEX_ITEMS = ("Net Change In Property, Plant, And Equipment", "Capital Expenditures")
+
+# JSON array the statement grid is rendered from, and its period keys (fiscal year ends)
+ORIGINAL_DATA_PATTERN = re.compile(r'var\s+originalData\s*=\s*(\[.*?\]);', re.DOTALL)
+PERIOD_PATTERN = re.compile(r'^\d{4}-\d{2}-\d{2}$')
+
+# Downloads statements needed together (e.g., for FCF Margin) at the same time
+_statement_pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix="macrotrends")
 
 
 class MacrotrendsScraper(BaseScraper):
@@ -24,23 +48,18 @@ class MacrotrendsScraper(BaseScraper):
     
     BASE_URL = "https://www.macrotrends.net/stocks/charts"
     
+    # Values are read from the statement data script (or data tables) only
+    PARSE_ONLY = "//table | //script[contains(., 'originalData')]"
+    
     def _get_company_name(self, ticker: str) -> str:
         """
         Get company name slug from ticker.
         
-        This is a simplified mapping. In production, you might need to
-        scrape the ticker page first to get the company name slug.
-        
-        For now, we'll use common mappings based on Macrotrends URL structure.
+        Slugs come from the symbol metadata index. For an unknown ticker,
+        Macrotrends redirects /{TICKER}/{anything}/ to the right slug, and the
+        index learns it from that redirect (see BaseScraper._download_page).
         """
-        # Common mappings (Macrotrends URL format)
-        company_map = {
-            "PLTR": "palantir-technologies",
-            "NVDA": "nvidia",
-            "MSFT": "microsoft",
-            "AAPL": "apple",
-        }
-        return company_map.get(ticker.upper(), ticker.lower())
+        return symbol_index.macrotrends_slug(ticker) or ticker.lower()
     
     def _get_metric_page(self, ticker: str, metric: str) -> Optional[BeautifulSoup]:
         """Fetch the metric page for a ticker."""
@@ -49,87 +68,177 @@ class MacrotrendsScraper(BaseScraper):
         url = f"{self.BASE_URL}/{ticker}/{company_name}/{metric}"
         return self.fetch_page(url)
     
-    def _find_latest_value(self, soup: BeautifulSoup, metric_name: str = None) -> Optional[float]:
+    async def _get_metric_page_async(self, ticker: str, metric: str) -> Optional[BeautifulSoup]:
+        """Async version of _get_metric_page."""
+        ticker = self.clean_ticker(ticker)
+        company_name = self._get_company_name(ticker)
+        url = f"{self.BASE_URL}/{ticker}/{company_name}/{metric}"
+        return await self.fetch_page_async(url)
+    
+    def _parse_statement(self, soup: BeautifulSoup) -> Optional[Dict[str, Dict[str, float]]]:
         """
-        Find the latest (most recent) value from Macrotrends page.
+        Parse a financial statement page into a line item x period matrix.
         
-        Macrotrends displays data in tables with structure like:
-        Date | TTM Revenue | TTM Gross Profit | Gross Margin
-        2025-09-30 | $3.90B | $3.15B | 80.81%
+        Statement pages render their grid from a JSON array in a script:
+            var originalData = [{"field_name": "<a ...>Revenue</a>", "2024-12-31": "2865.51", ...}, ...];
+        If the script isn't there, a table with periods as column headers and
+        one line item per row is read instead.
         
-        We need to find the column header matching the metric and get the first data row value.
+        Args:
+            soup: Statement page (e.g., financial-statements, cash-flow-statement)
+            
+        Returns:
+            {line item: {period: value}} (e.g., {"Revenue": {"2024-12-31": 2865.51}}),
+            or None if the page has no statement data
         """
-        if not soup:
-            return None
+        matrix = {}
+        script = soup.find('script', string=ORIGINAL_DATA_PATTERN)
+        if script is not None:
+            match = ORIGINAL_DATA_PATTERN.search(script.string)
+            try:
+                rows = json.loads(match.group(1))
+            except ValueError:
+                rows = []
+            for row in rows:
+                name = re.sub(r'<[^>]+>', '', str(row.get('field_name', ''))).strip()
+                values = {}
+                for period, text in row.items():
+                    if PERIOD_PATTERN.match(period):
+                        value = self.extract_number(str(text))
+                        if value is not None:
+                            values[period] = value
+                if name and values:
+                    matrix[name] = values
         
-        # Strategy 1: Find table and locate the correct column by header
-        tables = soup.find_all('table')
-        for table in tables:
-            rows = table.find_all('tr')
-            if len(rows) < 2:
-                continue
-            
-            # Find header row (usually first row)
-            header_row = rows[0]
-            header_cells = header_row.find_all(['th', 'td'])
-            header_texts = [cell.get_text(strip=True).lower() for cell in header_cells]
-            
-            # Find the column index for the metric we're looking for
-            # For Gross Margin, look for "gross margin" in headers
-            # For FCF Margin, look for "free cash flow margin" or "fcf margin"
-            target_column = None
-            if metric_name:
-                metric_lower = metric_name.lower()
-                for i, header_text in enumerate(header_texts):
-                    if metric_lower in header_text or header_text in metric_lower:
-                        target_column = i
-                        break
-            
-            # If we found the target column, get value from first data row
-            if target_column is not None and target_column < len(header_cells):
-                # Get first data row (usually row 1, after header)
+        if not matrix:
+            for table in soup.find_all('table'):
+                rows = table.find_all('tr')
+                if len(rows) < 2:
+                    continue
+                periods = [cell.get_text(strip=True) for cell in rows[0].find_all(['th', 'td'])][1:]
                 for data_row in rows[1:]:
-                    data_cells = data_row.find_all(['td', 'th'])
-                    if target_column < len(data_cells):
-                        cell_text = data_cells[target_column].get_text(strip=True)
-                        value = self.extract_number(cell_text)
-                        if value is not None and 0 <= value <= 100:  # Reasonable percentage
-                            return value
+                    cells = [cell.get_text(strip=True) for cell in data_row.find_all(['td', 'th'])]
+                    if not cells or not cells[0]:
+                        continue
+                    values = {}
+                    for period, text in zip(periods, cells[1:]):
+                        value = self.extract_number(text)
+                        if PERIOD_PATTERN.match(period) and value is not None:
+                            values[period] = value
+                    if values:
+                        matrix[cells[0]] = values
+        
+        return matrix or None
+    
+    def _line_item(self, matrix: Dict[str, Dict[str, float]], *names: str) -> Dict[str, float]:
+        """
+        Get a line item row of a statement matrix.
+        
+        Args:
+            matrix: Statement matrix (from get_statement)
+            names: Line item name and its alternative spellings, tried in order (case-insensitive)
             
-            # Fallback: If no specific column found, look for percentage in first data row
-            # This handles cases where column name doesn't match exactly
-            if target_column is None:
-                for data_row in rows[1:]:
-                    data_cells = data_row.find_all(['td', 'th'])
-                    # Skip first column (usually date), check others
-                    for i in range(1, min(len(data_cells), 5)):  # Check columns 1-4
-                        cell_text = data_cells[i].get_text(strip=True)
-                        # Check if it's a percentage (contains %)
-                        if '%' in cell_text:
-                            value = self.extract_number(cell_text)
-                            if value is not None and 0 <= value <= 100:
-                                return value
-        
-        # Strategy 2: Look for text patterns like "80.81%" in context
-        page_text = soup.get_text()
-        import re
-        # Look for percentage patterns
-        percentage_pattern = r'(\d+\.?\d*)\s*%'
-        matches = re.findall(percentage_pattern, page_text)
-        for match in matches:
-            try:
-                value = float(match)
-                if 0 <= value <= 100:  # Reasonable percentage
-                    return value
-            except ValueError:
-                continue
+        Returns:
+            {period: value}, empty if no name matches
+        """
+        rows = {name.lower(): values for name, values in matrix.items()}
+        for name in names:
+            if name.lower() in rows:
+                return rows[name.lower()]
+        return {}
+    
+    def _margin(self, numerator: Dict[str, float], revenue: Dict[str, float]) -> Optional[float]:
+        """Compute numerator / revenue x 100 for the latest period both rows have."""
+        periods = [period for period in numerator if revenue.get(period)]
+        if not periods:
+            return None
+        latest = max(periods)  # ISO dates sort chronologically
+        return (numerator[latest] / revenue[latest]) * 100
+    
+    def _parse_gross_margin(self, financials: Dict[str, Dict[str, float]]) -> Optional[float]:
+        """Compute the latest annual Gross Margin from the income statement matrix."""
+        revenue = self._line_item(financials, *REVENUE_ITEMS)
+        gross_profit = self._line_item(financials, "Gross Profit")
+        if not gross_profit:
+            cost_of_revenue = self._line_item(financials, "Cost Of Goods Sold", "Cost Of Revenue")
+            gross_profit = {
+                period: revenue[period] - cost
+                for period, cost in cost_of_revenue.items() if period in revenue
+            }
+        return self._margin(gross_profit, revenue)
+    
+    def _parse_fcf_margin(
+        self,
+        cash_flow: Dict[str, Dict[str, float]],
+        financials: Dict[str, Dict[str, float]]
+    ) -> Optional[float]:
+        """Compute the latest annual FCF Margin from the cash flow and income statement matrices."""
+        free_cash_flow = self._line_item(cash_flow, "Free Cash Flow")
+        # If not shown, Operating Cash Flow - Capital Expenditures
+        if not free_cash_flow:
+            operating_cf = self._line_item(cash_flow, *OPERATING_CASH_FLOW_ITEMS)
+            capex = self._line_item(cash_flow, *CAPEX_ITEMS)
+            free_cash_flow = {
+                period: value - abs(capex[period])  # Capex is usually negative
+                for period, value in operating_cf.items() if period in capex
+            }
+        
+        # FCF Margin = (Free Cash Flow / Revenue) × 100, same fiscal year for both
+        return self._margin(free_cash_flow, self._line_item(financials, *REVENUE_ITEMS))
+    
+    def get_statement(self, ticker: str, statement: str) -> Optional[Dict[str, Dict[str, float]]]:
+        """
+        Get a whole financial statement as a line item x period matrix.
         
-        return None
+        The matrix is kept in scraper_cache (same TTL as metrics), so each
+        statement page is downloaded at most once per TTL, whatever the
+        number of metrics computed from it.
+        
+        Args:
+            ticker: Stock ticker symbol (e.g., 'PLTR')
+            statement: Page name, one of STATEMENTS (e.g., 'cash-flow-statement')
+            
+        Returns:
+            {line item: {period: value}} (values in millions USD), or None if not available
+        """
+        ticker_upper = self.clean_ticker(ticker)
+        return self._get_cached_metric(
+            f"macrotrends_{statement}_{ticker_upper}",
+            lambda: self._get_metric_page(ticker_upper, statement),
+            self._parse_statement
+        )
+    
+    async def get_statement_async(self, ticker: str, statement: str) -> Optional[Dict[str, Dict[str, float]]]:
+        """Async version of get_statement (page downloaded on the event loop)."""
+        ticker_upper = self.clean_ticker(ticker)
+        return await self._get_cached_metric_async(
+            f"macrotrends_{statement}_{ticker_upper}",
+            lambda: self._get_metric_page_async(ticker_upper, statement),
+            self._parse_statement
+        )
+    
+    def _get_statements(self, ticker: str, *statements: str) -> Tuple[Optional[Dict[str, Dict[str, float]]], ...]:
+        """Get several statements, downloading the missing ones at the same time."""
+        # A cache refresh (scraper_cache.bypass()) must also skip the cache in the pool's threads
+        bypass = scraper_cache.bypassing()
+        
+        def load(statement):
+            with scraper_cache.bypass() if bypass else nullcontext():
+                return self.get_statement(ticker, statement)
+        
+        return tuple(_statement_pool.map(load, statements))
+    
+    async def _get_statements_async(self, ticker: str, *statements: str) -> Tuple[Optional[Dict[str, Dict[str, float]]], ...]:
+        """Async version of _get_statements."""
+        return tuple(await asyncio.gather(*(self.get_statement_async(ticker, s) for s in statements)))
     
     def get_gross_margin(self, ticker: str) -> Optional[float]:
         """
         Get Gross Margin percentage from Macrotrends.
         
+        Gross Margin = Gross Profit / Revenue × 100, for the last fiscal year
+        of the income statement (annual, see DATA_PERIOD_POLICY.md).
+        
         Uses caching to avoid repeated requests to the same ticker.
         
         Args:
@@ -140,25 +249,20 @@ class MacrotrendsScraper(BaseScraper):
             Returns None if not found or error occurs
         """
         ticker_upper = self.clean_ticker(ticker)
-        cache_key = f"macrotrends_gross_margin_{ticker_upper}"
-        
-        # Check cache first
-        cached_value = scraper_cache.get(cache_key)
-        if cached_value is not None:
-            return cached_value
-        
-        # Fetch from website
-        soup = self._get_metric_page(ticker_upper, "gross-margin")
-        if not soup:
-            return None
-        
-        # Find the latest value (pass metric name to help find correct column)
-        value = self._find_latest_value(soup, metric_name="Gross Margin")
-        if value is not None:
-            scraper_cache.set(cache_key, value)  # Cache the result
-            return value
-        
-        return None
+        return self._get_cached_metric(
+            f"macrotrends_gross_margin_{ticker_upper}",
+            lambda: self.get_statement(ticker_upper, "financial-statements"),
+            self._parse_gross_margin
+        )
+    
+    async def get_gross_margin_async(self, ticker: str) -> Optional[float]:
+        """Async version of get_gross_margin (page downloaded on the event loop)."""
+        ticker_upper = self.clean_ticker(ticker)
+        return await self._get_cached_metric_async(
+            f"macrotrends_gross_margin_{ticker_upper}",
+            lambda: self.get_statement_async(ticker_upper, "financial-statements"),
+            self._parse_gross_margin
+        )
     
     def get_fcf_margin(self, ticker: str) -> Optional[float]:
         """
@@ -171,7 +275,10 @@ class MacrotrendsScraper(BaseScraper):
         
         Data Sources:
         - Free Cash Flow: From cash-flow-statement page
-        - Revenue: From financial-statements page
+        - Revenue: From financial-statements page (same fiscal year)
+        
+        Both statements are downloaded at the same time, and the income
+        statement is shared with get_gross_margin.
         
         This calculated value will be compared with QuickFS and Koyfin values
         for verification. See MACROTRENDS_FCF_MARGIN.md for full documentation.
@@ -186,39 +293,17 @@ class MacrotrendsScraper(BaseScraper):
             Returns None if not found or error occurs
         """
         ticker_upper = self.clean_ticker(ticker)
-        cache_key = f"macrotrends_fcf_margin_{ticker_upper}"
-        
-        # Check cache first
-        cached_value = scraper_cache.get(cache_key)
-        if cached_value is not None:
-            return cached_value
-        
-        # Get Free Cash Flow from cash-flow-statement
-        cash_flow_soup = self._get_metric_page(ticker_upper, "cash-flow-statement")
-        free_cash_flow = None
-        if cash_flow_soup:
-            # Look for "Free Cash Flow" in the page
-            free_cash_flow = self._find_latest_value(cash_flow_soup, metric_name="Free Cash Flow")
-            # If not found, try "Operating Cash Flow" - "Capital Expenditures" (simplified)
-            if free_cash_flow is None:
-                operating_cf = self._find_latest_value(cash_flow_soup, metric_name="Operating Cash Flow")
-                capex = self._find_latest_value(cash_flow_soup, metric_name="Capital Expenditures")
-                if operating_cf is not None and capex is not None:
-                    free_cash_flow = operating_cf - abs(capex)  # Capex is usually negative
-        
-        # Get Revenue from financial-statements
-        financials_soup = self._get_metric_page(ticker_upper, "financial-statements")
-        revenue = None
-        if financials_soup:
-            revenue = self._find_latest_value(financials_soup, metric_name="Revenue")
-            if revenue is None:
-                revenue = self._find_latest_value(financials_soup, metric_name="Total Revenue")
-        
-        # Calculate FCF Margin = (Free Cash Flow / Revenue) × 100
-        if free_cash_flow is not None and revenue is not None and revenue != 0:
-            fcf_margin = (free_cash_flow / revenue) * 100
-            scraper_cache.set(cache_key, fcf_margin)
-            return fcf_margin
-        
-        return None
-
+        return self._get_cached_metric(
+            f"macrotrends_fcf_margin_{ticker_upper}",
+            lambda: self._get_statements(ticker_upper, "cash-flow-statement", "financial-statements"),
+            self._parse_fcf_margin
+        )
+    
+    async def get_fcf_margin_async(self, ticker: str) -> Optional[float]:
+        """Async version of get_fcf_margin (both pages are downloaded on the event loop)."""
+        ticker_upper = self.clean_ticker(ticker)
+        return await self._get_cached_metric_async(
+            f"macrotrends_fcf_margin_{ticker_upper}",
+            lambda: self._get_statements_async(ticker_upper, "cash-flow-statement", "financial-statements"),
+            self._parse_fcf_margin
+        )
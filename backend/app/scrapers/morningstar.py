@@ -13,19 +13,40 @@ IMPORTANT: This is web scraping, not an official API.
 - Cache results when possible to avoid repeated requests
 
 NOTE: Morningstar uses JavaScript to render table content, so we use Selenium
-to execute JavaScript and extract the rendered content.
+to execute JavaScript and extract the rendered content. When possible, values
+are read from the JSON responses the tables are built from (network capture,
+see network_capture.py) instead of the rendered HTML.
 """
 
 from typing import Optional
 from bs4 import BeautifulSoup
-from app.services.cache import scraper_cache
+from app.services.cache import MISSING, page_cache, scraper_cache
+from app.services.rate_limiter import rate_limiter
+from app.services.symbol_metadata import symbol_index
+from .base import parse_html
+from .browser_pool import DEFAULT_BLOCKED_URLS, browser_pool
+from .network_capture import NETWORK_CAPTURE, capture_json, capture_key, find_json_number
+from .page_wait import metric_value_present, wait_until_ready
 import re
-import time
-import undetected_chromedriver as uc
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.common.exceptions import TimeoutException, WebDriverException
+
+# Exchange used for tickers the symbol index doesn't know
+DEFAULT_EXCHANGE = "xnas"
+
+# Data API the key metrics tables are loaded from, and the JSON keys of our metrics (values in %)
+# Yearly lists follow the table columns (columnDefs): latest year first, like column 1 of the page
+DATA_URL_PATTERN = r"/sal-service/v1/stock/"
+GROSS_MARGIN_JSON_KEYS = ("grossMargin", "grossProfitMargin")
+JSON_NEWEST_FIRST = True
+
+# Requests not needed for the data (stylesheets, consent banner, video player, tracking)
+BLOCKED_URLS = DEFAULT_BLOCKED_URLS + [
+    "*.css", "*cookielaw.org*", "*onetrust*", "*brightcove*", "*jwplayer*",
+    "*tiqcdn.com*", "*tealium*", "*demdex.net*", "*omtrdc.net*", "*permutive*",
+]
+
+# Readiness predicates: the page is read as soon as the metric row shows a value
+GROSS_MARGIN_READY = metric_value_present("Gross Profit Margin")
+ROIC_READY = metric_value_present("Return on Invested Capital", "ROIC")
 
 
 class MorningstarScraper:
@@ -33,37 +54,12 @@ class MorningstarScraper:
     
     BASE_URL = "https://www.morningstar.com/stocks"
     
-    def __init__(self):
-        """Initialize Morningstar scraper with Selenium WebDriver."""
-        self._driver = None
-        self._last_request_time = 0
-        self._min_delay = 2  # Minimum delay between requests (seconds) - reduced for speed
+    # Values are read from the rendered tables only
+    PARSE_ONLY = "//table"
     
-    def _get_driver(self):
-        """Get or create undetected Chrome WebDriver instance (bypasses bot detection)."""
-        if self._driver is None:
-            try:
-                # Use undetected-chromedriver to bypass bot detection
-                options = uc.ChromeOptions()
-                # Use headless mode to avoid window popup and improve speed
-                options.add_argument('--headless=new')
-                options.add_argument('--no-sandbox')
-                options.add_argument('--disable-dev-shm-usage')
-                options.add_argument('--disable-gpu')
-                options.add_argument('--window-size=1920,1080')
-                options.add_argument('--disable-blink-features=AutomationControlled')
-                # Reduce resource usage
-                options.add_argument('--disable-extensions')
-                options.add_argument('--disable-plugins')
-                options.add_argument('--disable-images')  # Don't load images for speed
-                
-                self._driver = uc.Chrome(options=options, version_main=None, use_subprocess=True)
-            except Exception as e:
-                print(f"Error initializing undetected Chrome WebDriver: {e}")
-                print("Make sure Chrome is installed")
-                raise
-        
-        return self._driver
+    def __init__(self):
+        """Initialize Morningstar scraper (browsers come from the shared browser pool)."""
+        pass
     
     def clean_ticker(self, ticker: str) -> str:
         """Clean and uppercase ticker symbol."""
@@ -73,13 +69,11 @@ class MorningstarScraper:
         """
         Get exchange code from ticker.
         
-        For now, we'll assume most stocks are on NASDAQ (xnas).
-        In production, you might need to look up the exchange.
+        Exchanges come from the symbol metadata index (learned from Yahoo
+        Finance info, Morningstar redirects, or a bulk file). Unknown tickers
+        default to NASDAQ (xnas).
         """
-        # Common exchanges mapping
-        # Most tech stocks are on NASDAQ
-        # We can expand this later if needed
-        return "xnas"  # Default to NASDAQ
+        return symbol_index.exchange(ticker) or DEFAULT_EXCHANGE
     
     def _get_key_ratios_page_selenium(self, ticker: str) -> Optional[BeautifulSoup]:
         """
@@ -91,58 +85,28 @@ class MorningstarScraper:
         exchange = self._get_exchange(ticker_upper)
         url = f"{self.BASE_URL}/{exchange}/{ticker_upper.lower()}/key-ratios"
         
-        # Rate limiting
-        current_time = time.time()
-        time_since_last = current_time - self._last_request_time
-        if time_since_last < self._min_delay:
-            time.sleep(self._min_delay - time_since_last)
+        # Rendered pages are shared by all getters (one browser navigation per URL)
+        return page_cache.get_or_set(url, lambda: self._render_key_ratios_page(url))
+    
+    def _render_key_ratios_page(self, url: str) -> Optional[BeautifulSoup]:
+        """Load a key ratios page in a pooled browser and parse it (no caching)."""
+        # Rate limiting (shared by every scraper hitting this host)
+        rate_limiter.acquire(url)
         
-        driver = None
         try:
-            driver = self._get_driver()
-            
-            # Check if driver is still valid
-            try:
-                driver.current_url
-            except:
-                if self._driver:
-                    try:
-                        self._driver.quit()
-                    except:
-                        pass
-                self._driver = None
-                driver = self._get_driver()
-            
-            driver.get(url)
-            
-            # Wait for page to load
-            try:
-                WebDriverWait(driver, 10).until(
-                    lambda d: d.execute_script("return document.readyState") == "complete"
-                )
+            with browser_pool.driver(blocked_urls=BLOCKED_URLS) as driver:
+                driver.get(url)
+                # Morningstar redirects to the ticker's real exchange: remember it
+                symbol_index.learn_from_url(driver.current_url)
                 
-                # Wait for ROIC or table content
-                try:
-                    WebDriverWait(driver, 8).until(
-                        EC.any_of(
-                            EC.presence_of_element_located((By.XPATH, "//*[contains(text(), 'ROIC')]")),
-                            EC.presence_of_element_located((By.XPATH, "//*[contains(text(), 'Return on Invested Capital')]")),
-                            EC.presence_of_element_located((By.TAG_NAME, "table"))
-                        )
-                    )
-                except TimeoutException:
-                    print(f"Warning: Could not find ROIC or table on {url}")
-                    time.sleep(1)
+                # Wait until the ROIC row is rendered with a value
+                if not wait_until_ready(driver, ROIC_READY):
+                    print(f"Warning: Could not find ROIC value on {url}")
                 
-            except TimeoutException:
-                print(f"Timeout waiting for page to load on {url}")
-                time.sleep(2)
+                # Get page source after JavaScript execution
+                page_source = driver.page_source
             
-            # Get page source after JavaScript execution
-            page_source = driver.page_source
-            self._last_request_time = time.time()
-            
-            return BeautifulSoup(page_source, 'lxml')
+            return parse_html(page_source, self.PARSE_ONLY)
             
         except Exception as e:
             print(f"Error fetching Morningstar Key Ratios page with Selenium: {e}")
@@ -158,78 +122,57 @@ class MorningstarScraper:
         exchange = self._get_exchange(ticker_upper)
         url = f"{self.BASE_URL}/{exchange}/{ticker_upper.lower()}/key-metrics"
         
-        # Rate limiting
-        current_time = time.time()
-        time_since_last = current_time - self._last_request_time
-        if time_since_last < self._min_delay:
-            time.sleep(self._min_delay - time_since_last)
+        # Rendered pages are shared by all getters (one browser navigation per URL)
+        return page_cache.get_or_set(url, lambda: self._render_key_metrics_page(url))
+    
+    def _get_key_metrics_data(self, ticker: str) -> Optional[list]:
+        """
+        Capture the JSON responses of the key metrics page (network capture).
+        
+        Stops waiting as soon as a response with Gross Margin has arrived.
+        
+        Returns:
+            Captured payloads (empty if none came as JSON), or None if the page couldn't be loaded
+        """
+        ticker_upper = self.clean_ticker(ticker)
+        exchange = self._get_exchange(ticker_upper)
+        url = f"{self.BASE_URL}/{exchange}/{ticker_upper.lower()}/key-metrics"
+        
+        return page_cache.get_or_set(capture_key(url), lambda: capture_json(
+            url,
+            DATA_URL_PATTERN,
+            lambda payloads: find_json_number(payloads, GROSS_MARGIN_JSON_KEYS, JSON_NEWEST_FIRST) is not None,
+            parse_only=self.PARSE_ONLY,
+            blocked_urls=BLOCKED_URLS,
+            page_ready=GROSS_MARGIN_READY
+        ))
+    
+    def _render_key_metrics_page(self, url: str) -> Optional[BeautifulSoup]:
+        """Load a key metrics page in a pooled browser and parse it (no caching)."""
+        # Rate limiting (shared by every scraper hitting this host)
+        rate_limiter.acquire(url)
         
-        driver = None
         try:
-            driver = self._get_driver()
-            
-            # Check if driver is still valid
-            try:
-                driver.current_url
-            except:
-                # Driver closed, recreate it
-                if self._driver:
-                    try:
-                        self._driver.quit()
-                    except:
-                        pass
-                self._driver = None
-                driver = self._get_driver()
-            
-            driver.get(url)
-            
-            # Wait for page to load - try multiple strategies
-            try:
-                # Wait for any content to load (reduced timeout for speed)
-                WebDriverWait(driver, 10).until(
-                    lambda d: d.execute_script("return document.readyState") == "complete"
-                )
+            with browser_pool.driver(blocked_urls=BLOCKED_URLS) as driver:
+                driver.get(url)
+                # Morningstar redirects to the ticker's real exchange: remember it
+                symbol_index.learn_from_url(driver.current_url)
                 
-                # Try to find "Gross Profit Margin" text directly (faster than waiting for all tables)
-                try:
-                    WebDriverWait(driver, 8).until(
-                        EC.presence_of_element_located((By.XPATH, "//*[contains(text(), 'Gross Profit Margin')]"))
-                    )
-                except TimeoutException:
-                    # If not found, wait a bit and try table
-                    time.sleep(1)
-                    try:
-                        WebDriverWait(driver, 3).until(
-                            EC.presence_of_element_located((By.TAG_NAME, "table"))
-                        )
-                    except TimeoutException:
-                        print(f"Warning: Could not find 'Gross Profit Margin' or table on {url}")
-                        # Continue anyway, maybe it's there but selector is different
+                # Wait until the "Gross Profit Margin" row is rendered with a value
+                if not wait_until_ready(driver, GROSS_MARGIN_READY):
+                    print(f"Warning: Could not find 'Gross Profit Margin' value on {url}")
+                    # Continue anyway, maybe it's there but laid out differently
                 
-            except TimeoutException:
-                print(f"Timeout waiting for page to load on {url}")
-                # Continue anyway, try to get page source
-                time.sleep(2)
+                # Get page source after JavaScript execution
+                page_source = driver.page_source
             
-            # Get page source after JavaScript execution
-            page_source = driver.page_source
-            self._last_request_time = time.time()
-            
-            return BeautifulSoup(page_source, 'lxml')
+            return parse_html(page_source, self.PARSE_ONLY)
             
         except Exception as e:
             print(f"Error fetching Morningstar page with Selenium: {e}")
-            # Don't close driver on error, keep it for next request
+            # The pool discards the browser if the error came from Chrome itself
             return None
     
-    def __del__(self):
-        """Clean up WebDriver on deletion."""
-        if self._driver is not None:
-            try:
-                self._driver.quit()
-            except:
-                pass
-    
     def _find_table_row_value(self, soup: BeautifulSoup, row_label: str, column_index: int = 1) -> Optional[float]:
         """
         Find a value in a Morningstar financial table.
@@ -307,14 +250,25 @@ class MorningstarScraper:
         ticker_upper = self.clean_ticker(ticker)
         cache_key = f"morningstar_gross_margin_{ticker_upper}"
         
-        # Check cache first
-        cached_value = scraper_cache.get(cache_key)
-        if cached_value is not None:
+        # Check cache first (also returns known "not available"/"failed" results)
+        cached_value = scraper_cache.lookup(cache_key)
+        if cached_value is not MISSING:
             return cached_value
         
+        # Preferred: the JSON the Key Metrics tables are built from
+        if NETWORK_CAPTURE:
+            gross_margin = find_json_number(
+                self._get_key_metrics_data(ticker_upper), GROSS_MARGIN_JSON_KEYS, JSON_NEWEST_FIRST
+            )
+            if gross_margin is not None:
+                scraper_cache.set(cache_key, gross_margin)
+                return gross_margin
+        
         # Fetch Key Metrics page using Selenium (renders JavaScript)
+        # (already in page_cache if the capture above fell back to the rendered page)
         soup = self._get_key_metrics_page_selenium(ticker_upper)
         if not soup:
+            scraper_cache.set_failed(cache_key)
             return None
         
         # Look for "Gross Profit Margin %" in table
@@ -323,5 +277,6 @@ class MorningstarScraper:
             scraper_cache.set(cache_key, gross_margin)
             return gross_margin
         
+        scraper_cache.set_not_available(cache_key)
         return None
 
@@ -0,0 +1,249 @@
+"""
+Capture the JSON data of JavaScript pages from the browser's network traffic.
+
+Morningstar and QuickFS fill their tables from XHR/fetch JSON responses. Instead
+of waiting for the whole app to render, serializing page_source and re-parsing
+it with BeautifulSoup, we read those JSON responses directly from Chrome's
+DevTools (performance log + Network.getResponseBody) and stop as soon as the
+response carrying the data has arrived.
+
+If the data doesn't show up as JSON in time (e.g., the site changed its API),
+the rendered page of the same navigation is kept in page_cache, so the DOM
+parsers still work without loading the page a second time. If the page can't
+be loaded at all, that is remembered in page_cache too (failed entries), so the
+other getters of the page don't retry the navigation and the DOM fallback.
+
+Set GROSS_NETWORK_CAPTURE=0 to disable capture (DOM scraping only).
+"""
+
+from typing import Any, Callable, Iterable, List, Optional
+import base64
+import json
+import os
+import re
+import time
+from app.services.cache import page_cache
+from app.services.rate_limiter import rate_limiter
+from app.services.symbol_metadata import symbol_index
+from .base import parse_html
+from .browser_pool import browser_pool
+from .page_wait import wait_until_ready
+
+# Capture JSON responses before falling back to the rendered page
+NETWORK_CAPTURE = os.environ.get("GROSS_NETWORK_CAPTURE", "1") != "0"
+
+# Maximum time to wait for the data response after navigation, and polling interval (seconds)
+CAPTURE_TIMEOUT = 10
+POLL_INTERVAL = 0.1
+
+
+def capture_key(url: str) -> str:
+    """page_cache key of a page's captured payloads (the rendered page is cached under url)."""
+    return f"{url}#network"
+
+
+def _normalize_key(key: str) -> str:
+    """Normalize a JSON key for matching ("fcf_margin", "fcfMargin" -> "fcfmargin")."""
+    return re.sub(r'[^a-z0-9]', '', str(key).lower())
+
+
+def _latest_number(value: Any, newest_first: bool = False) -> Optional[float]:
+    """Read a number from a JSON value (the latest one of a yearly list, see find_json_number)."""
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    if isinstance(value, str):
+        try:
+            return float(value.replace(',', '').replace('%', '').strip())
+        except ValueError:
+            return None
+    if isinstance(value, list):
+        for item in (value if newest_first else reversed(value)):
+            number = _latest_number(item) if not isinstance(item, (list, dict)) else None
+            if number is not None:
+                return number
+    return None
+
+
+def find_json_number(
+    payloads: Optional[Iterable[Any]],
+    keys: Iterable[str],
+    newest_first: bool = False
+) -> Optional[float]:
+    """
+    Find a metric in captured JSON payloads.
+    
+    Searches every payload (nested dicts and lists) for the first key matching
+    one of keys (case and "_" insensitive), and reads its number.
+    
+    Yearly lists are read in the source's order, so the JSON and DOM paths of a
+    source return the same period: chronological by default (QuickFS, latest
+    last), or newest_first like the source's table columns (Morningstar).
+    
+    Args:
+        payloads: Captured JSON responses
+        keys: Metric keys, tried in order (e.g., ("grossMargin", "grossProfitMargin"))
+        newest_first: Yearly lists start with the latest year
+        
+    Returns:
+        Value (the latest one for a yearly list), or None if not found
+    """
+    if not payloads:
+        return None
+    
+    for key in keys:
+        wanted = _normalize_key(key)
+        stack = list(payloads)
+        while stack:
+            node = stack.pop(0)
+            if isinstance(node, dict):
+                for name, value in node.items():
+                    if _normalize_key(name) == wanted:
+                        number = _latest_number(value, newest_first)
+                        if number is not None:
+                            return number
+                stack.extend(v for v in node.values() if isinstance(v, (dict, list)))
+            elif isinstance(node, list):
+                stack.extend(v for v in node if isinstance(v, (dict, list)))
+    return None
+
+
+class NetworkCapture:
+    """Collects the JSON responses of a page whose URL matches a pattern (DevTools network events)."""
+    
+    def __init__(self, driver, url_pattern: str):
+        """
+        Initialize capture (call start() before navigating).
+        
+        Args:
+            driver: Chrome WebDriver with performance logging enabled (see browser_pool)
+            url_pattern: Regex matched against response URLs (e.g., r"/sal-service/v1/stock/")
+        """
+        self.driver = driver
+        self.pattern = re.compile(url_pattern)
+        self.payloads: List[Any] = []
+        self._pending = {}  # requestId -> URL of matching responses still downloading
+    
+    def start(self) -> None:
+        """Enable network events and drop the ones of the previous page."""
+        self.driver.execute_cdp_cmd("Network.enable", {})
+        self.driver.get_log("performance")
+    
+    def poll(self) -> int:
+        """
+        Read new network events and fetch the bodies of finished matching responses.
+        
+        Returns:
+            Number of new JSON payloads
+        """
+        new = 0
+        for entry in self.driver.get_log("performance"):
+            try:
+                message = json.loads(entry["message"])["message"]
+            except (KeyError, TypeError, ValueError):
+                continue
+            method = message.get("method")
+            params = message.get("params", {})
+            
+            if method == "Network.responseReceived":
+                response = params.get("response", {})
+                if self.pattern.search(response.get("url", "")) and "json" in response.get("mimeType", ""):
+                    self._pending[params.get("requestId")] = response.get("url")
+            elif method == "Network.loadingFinished" and params.get("requestId") in self._pending:
+                url = self._pending.pop(params["requestId"])
+                payload = self._read_body(params["requestId"], url)
+                if payload is not None:
+                    self.payloads.append(payload)
+                    new += 1
+        return new
+    
+    def _read_body(self, request_id: str, url: str) -> Any:
+        """Get a response body from Chrome and decode its JSON (None if unavailable)."""
+        try:
+            result = self.driver.execute_cdp_cmd("Network.getResponseBody", {"requestId": request_id})
+            body = result.get("body", "")
+            if result.get("base64Encoded"):
+                body = base64.b64decode(body)
+            return json.loads(body)
+        except Exception as e:
+            print(f"Could not read response body of {url}: {e}")
+            return None
+    
+    def wait_until(self, ready: Callable[[List[Any]], bool], timeout: float, interval: float = POLL_INTERVAL) -> bool:
+        """
+        Poll network events until ready(payloads) is true.
+        
+        Args:
+            ready: Checks the payloads captured so far (e.g., "has a grossMargin")
+            timeout: Maximum time to wait (seconds)
+            interval: Time between polls (seconds)
+            
+        Returns:
+            True if ready, False on timeout
+        """
+        deadline = time.monotonic() + timeout
+        while True:
+            self.poll()
+            if ready(self.payloads):
+                return True
+            if time.monotonic() >= deadline:
+                return False
+            time.sleep(interval)
+
+
+def capture_json(
+    url: str,
+    url_pattern: str,
+    ready: Callable[[List[Any]], bool],
+    timeout: float = CAPTURE_TIMEOUT,
+    parse_only: Optional[str] = None,
+    blocked_urls: Optional[List[str]] = None,
+    page_ready: Optional[Callable[[Any], bool]] = None
+) -> Optional[List[Any]]:
+    """
+    Load a page in a pooled browser and capture its JSON data responses.
+    
+    Returns as soon as ready(payloads) is true. On timeout, the rendered page
+    (once page_ready says so) is parsed and stored in page_cache under url,
+    for the DOM parsers. If the page can't be loaded, url and capture_key(url)
+    are cached as failed, so no other getter loads it again for a while.
+    
+    Args:
+        url: Page URL
+        url_pattern: Regex of the data response URLs
+        ready: Checks if the captured payloads contain the needed data
+        timeout: Maximum time to wait for the data after navigation (seconds)
+        parse_only: PARSE_ONLY XPath used when falling back to the rendered page
+        blocked_urls: URL patterns not to load (see browser_pool.block_urls)
+        page_ready: Readiness predicate of the rendered page (see page_wait), checked before
+            keeping it on timeout
+        
+    Returns:
+        Captured payloads (possibly empty), or None if the page couldn't be loaded
+    """
+    # Rate limiting (shared by every scraper hitting this host)
+    rate_limiter.acquire(url)
+    
+    try:
+        with browser_pool.driver(blocked_urls=blocked_urls) as driver:
+            capture = NetworkCapture(driver, url_pattern)
+            capture.start()
+            driver.get(url)
+            if driver.current_url != url:
+                # Redirected (e.g., Morningstar exchange): build the right URL next time
+                symbol_index.learn_from_url(driver.current_url)
+            
+            if capture.wait_until(ready, timeout):
+                return capture.payloads
+            
+            print(f"Warning: data response not captured on {url}, using the rendered page")
+            if page_ready is not None and not wait_until_ready(driver, page_ready):
+                print(f"Warning: rendered page of {url} not ready either")
+            page_cache.set(url, parse_html(driver.page_source, parse_only))
+            return capture.payloads
+    except Exception as e:
+        print(f"Error capturing network data of {url}: {e}")
+        page_cache.set_failed(capture_key(url))
+        page_cache.set_failed(url)
+        return None
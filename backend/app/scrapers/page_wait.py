@@ -0,0 +1,84 @@
+"""
+Wait for the data of a JavaScript page, not for the page.
+
+The browsers load pages with the "eager" page load strategy (see browser_pool):
+driver.get() returns once the HTML is parsed, without waiting for images,
+iframes and third-party scripts. Each source then declares a readiness
+predicate (e.g., "the Gross Profit Margin row shows a number") that is polled
+every POLL_INTERVAL seconds, so page_source is read the moment the data is
+rendered instead of after fixed sleeps.
+"""
+
+from typing import Any, Callable
+import time
+from selenium.common.exceptions import WebDriverException
+
+# Maximum time to wait for the data after navigation, and polling interval (seconds)
+READY_TIMEOUT = 15
+POLL_INTERVAL = 0.1
+
+# True if an element containing one of the labels (arguments[0], lowercase) is
+# followed by a number in its table row (or, outside tables, in its container)
+METRIC_VALUE_SCRIPT = """
+const labels = arguments[0];
+if (!document.body) return false;
+const walker = document.createTreeWalker(document.body, NodeFilter.SHOW_TEXT);
+while (walker.nextNode()) {
+    const text = walker.currentNode.textContent.toLowerCase();
+    const label = labels.find(l => text.includes(l));
+    const element = walker.currentNode.parentElement;
+    if (!label || !element) continue;
+    const container = element.closest('tr, [role="row"]') || element.parentElement || element;
+    const rest = container.textContent.toLowerCase().split(label).slice(1).join(label);
+    if (/\\d/.test(rest)) return true;
+}
+return false;
+"""
+
+
+def metric_value_present(*labels: str) -> Callable[[Any], bool]:
+    """
+    Readiness predicate: one of the metric labels is shown with a value.
+    
+    Args:
+        labels: Metric labels as displayed (e.g., "Gross Profit Margin"), case-insensitive
+        
+    Returns:
+        Predicate taking a WebDriver
+    """
+    lowercase_labels = [label.lower() for label in labels]
+    
+    def ready(driver) -> bool:
+        return bool(driver.execute_script(METRIC_VALUE_SCRIPT, lowercase_labels))
+    
+    return ready
+
+
+def wait_until_ready(
+    driver,
+    ready: Callable[[Any], bool],
+    timeout: float = READY_TIMEOUT,
+    interval: float = POLL_INTERVAL
+) -> bool:
+    """
+    Poll a readiness predicate until it is true.
+    
+    Args:
+        driver: WebDriver (after driver.get())
+        ready: Readiness predicate of the source (e.g., metric_value_present("ROIC"))
+        timeout: Maximum time to wait (seconds)
+        interval: Time between polls (seconds)
+        
+    Returns:
+        True if ready, False on timeout
+    """
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            if ready(driver):
+                return True
+        except WebDriverException:
+            pass  # Page still navigating (JavaScript context being replaced)
+        if time.monotonic() >= deadline:
+            return False
+        time.sleep(interval)
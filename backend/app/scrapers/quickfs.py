@@ -9,18 +9,32 @@ IMPORTANT: This is web scraping, not an official API.
 - Cache results when possible to avoid repeated requests
 
 NOTE: QuickFS uses JavaScript to render content, so we use Selenium
-to execute JavaScript and extract the rendered content.
+to execute JavaScript and extract the rendered content. When possible, values
+are read from the JSON responses the page is built from (network capture,
+see network_capture.py) instead of the rendered HTML.
 """
 
 from typing import Optional
 from bs4 import BeautifulSoup
-from app.services.cache import scraper_cache
-import time
-import undetected_chromedriver as uc
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.common.exceptions import TimeoutException, WebDriverException
+from app.services.cache import MISSING, page_cache, scraper_cache
+from app.services.rate_limiter import rate_limiter
+from .browser_pool import DEFAULT_BLOCKED_URLS, browser_pool
+from .network_capture import NETWORK_CAPTURE, capture_json, capture_key, find_json_number
+from .page_wait import metric_value_present, wait_until_ready
+
+
+# Data API the company page is loaded from, and the JSON keys of our metrics
+# (the API always gives ratios as fractions: 0.25 = 25%, 0.012 = 1.2%)
+DATA_URL_PATTERN = r"(api\.quickfs\.net|quickfs\.net/api)/"
+ROIC_JSON_KEYS = ("roic",)
+FCF_MARGIN_JSON_KEYS = ("fcf_margin",)
+JSON_PERCENT_SCALE = 100
+
+# Requests not needed for the data (stylesheets, payment and support widgets)
+BLOCKED_URLS = DEFAULT_BLOCKED_URLS + ["*.css", "*stripe.com*", "*intercom*", "*crisp.chat*"]
+
+# Readiness predicate: the page is read as soon as the ROIC row shows a value
+ROIC_READY = metric_value_present("Return on Invested Capital", "ROIC")
 
 
 class QuickFSScraper:
@@ -29,34 +43,8 @@ class QuickFSScraper:
     BASE_URL = "https://quickfs.net/company"
     
     def __init__(self):
-        """Initialize QuickFS scraper with Selenium WebDriver."""
-        self._driver = None
-        self._last_request_time = 0
-        self._min_delay = 2  # Minimum delay between requests (seconds)
-    
-    def _get_driver(self):
-        """Get or create undetected Chrome WebDriver instance (bypasses bot detection)."""
-        if self._driver is None:
-            try:
-                # Use undetected-chromedriver to bypass bot detection
-                options = uc.ChromeOptions()
-                options.add_argument('--headless=new')
-                options.add_argument('--no-sandbox')
-                options.add_argument('--disable-dev-shm-usage')
-                options.add_argument('--disable-gpu')
-                options.add_argument('--window-size=1920,1080')
-                options.add_argument('--disable-blink-features=AutomationControlled')
-                options.add_argument('--disable-extensions')
-                options.add_argument('--disable-plugins')
-                options.add_argument('--disable-images')
-                
-                self._driver = uc.Chrome(options=options, version_main=None, use_subprocess=True)
-            except Exception as e:
-                print(f"Error initializing undetected Chrome WebDriver: {e}")
-                print("Make sure Chrome is installed")
-                raise
-        
-        return self._driver
+        """Initialize QuickFS scraper (browsers come from the shared browser pool)."""
+        pass
     
     def clean_ticker(self, ticker: str) -> str:
         """Clean and uppercase ticker symbol."""
@@ -91,58 +79,53 @@ class QuickFSScraper:
         ticker_upper = self.clean_ticker(ticker)
         url = f"{self.BASE_URL}/{ticker_upper}"
         
-        # Rate limiting
-        current_time = time.time()
-        time_since_last = current_time - self._last_request_time
-        if time_since_last < self._min_delay:
-            time.sleep(self._min_delay - time_since_last)
+        # Rendered pages are shared by all getters (one browser navigation per URL)
+        return page_cache.get_or_set(url, lambda: self._render_company_page(url))
+    
+    def _get_company_data(self, ticker: str) -> Optional[list]:
+        """
+        Capture the JSON responses of the company page (network capture).
+        
+        Stops waiting as soon as a response with both ROIC and FCF Margin has arrived.
+        
+        Returns:
+            Captured payloads (empty if none came as JSON), or None if the page couldn't be loaded
+        """
+        ticker_upper = self.clean_ticker(ticker)
+        url = f"{self.BASE_URL}/{ticker_upper}"
+        
+        return page_cache.get_or_set(capture_key(url), lambda: capture_json(
+            url,
+            DATA_URL_PATTERN,
+            lambda payloads: all(
+                find_json_number(payloads, keys) is not None for keys in (ROIC_JSON_KEYS, FCF_MARGIN_JSON_KEYS)
+            ),
+            blocked_urls=BLOCKED_URLS,
+            page_ready=ROIC_READY
+        ))
+    
+    def _find_json_metric(self, ticker: str, keys: tuple) -> Optional[float]:
+        """Read a metric from the captured company data (as a percentage), None if not captured."""
+        if not NETWORK_CAPTURE:
+            return None
+        value = find_json_number(self._get_company_data(ticker), keys)
+        return value * JSON_PERCENT_SCALE if value is not None else None
+    
+    def _render_company_page(self, url: str) -> Optional[BeautifulSoup]:
+        """Load a company page in a pooled browser and parse it (no caching)."""
+        # Rate limiting (shared by every scraper hitting this host)
+        rate_limiter.acquire(url)
         
-        driver = None
         try:
-            driver = self._get_driver()
-            
-            # Check if driver is still valid
-            try:
-                driver.current_url
-            except:
-                if self._driver:
-                    try:
-                        self._driver.quit()
-                    except:
-                        pass
-                self._driver = None
-                driver = self._get_driver()
-            
-            driver.get(url)
-            
-            # Wait for page to load
-            try:
-                WebDriverWait(driver, 10).until(
-                    lambda d: d.execute_script("return document.readyState") == "complete"
-                )
-                
-                # Wait for JavaScript to render content
-                time.sleep(3)
+            with browser_pool.driver(blocked_urls=BLOCKED_URLS) as driver:
+                driver.get(url)
                 
-                # Try to find "ROIC" or "Return on Invested Capital" text
-                try:
-                    WebDriverWait(driver, 8).until(
-                        EC.any_of(
-                            EC.presence_of_element_located((By.XPATH, "//*[contains(text(), 'ROIC')]")),
-                            EC.presence_of_element_located((By.XPATH, "//*[contains(text(), 'Return on Invested Capital')]"))
-                        )
-                    )
-                except TimeoutException:
-                    print(f"Warning: Could not find ROIC on {url}")
-                    # Continue anyway
+                # Wait until the ROIC row is rendered with a value (no fixed sleeps)
+                if not wait_until_ready(driver, ROIC_READY):
+                    print(f"Warning: Could not find ROIC value on {url}")
                 
-            except TimeoutException:
-                print(f"Timeout waiting for page to load on {url}")
-                time.sleep(2)
-            
-            # Get page source after JavaScript execution
-            page_source = driver.page_source
-            self._last_request_time = time.time()
+                # Get page source after JavaScript execution
+                page_source = driver.page_source
             
             return BeautifulSoup(page_source, 'lxml')
             
@@ -150,14 +133,6 @@ class QuickFSScraper:
             print(f"Error fetching QuickFS page with Selenium: {e}")
             return None
     
-    def __del__(self):
-        """Clean up WebDriver on deletion."""
-        if self._driver is not None:
-            try:
-                self._driver.quit()
-            except:
-                pass
-    
     def _find_metric_value(self, soup: BeautifulSoup, metric_label: str) -> Optional[float]:
         """
         Find a metric value in the QuickFS company page.
@@ -246,14 +221,21 @@ class QuickFSScraper:
         ticker_upper = self.clean_ticker(ticker)
         cache_key = f"quickfs_roic_{ticker_upper}"
         
-        # Check cache first
-        cached_value = scraper_cache.get(cache_key)
-        if cached_value is not None:
+        # Check cache first (also returns known "not available"/"failed" results)
+        cached_value = scraper_cache.lookup(cache_key)
+        if cached_value is not MISSING:
             return cached_value
         
+        # Preferred: the JSON the company page is built from
+        value = self._find_json_metric(ticker_upper, ROIC_JSON_KEYS)
+        if value is not None:
+            scraper_cache.set(cache_key, value)
+            return value
+        
         # Fetch from website using Selenium (renders JavaScript)
         soup = self._get_company_page_selenium(ticker_upper)
         if not soup:
+            scraper_cache.set_failed(cache_key)
             return None
         
         # Try different label variations (prioritize full label to avoid false matches)
@@ -269,6 +251,7 @@ class QuickFSScraper:
             scraper_cache.set(cache_key, value)
             return value
         
+        scraper_cache.set_not_available(cache_key)
         return None
     
     def get_fcf_margin(self, ticker: str) -> Optional[float]:
@@ -289,14 +272,21 @@ class QuickFSScraper:
         ticker_upper = self.clean_ticker(ticker)
         cache_key = f"quickfs_fcf_margin_{ticker_upper}"
         
-        # Check cache first
-        cached_value = scraper_cache.get(cache_key)
-        if cached_value is not None:
+        # Check cache first (also returns known "not available"/"failed" results)
+        cached_value = scraper_cache.lookup(cache_key)
+        if cached_value is not MISSING:
             return cached_value
         
+        # Preferred: the JSON the company page is built from
+        value = self._find_json_metric(ticker_upper, FCF_MARGIN_JSON_KEYS)
+        if value is not None:
+            scraper_cache.set(cache_key, value)
+            return value
+        
         # Fetch from website using Selenium (renders JavaScript)
         soup = self._get_company_page_selenium(ticker_upper)
         if not soup:
+            scraper_cache.set_failed(cache_key)
             return None
         
         # Try different label variations
@@ -310,5 +300,6 @@ class QuickFSScraper:
             scraper_cache.set(cache_key, value)
             return value
         
+        scraper_cache.set_not_available(cache_key)
         return None
 
@@ -0,0 +1,84 @@
+"""
+Application-lifetime scraper instances.
+
+Scrapers used to be created for every analysis, so each request started with a
+new requests.Session (new TCP/TLS connections to every site). The registry
+creates one instance of each scraper, shared by all analyses, so keep-alive
+connections are reused. Scrapers hold no per-request state (caching and rate
+limiting are process-wide), so sharing them between threads is safe.
+
+The FastAPI lifespan in app/main.py starts the registry on startup and shuts it
+down (closing HTTP sessions) on exit. Outside the app (scripts, tests), the
+scrapers are created on first use.
+"""
+
+from typing import Any, Callable, Dict, Optional
+import threading
+from .finviz import FinvizScraper
+from .koyfin import KoyfinScraper
+from .macrotrends import MacrotrendsScraper
+from .morningstar import MorningstarScraper
+from .quickfs import QuickFSScraper
+from .yahoo import YahooScraper
+
+
+# Scraper classes by registry name
+SCRAPER_CLASSES: Dict[str, Callable[[], Any]] = {
+    "finviz": FinvizScraper,
+    "yahoo": YahooScraper,
+    "macrotrends": MacrotrendsScraper,
+    "morningstar": MorningstarScraper,
+    "quickfs": QuickFSScraper,
+    "koyfin": KoyfinScraper,
+}
+
+
+class ScraperRegistry:
+    """One shared instance of each scraper."""
+    
+    def __init__(self, scraper_classes: Optional[Dict[str, Callable[[], Any]]] = None):
+        """
+        Initialize registry (no scraper is created until start() or first use).
+        
+        Args:
+            scraper_classes: Scraper factories by name (default: SCRAPER_CLASSES)
+        """
+        self.scraper_classes = scraper_classes or SCRAPER_CLASSES
+        self._scrapers: Optional[Dict[str, Any]] = None
+        self._lock = threading.Lock()
+    
+    def start(self) -> None:
+        """Create all scrapers (call at app startup; does nothing if already started)."""
+        with self._lock:
+            if self._scrapers is None:
+                self._scrapers = {name: factory() for name, factory in self.scraper_classes.items()}
+    
+    def get(self, name: str) -> Any:
+        """
+        Get the shared scraper instance for a source.
+        
+        Args:
+            name: Registry name (e.g., "finviz", "quickfs")
+            
+        Returns:
+            Scraper instance
+        """
+        scrapers = self._scrapers
+        if scrapers is None:
+            self.start()
+            scrapers = self._scrapers
+        return scrapers[name]
+    
+    def shutdown(self) -> None:
+        """Close HTTP sessions and forget the scrapers (they are recreated on next use)."""
+        with self._lock:
+            scrapers = self._scrapers or {}
+            self._scrapers = None
+        for scraper in scrapers.values():
+            session = getattr(scraper, "session", None)
+            if session is not None:
+                session.close()
+
+
+# Global registry used by the ratio fetcher
+scraper_registry = ScraperRegistry()
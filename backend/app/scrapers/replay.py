@@ -0,0 +1,484 @@
+"""
+Record/replay of the scrapers' network traffic (cassettes), for offline load tests.
+
+Load-testing the analyses against the real sites would hammer Finviz,
+Macrotrends, Morningstar, QuickFS and Yahoo, and give numbers that depend on
+their mood that day. Instead, the traffic of real runs is recorded once into
+cassettes, then replayed with an injected latency:
+- HTTP pages (requests sessions and the async httpx client): one cassette per
+  URL, redirects included (each hop is recorded)
+- Browser pages (browser pool): the page source and the JSON responses read
+  by network capture, for each navigated URL
+- yfinance datasets (info and financials of a ticker)
+
+In replay mode nothing leaves the machine: the browser pool hands out replay
+drivers instead of starting Chrome, and a request with no cassette fails like
+a network error. Everything above that layer (rate limiting, caches, the
+executor and its per-source limits, parsing) runs for real.
+
+Configuration (environment):
+- GROSS_REPLAY_MODE: "record" (real traffic, saved) or "replay" (cassettes only); unset = off
+- GROSS_CASSETTE_DIR: cassette folder (default: backend/.cache/cassettes)
+- GROSS_REPLAY_LATENCY: seconds added to each replayed call, for all kinds
+  ("0.3") or per kind ("http=0.3,browser=4,yahoo=0.5")
+  
+See benchmarks/load_test.py for the load test built on the replay mode.
+"""
+
+from typing import Any, Callable, Dict, List, Optional, Set
+import asyncio
+import base64
+import hashlib
+import io
+import json
+import os
+import re
+import threading
+import time
+import httpx
+import pandas as pd
+import requests
+from requests.adapters import HTTPAdapter
+from selenium.common.exceptions import WebDriverException
+from urllib3.response import HTTPResponse
+
+OFF = "off"
+RECORD = "record"
+REPLAY = "replay"
+
+# Kinds of recorded calls (cassette sub-folders)
+KINDS = ("http", "browser", "yahoo")
+
+REPLAY_MODE = os.environ.get("GROSS_REPLAY_MODE", OFF) or OFF
+CASSETTE_DIR = os.environ.get(
+    "GROSS_CASSETTE_DIR",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), ".cache", "cassettes")
+)
+REPLAY_LATENCY = os.environ.get("GROSS_REPLAY_LATENCY", "0")
+
+# Response headers kept in HTTP cassettes (bodies are stored decoded, so no encoding/length headers)
+KEPT_HEADERS = ("content-type", "location")
+
+
+def parse_latency(spec: str) -> Dict[str, float]:
+    """
+    Parse a latency setting.
+    
+    Args:
+        spec: Seconds for every kind ("0.3"), or per kind ("http=0.3,browser=4");
+              kinds not listed get no latency
+              
+    Returns:
+        Seconds by kind
+        
+    Raises:
+        ValueError: If the setting can't be parsed or names an unknown kind
+    """
+    spec = (spec or "").strip()
+    if not spec:
+        return {kind: 0.0 for kind in KINDS}
+    if "=" not in spec:
+        return {kind: float(spec) for kind in KINDS}
+    latency = {kind: 0.0 for kind in KINDS}
+    for part in spec.split(","):
+        if not part.strip():
+            continue
+        kind, _, seconds = part.partition("=")
+        kind = kind.strip().lower()
+        if kind not in KINDS:
+            raise ValueError(f"Unknown replay latency kind: {kind} (expected one of {', '.join(KINDS)})")
+        latency[kind] = float(seconds)
+    return latency
+
+
+def _encode_body(body: bytes) -> Dict[str, str]:
+    """Store a body as text when it is UTF-8 (readable cassettes), base64 otherwise."""
+    try:
+        return {"body": body.decode("utf-8"), "encoding": "utf-8"}
+    except UnicodeDecodeError:
+        return {"body": base64.b64encode(body).decode("ascii"), "encoding": "base64"}
+
+
+def _decode_body(entry: Dict[str, Any]) -> bytes:
+    """Body of an HTTP cassette, as bytes."""
+    if entry.get("encoding") == "base64":
+        return base64.b64decode(entry["body"])
+    return entry.get("body", "").encode("utf-8")
+
+
+def _encode_yahoo(value: Any) -> Dict[str, Any]:
+    """JSON form of a yfinance dataset (info dict or financials DataFrame)."""
+    if isinstance(value, pd.DataFrame):
+        return {
+            "type": "dataframe",
+            "index": [str(label) for label in value.index],
+            "columns": [column.isoformat() if hasattr(column, "isoformat") else str(column) for column in value.columns],
+            "data": value.astype(object).where(value.notna(), None).values.tolist(),
+        }
+    return {"type": "json", "data": value}
+
+
+def _decode_yahoo(entry: Dict[str, Any]) -> Any:
+    """Rebuild a yfinance dataset from its cassette."""
+    if entry.get("type") != "dataframe":
+        return entry.get("data")
+    columns = entry["columns"]
+    try:
+        columns = pd.to_datetime(columns)
+    except (ValueError, TypeError):
+        pass
+    frame = pd.DataFrame(entry["data"], index=entry["index"], columns=columns)
+    try:
+        return frame.astype(float)
+    except (ValueError, TypeError):
+        return frame
+
+
+class CassetteStore:
+    """Recorded calls on disk (one JSON file per call), and the replay settings."""
+    
+    def __init__(self, mode: str = REPLAY_MODE, directory: str = CASSETTE_DIR, latency: str = REPLAY_LATENCY):
+        """
+        Initialize store (nothing is read until a call is replayed).
+        
+        Args:
+            mode: OFF, RECORD or REPLAY
+            directory: Cassette folder
+            latency: Injected latency setting (see parse_latency)
+        """
+        self._lock = threading.Lock()
+        self._aliases: Dict[str, str] = {}
+        self.misses: Set[str] = set()  # Replayed calls with no cassette
+        self.configure(mode, directory, latency)
+    
+    def configure(self, mode: Optional[str] = None, directory: Optional[str] = None, latency: Optional[str] = None) -> None:
+        """
+        Change the settings (e.g., from a load test script); None keeps the current value.
+        
+        Raises:
+            ValueError: If mode or latency is invalid
+        """
+        if mode is not None:
+            if mode not in (OFF, RECORD, REPLAY):
+                raise ValueError(f"Unknown replay mode: {mode} (expected {OFF}, {RECORD} or {REPLAY})")
+            self.mode = mode
+        if directory is not None:
+            self.directory = directory
+        if latency is not None:
+            self.latency = parse_latency(latency)
+        self._loaded: Dict[str, Optional[Dict[str, Any]]] = {}  # Cassettes read so far (replay)
+    
+    @property
+    def recording(self) -> bool:
+        """Real traffic is saved to cassettes."""
+        return self.mode == RECORD
+    
+    @property
+    def replaying(self) -> bool:
+        """Calls are answered from cassettes only."""
+        return self.mode == REPLAY
+    
+    def alias(self, ticker: str, recorded: str) -> None:
+        """
+        Replay a recorded ticker's cassettes for another ticker (load tests with many distinct tickers).
+        
+        Args:
+            ticker: Ticker requested (e.g., "LT0001")
+            recorded: Ticker whose cassettes answer (e.g., "PLTR")
+        """
+        with self._lock:
+            # URLs may have the ticker lower-cased (e.g., Morningstar)
+            self._aliases[ticker.upper()] = recorded.upper()
+            self._aliases[ticker.lower()] = recorded.lower()
+    
+    def _resolve(self, key: str) -> str:
+        """Rewrite aliased tickers in a cassette key."""
+        return re.sub(r"[A-Za-z0-9]+", lambda match: self._aliases.get(match.group(), match.group()), key)
+    
+    def path(self, kind: str, key: str) -> str:
+        """File of a cassette (key: URL, or "TICKER/attribute" for yfinance)."""
+        digest = hashlib.sha1(key.encode("utf-8")).hexdigest()[:20]
+        return os.path.join(self.directory, kind, f"{digest}.json")
+    
+    def load(self, kind: str, key: str) -> Optional[Dict[str, Any]]:
+        """
+        Read a cassette (kept in memory after the first read).
+        
+        Returns:
+            Recorded entry, or None if there is none (also recorded in misses while replaying)
+        """
+        key = self._resolve(key) if self._aliases else key
+        path = self.path(kind, key)
+        with self._lock:
+            if path in self._loaded:
+                entry = self._loaded[path]
+            else:
+                try:
+                    with open(path) as f:
+                        entry = json.load(f)
+                except (OSError, ValueError):
+                    entry = None
+                if self.replaying:
+                    self._loaded[path] = entry
+            if entry is None and self.replaying:
+                self.misses.add(f"{kind} {key}")
+        return entry
+    
+    def save(self, kind: str, key: str, entry: Dict[str, Any]) -> None:
+        """Write a cassette (replaces the previous recording of the same call)."""
+        path = self.path(kind, key)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with self._lock:
+                with open(path, "w") as f:
+                    json.dump(dict(entry, key=key), f, indent=1)
+                self._loaded.pop(path, None)
+        except (OSError, TypeError, ValueError) as e:
+            print(f"Could not record {kind} cassette for {key}: {e}")
+    
+    def delay(self, kind: str) -> None:
+        """Injected latency of a replayed call (blocking)."""
+        seconds = self.latency.get(kind, 0.0)
+        if seconds > 0:
+            time.sleep(seconds)
+    
+    async def delay_async(self, kind: str) -> None:
+        """Injected latency of a replayed call (awaited)."""
+        seconds = self.latency.get(kind, 0.0)
+        if seconds > 0:
+            await asyncio.sleep(seconds)
+    
+    def record_http(self, url: str, status: int, headers: Any, body: bytes) -> None:
+        """Save one HTTP response (one hop of a redirect chain)."""
+        kept = {name: headers[name] for name in KEPT_HEADERS if headers.get(name) is not None}
+        self.save("http", url, dict(_encode_body(body), status=status, headers=kept))
+    
+    def record_browser_page(self, url: str, page_source: str, responses: List[Dict[str, str]], final_url: Optional[str] = None) -> None:
+        """
+        Save one browser page.
+        
+        Args:
+            url: URL navigated to
+            page_source: Rendered HTML
+            responses: JSON responses read by network capture ({"url", "mime_type", "body"})
+            final_url: URL after redirects (default: url)
+        """
+        self.save("browser", url, {"final_url": final_url or url, "page_source": page_source, "responses": responses})
+    
+    def async_transport(self, http2: bool, limits: httpx.Limits) -> Optional[httpx.AsyncBaseTransport]:
+        """
+        httpx transport for the current mode.
+        
+        Returns:
+            Replay or recording transport, or None when off (httpx's default transport)
+        """
+        if self.replaying:
+            return ReplayTransport(self)
+        if self.recording:
+            return RecordingTransport(self, httpx.AsyncHTTPTransport(http2=http2, limits=limits))
+        return None
+    
+    def call_yfinance(self, ticker: str, attribute: str, load: Callable[[], Any]) -> Any:
+        """
+        Load a yfinance dataset through the cassettes.
+        
+        Args:
+            ticker: Clean ticker symbol
+            attribute: yf.Ticker attribute ("info" or "financials")
+            load: Real yfinance call (not called while replaying)
+            
+        Returns:
+            The dataset
+            
+        Raises:
+            LookupError: If replaying and the call was never recorded
+        """
+        key = f"{ticker}/{attribute}"
+        if self.replaying:
+            self.delay("yahoo")
+            entry = self.load("yahoo", key)
+            if entry is None:
+                raise LookupError(f"No recorded yfinance call for {key}")
+            return _decode_yahoo(entry)
+        value = load()
+        if self.recording:
+            self.record_yfinance(ticker, attribute, value)
+        return value
+    
+    def record_yfinance(self, ticker: str, attribute: str, value: Any) -> None:
+        """Save one yfinance dataset (info dict or financials DataFrame)."""
+        self.save("yahoo", f"{ticker}/{attribute}", _encode_yahoo(value))
+
+
+class CassetteAdapter(HTTPAdapter):
+    """requests adapter of the scrapers' sessions: real traffic, recorded or replayed depending on the mode."""
+    
+    def send(self, request, **kwargs):
+        """Send one request (one hop: the session follows redirects)."""
+        if cassettes.replaying:
+            cassettes.delay("http")
+            entry = cassettes.load("http", request.url)
+            if entry is None:
+                raise requests.ConnectionError(f"No recorded response for {request.url}", request=request)
+            raw = HTTPResponse(
+                body=io.BytesIO(_decode_body(entry)),
+                headers=entry.get("headers", {}),
+                status=entry.get("status", 200),
+                preload_content=False,
+                decode_content=False
+            )
+            return self.build_response(request, raw)
+        
+        response = super().send(request, **kwargs)
+        if cassettes.recording:
+            cassettes.record_http(request.url, response.status_code, response.headers, response.content)
+        return response
+
+
+class ReplayTransport(httpx.AsyncBaseTransport):
+    """httpx transport answering from the HTTP cassettes."""
+    
+    def __init__(self, store: CassetteStore):
+        self.store = store
+    
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        await self.store.delay_async("http")
+        entry = self.store.load("http", str(request.url))
+        if entry is None:
+            raise httpx.ConnectError(f"No recorded response for {request.url}", request=request)
+        return httpx.Response(
+            entry.get("status", 200),
+            headers=entry.get("headers", {}),
+            content=_decode_body(entry),
+            request=request
+        )
+
+
+class RecordingTransport(httpx.AsyncBaseTransport):
+    """httpx transport saving every response of a real transport."""
+    
+    def __init__(self, store: CassetteStore, transport: httpx.AsyncBaseTransport):
+        self.store = store
+        self.transport = transport
+    
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        response = await self.transport.handle_async_request(request)
+        body = await response.aread()
+        self.store.record_http(str(request.url), response.status_code, response.headers, body)
+        headers = {name: value for name, value in response.headers.items() if name.lower() in KEPT_HEADERS}
+        return httpx.Response(response.status_code, headers=headers, content=body, request=request)
+    
+    async def aclose(self) -> None:
+        await self.transport.aclose()
+
+
+class ReplayDriver:
+    """
+    Stand-in for a Chrome WebDriver, answering from the browser cassettes.
+    
+    Supports what the scrapers use: navigation, page_source, readiness scripts
+    (the recorded page is already rendered) and the DevTools calls of network
+    capture (recorded JSON responses come back as performance log events).
+    """
+    
+    def __init__(self, store: CassetteStore):
+        self.store = store
+        self.current_url = "about:blank"
+        self.page_source = "<html><head></head><body></body></html>"
+        self._responses: List[Dict[str, Any]] = []
+        self._events: List[Dict[str, Any]] = []
+    
+    def get(self, url: str) -> None:
+        self.store.delay("browser")
+        entry = self.store.load("browser", url)
+        if entry is None:
+            raise WebDriverException(f"No recorded page for {url}")
+        self.current_url = entry.get("final_url") or url
+        self.page_source = entry.get("page_source") or ""
+        self._responses = entry.get("responses", [])
+        self._events = []
+        for request_id, response in enumerate(self._responses):
+            self._events.append({"method": "Network.responseReceived", "params": {
+                "requestId": str(request_id),
+                "response": {"url": response["url"], "mimeType": response.get("mime_type", "application/json")},
+            }})
+            self._events.append({"method": "Network.loadingFinished", "params": {"requestId": str(request_id)}})
+    
+    def execute_script(self, script: str, *args) -> bool:
+        return True
+    
+    def execute_cdp_cmd(self, cmd: str, params: Dict[str, Any]) -> Dict[str, Any]:
+        if cmd == "Network.getResponseBody":
+            response = self._responses[int(params["requestId"])]
+            return {"body": response.get("body", ""), "base64Encoded": False}
+        return {}
+    
+    def get_log(self, log_type: str) -> List[Dict[str, Any]]:
+        events, self._events = self._events, []
+        return [{"message": json.dumps({"message": event})} for event in events]
+    
+    def quit(self) -> None:
+        pass
+
+
+class RecordingDriver:
+    """Wraps a Chrome WebDriver and saves what the scrapers read from each page (browser cassettes)."""
+    
+    def __init__(self, driver, store: CassetteStore):
+        self._driver = driver
+        self._store = store
+        self._url: Optional[str] = None
+        self._entry: Optional[Dict[str, Any]] = None
+        self._response_urls: Dict[str, tuple] = {}  # requestId -> (URL, MIME type)
+    
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._driver, name)
+    
+    def _save(self) -> None:
+        if self._entry is not None:
+            self._store.save("browser", self._url, self._entry)
+    
+    def get(self, url: str) -> None:
+        self._driver.get(url)
+        # A page loaded again (e.g., network capture, then the DOM fallback) adds to its cassette
+        self._url = url
+        self._entry = self._store.load("browser", url) or {"page_source": "", "responses": []}
+        self._entry["final_url"] = self._driver.current_url
+        self._response_urls = {}
+        self._save()
+    
+    @property
+    def page_source(self) -> str:
+        source = self._driver.page_source
+        if self._entry is not None:
+            self._entry["page_source"] = source
+            self._save()
+        return source
+    
+    def get_log(self, log_type: str) -> List[Dict[str, Any]]:
+        entries = self._driver.get_log(log_type)
+        for entry in entries:
+            try:
+                message = json.loads(entry["message"])["message"]
+            except (KeyError, TypeError, ValueError):
+                continue
+            if message.get("method") == "Network.responseReceived":
+                response = message.get("params", {}).get("response", {})
+                self._response_urls[message["params"].get("requestId")] = (response.get("url"), response.get("mimeType"))
+        return entries
+    
+    def execute_cdp_cmd(self, cmd: str, params: Dict[str, Any]) -> Dict[str, Any]:
+        result = self._driver.execute_cdp_cmd(cmd, params)
+        if cmd == "Network.getResponseBody" and self._entry is not None and params.get("requestId") in self._response_urls:
+            url, mime_type = self._response_urls[params["requestId"]]
+            body = result.get("body", "")
+            if result.get("base64Encoded"):
+                body = base64.b64decode(body).decode("utf-8", errors="replace")
+            responses = [r for r in self._entry["responses"] if r["url"] != url]
+            self._entry["responses"] = responses + [{"url": url, "mime_type": mime_type, "body": body}]
+            self._save()
+        return result
+
+
+# Global cassette store (configured by environment, see module docstring)
+cassettes = CassetteStore()
@@ -8,11 +8,25 @@ IMPORTANT: This uses yfinance library, which accesses Yahoo Finance data.
 - Be respectful: Add delays between requests
 - Rate limiting: Don't make too many requests too quickly
 - Cache results when possible to avoid repeated requests
+
+Data layer: a ticker's yf.Ticker, info and annual financials are loaded once
+and kept in yahoo_cache, so every getter (and every ratio) reads the same
+DataFrames instead of making its own round trips. prefetch() loads the data
+of a batch's tickers ahead of their getters, several tickers at a time
+(yfinance has no bulk request for info or financials: each ticker is still
+loaded with its own requests).
 """
 
-from typing import Optional
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Iterable, Optional
+import pandas as pd
 import yfinance as yf
-from app.services.cache import scraper_cache
+from app.services.cache import MISSING, scraper_cache, yahoo_cache
+from app.services.symbol_metadata import symbol_index
+from .replay import cassettes
+
+# Tickers loaded at the same time by prefetch()
+PREFETCH_WORKERS = 4
 
 
 class YahooScraper:
@@ -26,6 +40,87 @@ class YahooScraper:
         """Clean and uppercase ticker symbol."""
         return ticker.upper().strip()
     
+    def _get_ticker(self, ticker_upper: str) -> yf.Ticker:
+        """Get the shared yf.Ticker of a ticker (one per ticker while cached)."""
+        return yahoo_cache.get_or_set(f"yahoo_ticker_{ticker_upper}", lambda: yf.Ticker(ticker_upper))
+    
+    def _load(self, ticker_upper: str, attribute: str) -> Any:
+        """
+        Load one yfinance dataset (network round trip).
+        
+        Args:
+            ticker_upper: Clean ticker symbol
+            attribute: yf.Ticker attribute ("info" or "financials")
+            
+        Returns:
+            The data ({} / empty DataFrame if Yahoo has none), or None if the request failed
+        """
+        try:
+            # Through the cassettes in record/replay mode (see replay.py)
+            value = cassettes.call_yfinance(ticker_upper, attribute, lambda: getattr(self._get_ticker(ticker_upper), attribute))
+        except Exception as e:
+            print(f"Error fetching {attribute} from Yahoo Finance for {ticker_upper}: {e}")
+            return None
+        if attribute == "info":
+            value = value or {}
+            # Exchange and company name help other sources build their URLs
+            symbol_index.learn_from_yahoo(ticker_upper, value)
+        elif value is None:
+            value = pd.DataFrame()
+        return value
+    
+    def get_info(self, ticker: str) -> Optional[Dict[str, Any]]:
+        """
+        Get a ticker's Yahoo Finance info (quote, valuation ratios, exchange, ...).
+        
+        Loaded once and shared by all getters while in yahoo_cache.
+        
+        Args:
+            ticker: Stock ticker symbol (e.g., 'PLTR')
+            
+        Returns:
+            Info dict (empty if Yahoo has none), or None if the request failed
+        """
+        ticker_upper = self.clean_ticker(ticker)
+        return yahoo_cache.get_or_set(f"yahoo_info_{ticker_upper}", lambda: self._load(ticker_upper, "info"))
+    
+    def get_financials(self, ticker: str) -> Optional[pd.DataFrame]:
+        """
+        Get a ticker's ANNUAL income statement (rows = line items, columns = fiscal years, newest first).
+        
+        Loaded once and shared by all getters while in yahoo_cache.
+        
+        Args:
+            ticker: Stock ticker symbol (e.g., 'PLTR')
+            
+        Returns:
+            DataFrame (empty if Yahoo has none), or None if the request failed
+        """
+        ticker_upper = self.clean_ticker(ticker)
+        return yahoo_cache.get_or_set(f"yahoo_financials_{ticker_upper}", lambda: self._load(ticker_upper, "financials"))
+    
+    def prefetch(self, tickers: Iterable[str], workers: int = PREFETCH_WORKERS) -> int:
+        """
+        Load info and financials of many tickers ahead of their getters, in parallel.
+        
+        Each ticker is loaded like its getters would (one request per dataset),
+        workers tickers at a time. Getters called meanwhile for the same ticker
+        wait for this load instead of starting their own.
+        
+        Args:
+            tickers: Ticker symbols (duplicates are ignored)
+            workers: Tickers loaded at the same time
+            
+        Returns:
+            Number of tickers whose data could be loaded
+        """
+        symbols = list(dict.fromkeys(self.clean_ticker(t) for t in tickers if t and t.strip()))
+        if not symbols:
+            return 0
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="yahoo") as pool:
+            results = pool.map(lambda t: (self.get_info(t), self.get_financials(t)), symbols)
+            return sum(1 for info, financials in results if info is not None and financials is not None)
+    
     def get_interest_coverage(self, ticker: str) -> Optional[float]:
         """
         Get Interest Coverage ratio from Yahoo Finance using ANNUAL data.
@@ -45,20 +140,21 @@ class YahooScraper:
         ticker_upper = self.clean_ticker(ticker)
         cache_key = f"yahoo_interest_coverage_{ticker_upper}"
         
-        # Check cache first
-        cached_value = scraper_cache.get(cache_key)
-        if cached_value is not None:
+        # Check cache first (also returns known "not available"/"failed" results)
+        cached_value = scraper_cache.lookup(cache_key)
+        if cached_value is not MISSING:
             return cached_value
         
+        # Get ANNUAL financials (last fiscal year) for consistency with other sources
+        # POLICY: Use Annual data to match Finviz and other sources (not TTM)
+        financials = self.get_financials(ticker_upper)
+        if financials is None:
+            scraper_cache.set_failed(cache_key)
+            return None
+        
         try:
-            # Get stock data using yfinance
-            stock = yf.Ticker(ticker_upper)
-            
-            # Get ANNUAL financials (last fiscal year) for consistency with other sources
-            # POLICY: Use Annual data to match Finviz and other sources (not TTM)
-            financials = stock.financials
-            
-            if financials is None or financials.empty:
+            if financials.empty:
+                scraper_cache.set_not_available(cache_key)
                 return None
             
             # Interest Coverage = Operating Income (Annual) / Interest Expense (Annual)
@@ -110,12 +206,15 @@ class YahooScraper:
                     return interest_coverage
             elif operating_income is not None and (interest_expense is None or interest_expense == 0):
                 # Company has no interest expense (no debt) - Interest Coverage is N/A
+                scraper_cache.set_not_available(cache_key)
                 return None
             
+            scraper_cache.set_not_available(cache_key)
             return None
             
         except Exception as e:
             print(f"Error fetching Interest Coverage from Yahoo Finance for {ticker_upper}: {e}")
+            scraper_cache.set_failed(cache_key)
             return None
     
     def get_pe_ratio(self, ticker: str) -> Optional[float]:
@@ -139,19 +238,20 @@ class YahooScraper:
         ticker_upper = self.clean_ticker(ticker)
         cache_key = f"yahoo_pe_{ticker_upper}"
         
-        # Check cache first
-        cached_value = scraper_cache.get(cache_key)
-        if cached_value is not None:
+        # Check cache first (also returns known "not available"/"failed" results)
+        cached_value = scraper_cache.lookup(cache_key)
+        if cached_value is not MISSING:
             return cached_value
         
+        # Get info which contains P/E ratio
+        info = self.get_info(ticker_upper)
+        if info is None:
+            scraper_cache.set_failed(cache_key)
+            return None
+        
         try:
-            # Get stock data using yfinance
-            stock = yf.Ticker(ticker_upper)
-            
-            # Get info which contains P/E ratio
-            info = stock.info
-            
-            if info is None:
+            if not info:
+                scraper_cache.set_not_available(cache_key)
                 return None
             
             # Try different keys for P/E ratio
@@ -168,8 +268,10 @@ class YahooScraper:
                         scraper_cache.set(cache_key, pe_value)
                         return pe_value
             
+            scraper_cache.set_not_available(cache_key)
             return None
             
         except Exception as e:
             print(f"Error fetching P/E Ratio from Yahoo Finance for {ticker_upper}: {e}")
+            scraper_cache.set_failed(cache_key)
             return None
@@ -3,24 +3,311 @@ Simple in-memory cache for scraper results.
 
 This helps avoid making too many requests to the same website.
 Cache expires after a set time (default: 1 hour).
+
+Besides real values, the cache can remember that a value is "not available"
+(the page loaded but has no such metric, e.g. a company with no interest expense)
+or that the fetch "failed" (site down, page didn't render). These negative entries
+have their own, shorter TTLs so we don't re-scrape known-empty cells on every request.
+
+The cache is bounded: when it holds more than max_entries entries (or roughly
+max_bytes of data), the least recently used entries are evicted. A background
+sweeper can also remove expired entries that are never read again.
+All methods are thread-safe (scrapers run on worker threads).
+
+Stale-while-revalidate: with max_stale_seconds set, expired values are kept a
+while longer. Normal reads treat them as missing, but get_stale() still returns
+them, so callers can answer immediately with the old value and refresh it in the
+background. Past max_stale_seconds the entry is gone and a real fetch is forced.
+A refresh that fails (or finds nothing) doesn't replace a value that can still be
+served: the old value stays until it is refreshed or past max_stale_seconds.
+
+A persistent tier (see persistent_cache.py) can be attached behind the memory:
+writes go to both, and memory misses are looked up on disk, so cached results
+survive restarts and are shared between uvicorn workers.
+
+Refresh-ahead: the cache warmer (see cache_warmer.py) reads expiry times with
+peek() and re-runs scraper calls inside bypass(), so they fetch and store a new
+value while other threads keep reading the current one.
 """
 
-from typing import Optional, Dict, Tuple
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Optional, Tuple
+import sys
+import threading
 import time
+from app.services.singleflight import SingleFlight
+
+
+# Entry kinds
+VALUE = "value"
+NOT_AVAILABLE = "not_available"  # Source has no value for this metric
+FETCH_FAILED = "fetch_failed"  # Source could not be fetched/parsed (try again soon)
+
+# Returned by lookup() when there is no usable entry (None means "cached as empty")
+MISSING = object()
+
+
+def estimate_size(value: Any) -> int:
+    """
+    Roughly estimate the memory used by a value (bytes).
+    
+    Follows lists, tuples, sets and dicts; other objects count as sys.getsizeof.
+    This is an approximation used for the cache byte budget, not an exact measure.
+    """
+    size = sys.getsizeof(value)
+    if isinstance(value, dict):
+        size += sum(estimate_size(k) + estimate_size(v) for k, v in value.items())
+    elif isinstance(value, (list, tuple, set, frozenset)):
+        size += sum(estimate_size(item) for item in value)
+    return size
 
 
 class SimpleCache:
-    """Simple in-memory cache with expiration."""
+    """Simple in-memory cache with expiration and LRU eviction."""
     
-    def __init__(self, ttl_seconds: int = 3600):
+    def __init__(
+        self,
+        ttl_seconds: int = 3600,
+        not_available_ttl: Optional[int] = None,
+        failed_ttl: Optional[int] = None,
+        max_entries: Optional[int] = None,
+        max_bytes: Optional[int] = None,
+        size_of: Callable[[Any], int] = estimate_size,
+        max_stale_seconds: float = 0
+    ):
         """
         Initialize cache.
         
         Args:
             ttl_seconds: Time to live in seconds (default: 1 hour)
+            not_available_ttl: Time to live for "not available" entries (default: same as ttl_seconds)
+            failed_ttl: Time to live for "fetch failed" entries (default: same as ttl_seconds)
+            max_entries: Maximum number of entries (None = unlimited)
+            max_bytes: Approximate maximum memory used by cached values (None = unlimited)
+            size_of: Function estimating the size of a value in bytes
+            max_stale_seconds: How long past its TTL a value can still be served as stale (0 = never)
         """
-        self.cache: Dict[str, Tuple[any, float]] = {}
+        self.cache: "OrderedDict[str, Tuple[Any, float, str]]" = OrderedDict()  # Oldest used first
         self.ttl = ttl_seconds
+        self.not_available_ttl = not_available_ttl if not_available_ttl is not None else ttl_seconds
+        self.failed_ttl = failed_ttl if failed_ttl is not None else ttl_seconds
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.size_of = size_of
+        self.max_stale = max_stale_seconds
+        self._sizes: Dict[str, int] = {}
+        self._total_bytes = 0
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._lock = threading.RLock()
+        self._loads = SingleFlight()  # get_or_set() loads in progress, by key
+        self._sweeper: Optional[threading.Thread] = None
+        self._stop_sweeper = threading.Event()
+        self._tier = None
+        self._local = threading.local()  # Per-thread bypass flag (see bypass())
+    
+    def attach_tier(self, tier) -> None:
+        """
+        Attach a persistent tier (e.g., SQLiteCacheTier) behind the memory cache.
+        
+        Args:
+            tier: Object with get/set/delete/delete_expired/clear methods
+        """
+        self._tier = tier
+    
+    def detach_tier(self):
+        """
+        Stop using the persistent tier.
+        
+        Returns:
+            The detached tier (or None)
+        """
+        tier, self._tier = self._tier, None
+        return tier
+    
+    def _ttl_for(self, kind: str) -> float:
+        """Get the time to live for an entry kind."""
+        if kind == NOT_AVAILABLE:
+            return self.not_available_ttl
+        if kind == FETCH_FAILED:
+            return self.failed_ttl
+        return self.ttl
+    
+    def _is_expired(self, entry: Tuple[Any, float, str], now: float) -> bool:
+        """Check if an entry is past its TTL."""
+        value, timestamp, kind = entry
+        return now - timestamp > self._ttl_for(kind)
+    
+    def _is_dead(self, entry: Tuple[Any, float, str], now: float) -> bool:
+        """Check if an entry can't be served at all, even stale (only real values get a stale window)."""
+        value, timestamp, kind = entry
+        return now - timestamp > self._ttl_for(kind) + self._stale_window(kind)
+    
+    def _stale_window(self, kind: str) -> float:
+        """Get how long past its TTL an entry of this kind is kept."""
+        return self.max_stale if kind == VALUE else 0
+    
+    def _remove(self, key: str) -> None:
+        """Remove an entry and its size accounting (caller holds the lock)."""
+        del self.cache[key]
+        self._total_bytes -= self._sizes.pop(key, 0)
+    
+    def _get_fresh_entry(self, key: str) -> Optional[Tuple[Any, float, str]]:
+        """Get an entry if it exists and hasn't expired (entries past the stale window are removed)."""
+        if self.bypassing():
+            return None
+        with self._lock:
+            entry = self.cache.get(key)
+            if entry is not None:
+                now = time.time()
+                # Check if expired
+                if not self._is_expired(entry, now):
+                    # Mark as most recently used
+                    self.cache.move_to_end(key)
+                    self._hits += 1
+                    return entry
+                # Expired entries are kept for get_stale() until past the stale window
+                if self._is_dead(entry, now):
+                    self._remove(key)
+        
+        # Not in memory - try the persistent tier (outside the lock, it's disk I/O)
+        entry = self._get_from_tier(key)
+        with self._lock:
+            if entry is None:
+                self._misses += 1
+            else:
+                self._hits += 1
+        return entry
+    
+    def _get_from_tier(self, key: str) -> Optional[Tuple[Any, float, str]]:
+        """Get a fresh entry from the persistent tier and load it into memory."""
+        tier = self._tier
+        if tier is None:
+            return None
+        entry = tier.get(key)
+        if entry is None or self._is_expired(entry, time.time()):
+            return None
+        self._insert(key, entry)
+        return entry
+    
+    def _insert(self, key: str, entry: Tuple[Any, float, str]) -> None:
+        """Put an entry in memory, then evict least recently used entries if over budget."""
+        size = self.size_of(key) + self.size_of(entry[0])
+        with self._lock:
+            if key in self.cache:
+                self._remove(key)
+            self.cache[key] = entry
+            self._sizes[key] = size
+            self._total_bytes += size
+            
+            while self.cache and self._over_budget():
+                oldest_key = next(iter(self.cache))
+                self._remove(oldest_key)
+                self._evictions += 1
+    
+    def _has_servable_value(self, key: str) -> bool:
+        """Check if key holds a real value that can still be served (fresh, or stale within the window)."""
+        with self._lock:
+            entry = self.cache.get(key)
+        if entry is None and self._tier is not None:
+            entry = self._tier.get(key)
+        return entry is not None and entry[2] == VALUE and not self._is_dead(entry, time.time())
+    
+    def _store(self, key: str, value: Any, kind: str) -> None:
+        """
+        Store an entry in memory and in the persistent tier (if attached).
+        
+        A negative entry never replaces a value that can still be served: a
+        refresh that fails (or finds nothing) keeps the old value, fresh or stale.
+        """
+        if kind != VALUE and self._has_servable_value(key):
+            return
+        entry = (value, time.time(), kind)
+        self._insert(key, entry)
+        tier = self._tier
+        if tier is not None:
+            tier.set(key, value, entry[1], kind)
+    
+    def _over_budget(self) -> bool:
+        """Check if the cache holds more than max_entries or max_bytes (caller holds the lock)."""
+        if self.max_entries is not None and len(self.cache) > self.max_entries:
+            return True
+        return self.max_bytes is not None and self._total_bytes > self.max_bytes
+    
+    @contextmanager
+    def bypass(self):
+        """
+        Treat every entry as missing for reads made by the current thread.
+        
+        Usage (refresh a value before it expires):
+            with scraper_cache.bypass():
+                finviz.get_gross_margin("PLTR")  # Scrapes and stores a new value
+        
+        Other threads still read the cached entries meanwhile. Work handed to
+        other threads (e.g., a worker pool) must enter bypass() there too, see
+        bypassing().
+        """
+        previous = getattr(self._local, "bypass", False)
+        self._local.bypass = True
+        try:
+            yield
+        finally:
+            self._local.bypass = previous
+    
+    def bypassing(self) -> bool:
+        """Check if the current thread is inside bypass()."""
+        return getattr(self._local, "bypass", False)
+    
+    def peek(self, key: str) -> Optional[Tuple[str, float]]:
+        """
+        Get the kind of a fresh entry and the time left before it expires.
+        
+        Unlike get(), this doesn't count as a hit/miss or mark the entry as used.
+        
+        Args:
+            key: Cache key
+            
+        Returns:
+            (kind, seconds until expiry), or None if not found/expired
+        """
+        with self._lock:
+            entry = self.cache.get(key)
+        if entry is None and self._tier is not None:
+            entry = self._tier.get(key)
+        if entry is None:
+            return None
+        value, timestamp, kind = entry
+        remaining = timestamp + self._ttl_for(kind) - time.time()
+        if remaining < 0:
+            return None
+        return kind, remaining
+    
+    def get_stale(self, key: str) -> Optional[Tuple[Any, float]]:
+        """
+        Get a real value even if it has expired, as long as it's within max_stale_seconds.
+        
+        Used for stale-while-revalidate: serve the old value now, refresh in the background.
+        Negative entries (not available/failed) are never served stale.
+        
+        Args:
+            key: Cache key
+            
+        Returns:
+            (value, age in seconds) or None if there is no servable value
+        """
+        now = time.time()
+        with self._lock:
+            entry = self.cache.get(key)
+        if entry is None and self._tier is not None:
+            entry = self._tier.get(key)
+            if entry is not None and not self._is_dead(entry, now):
+                self._insert(key, entry)
+        
+        if entry is None or entry[2] != VALUE or self._is_dead(entry, now):
+            return None
+        return entry[0], now - entry[1]
     
     def get(self, key: str) -> Optional[any]:
         """
@@ -30,19 +317,45 @@ class SimpleCache:
             key: Cache key
             
         Returns:
-            Cached value or None if not found/expired
+            Cached value or None if not found/expired (or cached as not available/failed)
         """
-        if key not in self.cache:
+        entry = self._get_fresh_entry(key)
+        if entry is None:
             return None
+        return entry[0]
+    
+    def lookup(self, key: str) -> any:
+        """
+        Get value from cache, telling apart "not cached" from "cached as empty".
         
-        value, timestamp = self.cache[key]
+        Usage in scrapers:
+            cached_value = scraper_cache.lookup(cache_key)
+            if cached_value is not MISSING:
+                return cached_value  # Real value, or None for not available/failed
         
-        # Check if expired
-        if time.time() - timestamp > self.ttl:
-            del self.cache[key]
-            return None
+        Args:
+            key: Cache key
+            
+        Returns:
+            MISSING if not found/expired, None for not available/failed entries,
+            otherwise the cached value
+        """
+        entry = self._get_fresh_entry(key)
+        if entry is None:
+            return MISSING
+        return entry[0]
+    
+    def get_kind(self, key: str) -> Optional[str]:
+        """
+        Get the kind of a fresh entry (VALUE, NOT_AVAILABLE or FETCH_FAILED).
         
-        return value
+        Returns:
+            Entry kind, or None if not found/expired
+        """
+        entry = self._get_fresh_entry(key)
+        if entry is None:
+            return None
+        return entry[2]
     
     def set(self, key: str, value: any) -> None:
         """
@@ -52,14 +365,157 @@ class SimpleCache:
             key: Cache key
             value: Value to cache
         """
-        self.cache[key] = (value, time.time())
+        self._store(key, value, VALUE)
+    
+    def set_not_available(self, key: str) -> None:
+        """
+        Remember that a source has no value for this key (uses not_available_ttl).
+        
+        Ignored if the key holds a value that can still be served (fresh or stale).
+        
+        Args:
+            key: Cache key
+        """
+        self._store(key, None, NOT_AVAILABLE)
+    
+    def set_failed(self, key: str) -> None:
+        """
+        Remember that fetching this key failed (uses failed_ttl).
+        
+        Ignored if the key holds a value that can still be served (fresh or stale).
+        
+        Args:
+            key: Cache key
+        """
+        self._store(key, None, FETCH_FAILED)
+    
+    def get_or_set(self, key: str, loader: Callable[[], Any]) -> Optional[Any]:
+        """
+        Get value from cache, or load and store it if missing.
+        
+        Concurrent callers asking for the same missing key wait for the first
+        caller's load (single-flight) and get its result, or its exception.
+        None results are not cached, but keys marked with set_failed()/
+        set_not_available() (e.g., by the loader) return None without loading
+        until they expire.
+        
+        Args:
+            key: Cache key
+            loader: Function returning the value (called at most once per miss)
+            
+        Returns:
+            Cached or freshly loaded value (None if the load failed)
+        """
+        value = self.lookup(key)
+        if value is not MISSING:
+            return value
+        
+        def load():
+            # Another caller may have stored it just before this load started
+            value = self.lookup(key)
+            if value is not MISSING:
+                return value
+            value = loader()
+            if value is not None:
+                self.set(key, value)
+            return value
+        
+        return self._loads.do(key, load)
+    
+    def sweep(self) -> int:
+        """
+        Remove all expired entries (past the stale window, if any).
+        
+        Returns:
+            Number of entries removed
+        """
+        now = time.time()
+        with self._lock:
+            expired = [key for key, entry in self.cache.items() if self._is_dead(entry, now)]
+            for key in expired:
+                self._remove(key)
+        
+        tier = self._tier
+        if tier is not None:
+            for kind in (VALUE, NOT_AVAILABLE, FETCH_FAILED):
+                tier.delete_expired(kind, now - self._ttl_for(kind) - self._stale_window(kind))
+        return len(expired)
+    
+    def start_sweeper(self, interval_seconds: float = 300) -> None:
+        """
+        Start a background thread removing expired entries every interval.
+        
+        Args:
+            interval_seconds: Time between sweeps (default: 5 minutes)
+        """
+        if self._sweeper is not None and self._sweeper.is_alive():
+            return
+        self._stop_sweeper.clear()
+        
+        def run():
+            while not self._stop_sweeper.wait(interval_seconds):
+                self.sweep()
+        
+        self._sweeper = threading.Thread(target=run, name="cache-sweeper", daemon=True)
+        self._sweeper.start()
+    
+    def stop_sweeper(self) -> None:
+        """Stop the background sweeper thread (if running)."""
+        self._stop_sweeper.set()
+        if self._sweeper is not None:
+            self._sweeper.join(timeout=5)
+            self._sweeper = None
+    
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get cache usage statistics.
+        
+        Returns:
+            Dict with entries, approximate bytes, hits, misses and evictions
+        """
+        with self._lock:
+            return {
+                "entries": len(self.cache),
+                "bytes": self._total_bytes,
+                "max_entries": self.max_entries,
+                "max_bytes": self.max_bytes,
+                "hits": self._hits,
+                "misses": self._misses,
+                "evictions": self._evictions,
+            }
     
     def clear(self) -> None:
-        """Clear all cached values."""
-        self.cache.clear()
+        """Clear all cached values (including the persistent tier)."""
+        with self._lock:
+            self.cache.clear()
+            self._sizes.clear()
+            self._total_bytes = 0
+        if self._tier is not None:
+            self._tier.clear()
 
 
 # Global cache instance (4 hours TTL for Morningstar - financial data doesn't change frequently)
 # This significantly reduces Selenium calls which are slow (~8-10 seconds each)
-scraper_cache = SimpleCache(ttl_seconds=14400)  # 4 hours
+# "Not available" results are kept 1 hour, failed fetches 5 minutes (retry soon)
+# Bounded to 50,000 entries / ~64 MB so a long-running backend doesn't grow without limit
+# Expired values can be served stale (and refreshed in the background) for up to 24 hours:
+# annual ratios don't change that fast
+scraper_cache = SimpleCache(
+    ttl_seconds=14400,  # 4 hours
+    not_available_ttl=3600,
+    failed_ttl=300,
+    max_entries=50000,
+    max_bytes=64 * 1024 * 1024,
+    max_stale_seconds=86400
+)
+
+# Short-lived cache of parsed pages (BeautifulSoup), keyed by URL
+# Several getters read the same page (e.g., Finviz Gross Margin and P/E both use the quote page),
+# so within one analysis the page is downloaded/rendered and parsed only once
+# Parsed pages are big (several MB each), so keep only a few of them
+page_cache = SimpleCache(ttl_seconds=300, max_entries=64)  # 5 minutes
 
+# Short-lived cache of Yahoo Finance data (yf.Ticker objects, info dicts, financials DataFrames)
+# All Yahoo getters of a ticker share one load; batch analyses fill it ahead of time (prefetch)
+# Sized for a full batch (3 entries per ticker)
+yahoo_cache = SimpleCache(ttl_seconds=900, max_entries=2048)  # 15 minutes
@@ -0,0 +1,255 @@
+"""
+Background cache warmer for a watchlist of tickers.
+
+scraper_cache keeps values 4 hours, so the first request after they expire
+pays a full cold scrape (10+ seconds for the Selenium sources). The warmer
+keeps the watchlist's entries fresh instead: every CHECK_INTERVAL it re-runs
+the scraper calls whose value is missing or expires within REFRESH_AHEAD,
+soonest expiry first, so dashboard tickers are always answered from the cache.
+A refresh only ever replaces an entry with a new value: if it fails (e.g.,
+during a short outage), the current value stays and the call is retried on
+the next pass.
+
+It stays out of the way of interactive traffic:
+- Calls run one at a time, as background tasks of the shared executor (same
+  per-source limits and single-flight keys as the analyses)
+- A call only starts once no analysis call has run for YIELD_SECONDS
+- ...and once its website has a rate limiter token to spare, so the warmer
+  never makes an interactive request wait for the host's next slot
+  
+By default it only warms during US market hours, starting WARM_BEFORE_OPEN
+before the open so the first requests of the day are warm too (market
+holidays are not taken into account). Set GROSS_WARM_ALL_DAY=1 to keep
+warming around the clock.
+
+The FastAPI lifespan in app/main.py starts it with the watchlist configured
+by GROSS_WATCHLIST and/or GROSS_WATCHLIST_FILE (see load_watchlist).
+"""
+
+from datetime import datetime, time as dtime, timedelta
+from typing import Any, Iterable, List, Optional
+from zoneinfo import ZoneInfo
+import logging
+import os
+import threading
+from app.services import ratio_fetcher
+from app.services.cache import VALUE, scraper_cache
+from app.services.executor import ScraperTask, scraper_executor
+from app.services.rate_limiter import rate_limiter
+
+logger = logging.getLogger(__name__)
+
+# Time between two passes over the watchlist (seconds)
+CHECK_INTERVAL = 60
+
+# Refresh values expiring within this time (seconds)
+# Must cover a full pass over the watchlist (about 10 scraper calls per ticker)
+REFRESH_AHEAD = 1800
+
+# Wait until no analysis call has run for this long before each refresh (seconds)
+YIELD_SECONDS = 2
+
+# Time between two checks while waiting for our turn (seconds)
+TURN_POLL_INTERVAL = 0.5
+
+# US market hours (Eastern time), and how long before the open warming starts
+MARKET_TIMEZONE = ZoneInfo("America/New_York")
+MARKET_OPEN = dtime(9, 30)
+MARKET_CLOSE = dtime(16, 0)
+WARM_BEFORE_OPEN = timedelta(hours=1)
+
+# Warm around the clock instead of market hours only
+WARM_ALL_DAY = os.environ.get("GROSS_WARM_ALL_DAY", "0") == "1"
+
+# Website of each source (for the rate limiter check), None = not rate limited here
+SOURCE_HOSTS = {
+    "Finviz": "finviz.com",
+    "Macrotrends": "macrotrends.net",
+    "Morningstar": "morningstar.com",
+    "QuickFS": "quickfs.net",
+    "Koyfin": "koyfin.com",
+}
+
+
+def load_watchlist(tickers: Optional[str] = None, path: Optional[str] = None) -> List[str]:
+    """
+    Build the watchlist from a comma-separated list and/or a file.
+    
+    Args:
+        tickers: e.g., "PLTR,NVDA, MSFT"
+        path: Text file with one ticker per line ("#" starts a comment)
+        
+    Returns:
+        Tickers, upper-cased and without duplicates (in order)
+    """
+    names = (tickers or "").split(",")
+    if path:
+        try:
+            with open(path) as f:
+                names += [line.split("#")[0] for line in f]
+        except OSError as e:
+            print(f"Error loading watchlist from {path}: {e}")
+    
+    watchlist = []
+    for name in names:
+        ticker = name.strip().upper()
+        if ticker and ticker not in watchlist:
+            watchlist.append(ticker)
+    return watchlist
+
+
+def _refresh_call(func) -> Any:
+    """
+    Run a scraper call ignoring its cached value (it fetches and stores a new one).
+    
+    If the call fails, its "failed" entry doesn't replace the current value
+    (scraper_cache keeps values that can still be served).
+    """
+    with scraper_cache.bypass():
+        return func()
+
+
+class CacheWarmer:
+    """Keeps the scraper_cache entries of a watchlist fresh, in a background thread."""
+    
+    def __init__(
+        self,
+        check_interval: float = CHECK_INTERVAL,
+        refresh_ahead: float = REFRESH_AHEAD,
+        yield_seconds: float = YIELD_SECONDS,
+        all_day: bool = WARM_ALL_DAY
+    ):
+        """
+        Initialize warmer (nothing runs until start()).
+        
+        Args:
+            check_interval: Time between two passes over the watchlist (seconds)
+            refresh_ahead: Refresh values expiring within this time (seconds)
+            yield_seconds: Idle time of interactive calls required before each refresh (seconds)
+            all_day: Warm around the clock (default: market hours only)
+        """
+        self.check_interval = check_interval
+        self.refresh_ahead = refresh_ahead
+        self.yield_seconds = yield_seconds
+        self.all_day = all_day
+        self.watchlist: List[str] = []
+        self.refreshed = 0  # Scraper calls refreshed since start
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+    
+    def in_warm_hours(self, now: Optional[datetime] = None) -> bool:
+        """
+        Check if the cache should be kept warm now.
+        
+        Args:
+            now: Time to check (default: now), timezone-aware
+            
+        Returns:
+            True around the clock if all_day, else on weekdays from
+            WARM_BEFORE_OPEN before the open until the close (Eastern time)
+        """
+        if self.all_day:
+            return True
+        now = (now or datetime.now(MARKET_TIMEZONE)).astimezone(MARKET_TIMEZONE)
+        if now.weekday() >= 5:
+            return False
+        start = datetime.combine(now.date(), MARKET_OPEN, MARKET_TIMEZONE) - WARM_BEFORE_OPEN
+        end = datetime.combine(now.date(), MARKET_CLOSE, MARKET_TIMEZONE)
+        return start <= now <= end
+    
+    def due_calls(self) -> List[ScraperTask]:
+        """
+        Get the watchlist's scraper calls to refresh now, soonest expiry first.
+        
+        Due: no fresh entry (cold), or a value expiring within refresh_ahead.
+        "Not available"/"failed" entries are only retried once expired.
+        """
+        due = []
+        for ticker in list(self.watchlist):
+            for name, task in ratio_fetcher.build_scraper_tasks(ticker).items():
+                key_format = ratio_fetcher.CACHE_KEYS.get(name)
+                if key_format is None:
+                    continue
+                entry = scraper_cache.peek(key_format.format(ticker=ticker))
+                if entry is None:
+                    due.append((0.0, task))
+                elif entry[0] == VALUE and entry[1] < self.refresh_ahead:
+                    due.append((entry[1], task))
+        due.sort(key=lambda item: item[0])
+        return [task for _, task in due]
+    
+    def _wait_for_turn(self, source: str) -> bool:
+        """
+        Wait until interactive traffic is idle and the source's website has a token to spare.
+        
+        Returns:
+            True when the call can run, False if the warmer was stopped meanwhile
+        """
+        host = SOURCE_HOSTS.get(source)
+        while not self._stop.is_set():
+            idle = scraper_executor.idle_seconds() >= self.yield_seconds
+            if idle and (host is None or rate_limiter.bucket(host).available() >= 1):
+                return True
+            self._stop.wait(TURN_POLL_INTERVAL)
+        return False
+    
+    def warm_once(self) -> int:
+        """
+        Refresh every due call of the watchlist, one at a time.
+        
+        Returns:
+            Number of scraper calls refreshed
+        """
+        refreshed = 0
+        for task in self.due_calls():
+            if not self._wait_for_turn(task.source):
+                break
+            # Same key as the analyses: an analysis asking for this call meanwhile shares the refresh
+            background = ScraperTask(
+                task.source,
+                lambda func=task.func: _refresh_call(func),
+                key=task.key,
+                background=True
+            )
+            try:
+                scraper_executor.submit(background).result()
+            except Exception as e:
+                logger.error(f"   ❌ Cache warmer {task.key}: {e}")
+            refreshed += 1
+        self.refreshed += refreshed
+        return refreshed
+    
+    def start(self, watchlist: Iterable[str]) -> None:
+        """
+        Start warming a watchlist in a background thread (first pass right away).
+        
+        Args:
+            watchlist: Tickers to keep warm (nothing is started if empty)
+        """
+        self.watchlist = [ticker.upper().strip() for ticker in watchlist]
+        if not self.watchlist or (self._thread is not None and self._thread.is_alive()):
+            return
+        self._stop.clear()
+        
+        def run():
+            while not self._stop.is_set():
+                if self.in_warm_hours():
+                    refreshed = self.warm_once()
+                    if refreshed:
+                        logger.info(f"🔥 Cache warmer refreshed {refreshed} scraper calls")
+                self._stop.wait(self.check_interval)
+        
+        self._thread = threading.Thread(target=run, name="cache-warmer", daemon=True)
+        self._thread.start()
+        logger.info(f"🔥 Cache warmer started for {len(self.watchlist)} tickers")
+    
+    def stop(self) -> None:
+        """Stop the background thread (a refresh already running finishes in the executor)."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+
+# Global warmer (started by the FastAPI lifespan when a watchlist is configured)
+cache_warmer = CacheWarmer()
@@ -0,0 +1,279 @@
+"""
+Concurrent execution engine for scraper calls.
+
+Scraper calls are I/O bound (HTTP requests, Selenium page loads), so instead of
+running them one after another we fan them out on a shared thread pool.
+Total time for a ticker then becomes roughly the time of the slowest source.
+
+Selenium sources are heavy (each one drives a Chrome instance), so every source
+also gets its own concurrency limit on top of the global worker cap.
+
+Async callers (FastAPI routes) use the *_async methods: they await the worker
+threads instead of blocking, so the event loop stays free while scrapers run.
+
+Tasks with a key are deduplicated (single-flight): if the same scraper call for
+the same ticker is already running, callers share its result instead of
+scraping again.
+
+Scrapers with an async version (HTTP scrapers, see scrapers/async_http.py) can
+give it as async_func: async callers then await it directly on the event loop,
+without using a worker thread at all.
+
+Background tasks (cache warming, see cache_warmer.py) are marked as such:
+the executor counts the other ("interactive") calls, so background work can
+wait until no analysis is running (idle_seconds()).
+"""
+
+from concurrent.futures import Future, ThreadPoolExecutor
+import asyncio
+import concurrent.futures
+from typing import Any, Awaitable, Callable, Dict, Optional
+import threading
+import time
+import weakref
+from app.services.singleflight import SingleFlight, await_shared
+
+
+# Maximum number of scraper calls running at the same time (all sources combined)
+DEFAULT_MAX_WORKERS = 8
+
+# Maximum number of concurrent calls per source
+# Selenium sources (Morningstar, QuickFS, Koyfin) are memory hungry - keep them low
+DEFAULT_SOURCE_LIMITS = {
+    "Finviz": 4,
+    "Yahoo Finance": 4,
+    "Macrotrends": 2,
+    "Morningstar": 2,
+    "QuickFS": 2,
+    "Koyfin": 2,
+}
+
+# Limit used for sources not listed in DEFAULT_SOURCE_LIMITS
+DEFAULT_SOURCE_LIMIT = 2
+
+
+class ScraperTask:
+    """A single scraper call to run (e.g., Finviz Gross Margin for PLTR)."""
+    
+    def __init__(
+        self,
+        source: str,
+        func: Callable[[], Any],
+        key: Optional[str] = None,
+        async_func: Optional[Callable[[], Awaitable[Any]]] = None,
+        background: bool = False
+    ):
+        """
+        Args:
+            source: Data source name, used for the per-source limit (e.g., "Finviz")
+            func: Function to execute (lambda with no arguments)
+            key: Deduplication key (e.g., "Finviz Gross Margin:PLTR"), None = never deduplicated
+            async_func: Optional async version of func, used by run_async instead of a worker thread
+            background: True for calls nobody is waiting for (not counted as interactive traffic)
+        """
+        self.source = source
+        self.func = func
+        self.key = key
+        self.async_func = async_func
+        self.background = background
+
+
+class ScraperExecutor:
+    """Thread pool with a global worker cap and per-source concurrency limits."""
+    
+    def __init__(self, max_workers: int = DEFAULT_MAX_WORKERS, source_limits: Optional[Dict[str, int]] = None):
+        """
+        Initialize executor.
+        
+        The thread pool itself is created lazily on first use.
+        
+        Args:
+            max_workers: Maximum number of scraper calls running at once
+            source_limits: Per-source limits, merged over DEFAULT_SOURCE_LIMITS
+        """
+        self.max_workers = max_workers
+        self.source_limits = dict(DEFAULT_SOURCE_LIMITS)
+        if source_limits:
+            self.source_limits.update(source_limits)
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._semaphores: Dict[str, threading.BoundedSemaphore] = {}
+        # asyncio semaphores are bound to an event loop, so keep one set per loop
+        self._async_semaphores = weakref.WeakKeyDictionary()
+        self._flight = SingleFlight()
+        self._lock = threading.Lock()
+        self._interactive = 0  # Interactive calls submitted and not finished yet
+        self._last_interactive = float("-inf")  # time.monotonic() when the last one finished
+    
+    def _interactive_started(self, task: ScraperTask) -> None:
+        """Count an interactive call as running (background calls are ignored)."""
+        if not task.background:
+            with self._lock:
+                self._interactive += 1
+    
+    def _interactive_finished(self, task: ScraperTask) -> None:
+        """Count an interactive call as finished."""
+        if not task.background:
+            with self._lock:
+                self._interactive -= 1
+                self._last_interactive = time.monotonic()
+    
+    def idle_seconds(self) -> float:
+        """
+        Get how long no interactive call has been running.
+        
+        Returns:
+            Seconds since the last interactive call finished (0 if one is running, inf if none ever ran)
+        """
+        with self._lock:
+            if self._interactive > 0:
+                return 0.0
+            return time.monotonic() - self._last_interactive
+    
+    def _get_executor(self) -> ThreadPoolExecutor:
+        """Get or create the underlying thread pool."""
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers,
+                    thread_name_prefix="scraper"
+                )
+            return self._executor
+    
+    def _get_semaphore(self, source: str) -> threading.BoundedSemaphore:
+        """Get or create the semaphore enforcing the limit for a source."""
+        with self._lock:
+            if source not in self._semaphores:
+                limit = self.source_limits.get(source, DEFAULT_SOURCE_LIMIT)
+                self._semaphores[source] = threading.BoundedSemaphore(limit)
+            return self._semaphores[source]
+    
+    def _get_async_semaphore(self, source: str) -> asyncio.Semaphore:
+        """Get or create the asyncio semaphore for a source (current event loop)."""
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            semaphores = self._async_semaphores.setdefault(loop, {})
+            if source not in semaphores:
+                limit = self.source_limits.get(source, DEFAULT_SOURCE_LIMIT)
+                semaphores[source] = asyncio.Semaphore(limit)
+            return semaphores[source]
+    
+    def submit(self, task: ScraperTask) -> Future:
+        """
+        Schedule a scraper call.
+        
+        The call waits for a free slot of its source before running.
+        If a task with the same key is already running, its future is returned instead.
+        
+        Args:
+            task: Scraper call to run
+            
+        Returns:
+            Future holding the result of task.func
+        """
+        semaphore = self._get_semaphore(task.source)
+        
+        def run():
+            with semaphore:
+                return task.func()
+        
+        self._interactive_started(task)
+        if task.key is None:
+            future = self._get_executor().submit(run)
+        else:
+            future = self._flight.share(task.key, lambda: self._get_executor().submit(run))
+        future.add_done_callback(lambda _: self._interactive_finished(task))
+        return future
+    
+    def run_all(self, tasks: Dict[str, ScraperTask], timeout: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Run scraper calls concurrently and collect their results.
+        
+        Calls that fail or don't finish within the timeout get None, so the
+        caller can always build a response from whatever completed.
+        Calls still running after the timeout keep going in the background
+        (their results still land in the cache for the next request).
+        
+        Args:
+            tasks: Scraper calls by name (e.g., {"Finviz Gross Margin": task})
+            timeout: Maximum time to wait for all calls (seconds), None = no limit
+            
+        Returns:
+            Results by name
+        """
+        futures = {name: self.submit(task) for name, task in tasks.items()}
+        concurrent.futures.wait(futures.values(), timeout=timeout)
+        
+        results = {}
+        for name, future in futures.items():
+            if future.done() and future.exception() is None:
+                results[name] = future.result()
+            else:
+                results[name] = None
+        return results
+    
+    async def run_async(self, task: ScraperTask) -> Any:
+        """
+        Run a scraper call from async code without blocking the event loop.
+        
+        Calls wait for their source slot on the event loop (not in a worker
+        thread), so queued calls don't tie up threads needed by other sources.
+        Tasks with an async_func run entirely on the event loop.
+        
+        Args:
+            task: Scraper call to run
+            
+        Returns:
+            Result of task.func
+        """
+        # Counted as interactive while waiting too (shared or queued calls)
+        self._interactive_started(task)
+        try:
+            if task.key is not None:
+                running = self._flight.in_flight(task.key)
+                if running is not None:
+                    return await await_shared(running)
+            
+            async with self._get_async_semaphore(task.source):
+                if task.async_func is None:
+                    return await await_shared(self.submit(task))
+                if task.key is None:
+                    return await task.async_func()
+                return await self._flight.do_async(task.key, task.async_func)
+        finally:
+            self._interactive_finished(task)
+    
+    async def run_all_async(self, tasks: Dict[str, ScraperTask], timeout: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Async version of run_all.
+        
+        Args:
+            tasks: Scraper calls by name
+            timeout: Maximum time to wait for all calls (seconds), None = no limit
+            
+        Returns:
+            Results by name (None for failed or unfinished calls)
+        """
+        if not tasks:
+            return {}  # asyncio.wait() rejects an empty set
+        pending = {name: asyncio.ensure_future(self.run_async(task)) for name, task in tasks.items()}
+        await asyncio.wait(pending.values(), timeout=timeout)
+        
+        results = {}
+        for name, future in pending.items():
+            if future.done() and not future.cancelled() and future.exception() is None:
+                results[name] = future.result()
+            else:
+                results[name] = None
+        return results
+    
+    def shutdown(self, wait: bool = True) -> None:
+        """Stop the thread pool (a new one is created on next use)."""
+        with self._lock:
+            executor = self._executor
+            self._executor = None
+        if executor is not None:
+            executor.shutdown(wait=wait)
+
+
+# Global executor instance shared by all analyses
+scraper_executor = ScraperExecutor()
@@ -0,0 +1,146 @@
+"""
+Persistent on-disk tier for the scraper cache (SQLite).
+
+The in-memory SimpleCache is lost on every restart/deploy, which throws away
+hours of expensive Selenium results. This tier stores the same entries in a
+SQLite file so they survive restarts and can be shared by several uvicorn
+workers on the same machine.
+
+Entries keep their original timestamp, so the TTL rules of SimpleCache apply
+exactly as if the value had never left memory. Values are stored as JSON;
+values that can't be serialized (e.g., parsed pages) stay memory-only.
+"""
+
+from typing import Any, Optional, Set, Tuple
+import json
+import os
+import sqlite3
+import threading
+
+
+class SQLiteCacheTier:
+    """Key/value store in a SQLite file, used behind SimpleCache."""
+    
+    def __init__(self, path: str):
+        """
+        Open (or create) the cache database.
+        
+        Args:
+            path: Path of the SQLite file (parent directory is created if needed)
+        """
+        self.path = path
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self._local = threading.local()  # One connection per thread
+        self._connections: Set[sqlite3.Connection] = set()  # Every thread's connection (closed by close())
+        self._connections_lock = threading.Lock()
+        self._connect().execute(
+            "CREATE TABLE IF NOT EXISTS cache_entries ("
+            "key TEXT PRIMARY KEY, value TEXT, kind TEXT NOT NULL, stored_at REAL NOT NULL)"
+        )
+    
+    def _connect(self) -> sqlite3.Connection:
+        """Get the SQLite connection of the current thread."""
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            # autocommit mode; WAL lets several processes read while one writes
+            # (used by its own thread only, but close() may close it from another one)
+            connection = sqlite3.connect(self.path, timeout=10, isolation_level=None, check_same_thread=False)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._local.connection = connection
+            with self._connections_lock:
+                self._connections.add(connection)
+        return connection
+    
+    def get(self, key: str) -> Optional[Tuple[Any, float, str]]:
+        """
+        Get a stored entry (expiry is checked by the caller).
+        
+        Args:
+            key: Cache key
+            
+        Returns:
+            (value, stored_at, kind) or None if not stored
+        """
+        try:
+            row = self._connect().execute(
+                "SELECT value, stored_at, kind FROM cache_entries WHERE key = ?", (key,)
+            ).fetchone()
+        except sqlite3.Error as e:
+            print(f"Error reading persistent cache: {e}")
+            return None
+        if row is None:
+            return None
+        value_json, stored_at, kind = row
+        return json.loads(value_json), stored_at, kind
+    
+    def set(self, key: str, value: Any, stored_at: float, kind: str) -> bool:
+        """
+        Store an entry.
+        
+        Args:
+            key: Cache key
+            value: JSON-serializable value
+            stored_at: Time the value was fetched (time.time())
+            kind: Entry kind (see app.services.cache)
+            
+        Returns:
+            True if stored, False if the value isn't JSON-serializable or the write failed
+        """
+        try:
+            value_json = json.dumps(value)
+        except (TypeError, ValueError):
+            return False
+        try:
+            self._connect().execute(
+                "INSERT OR REPLACE INTO cache_entries (key, value, kind, stored_at) VALUES (?, ?, ?, ?)",
+                (key, value_json, kind, stored_at)
+            )
+            return True
+        except sqlite3.Error as e:
+            print(f"Error writing persistent cache: {e}")
+            return False
+    
+    def delete(self, key: str) -> None:
+        """Remove an entry."""
+        try:
+            self._connect().execute("DELETE FROM cache_entries WHERE key = ?", (key,))
+        except sqlite3.Error as e:
+            print(f"Error deleting from persistent cache: {e}")
+    
+    def delete_expired(self, kind: str, stored_before: float) -> int:
+        """
+        Remove entries of a kind stored before a given time.
+        
+        Args:
+            kind: Entry kind
+            stored_before: Remove entries with stored_at older than this
+            
+        Returns:
+            Number of entries removed
+        """
+        try:
+            cursor = self._connect().execute(
+                "DELETE FROM cache_entries WHERE kind = ? AND stored_at < ?", (kind, stored_before)
+            )
+            return cursor.rowcount
+        except sqlite3.Error as e:
+            print(f"Error sweeping persistent cache: {e}")
+            return 0
+    
+    def count(self) -> int:
+        """Number of stored entries."""
+        return self._connect().execute("SELECT COUNT(*) FROM cache_entries").fetchone()[0]
+    
+    def clear(self) -> None:
+        """Remove all entries."""
+        self._connect().execute("DELETE FROM cache_entries")
+    
+    def close(self) -> None:
+        """Close the connections of all threads (a later call opens a new one)."""
+        with self._connections_lock:
+            connections, self._connections = self._connections, set()
+            self._local = threading.local()
+        for connection in connections:
+            connection.close()
@@ -0,0 +1,168 @@
+"""
+Process-wide rate limiting per website (host).
+
+Each scraper used to keep its own "last request time", but scraper objects are
+created for every analysis, so the delay was never shared between requests or
+threads. This module keeps one token bucket per host for the whole process:
+every page download and browser navigation takes a token for its host first.
+
+A token bucket allows short bursts (capacity) and then a steady rate of
+requests per second. Sync callers (scraper threads) sleep until a token is
+available; async callers await, so the event loop keeps running.
+"""
+
+from typing import Dict, Optional, Tuple
+from urllib.parse import urlparse
+import asyncio
+import threading
+import time
+
+
+# Requests per second and burst size for each host
+# Subdomains share the bucket of their domain (e.g., elite.finviz.com -> finviz.com)
+DEFAULT_HOST_LIMITS: Dict[str, Tuple[float, int]] = {
+    "finviz.com": (1.0, 3),
+    "macrotrends.net": (0.5, 2),
+    "morningstar.com": (0.5, 2),
+    "quickfs.net": (0.5, 2),
+    "koyfin.com": (0.5, 2),
+}
+
+# Limit for hosts not listed above (one request every 2 seconds)
+DEFAULT_HOST_LIMIT: Tuple[float, int] = (0.5, 1)
+
+
+class TokenBucket:
+    """Thread-safe token bucket."""
+    
+    def __init__(self, rate: float, capacity: int):
+        """
+        Initialize bucket (starts full).
+        
+        Args:
+            rate: Tokens added per second (= sustained requests per second)
+            capacity: Maximum tokens (= maximum burst of requests)
+        """
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = float(capacity)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+    
+    def available(self) -> float:
+        """Get the number of tokens available right now, without taking one."""
+        with self._lock:
+            elapsed = time.monotonic() - self._updated
+            return min(self.capacity, self._tokens + elapsed * self.rate)
+    
+    def reserve(self) -> float:
+        """
+        Take a token, possibly ahead of time.
+        
+        The token count can go negative: each caller gets the next free slot,
+        so waiting callers are served in order.
+        
+        Returns:
+            Seconds to wait before making the request (0 if a token was available)
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1
+            if self._tokens >= 0:
+                return 0.0
+            return -self._tokens / self.rate
+    
+    def acquire(self) -> float:
+        """
+        Wait (sleeping the current thread) until a token is available.
+        
+        Returns:
+            Seconds waited
+        """
+        wait = self.reserve()
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+    
+    async def acquire_async(self) -> float:
+        """
+        Wait until a token is available without blocking the event loop.
+        
+        Returns:
+            Seconds waited
+        """
+        wait = self.reserve()
+        if wait > 0:
+            await asyncio.sleep(wait)
+        return wait
+
+
+class HostRateLimiter:
+    """One token bucket per host, shared by all scrapers of the process."""
+    
+    def __init__(
+        self,
+        host_limits: Optional[Dict[str, Tuple[float, int]]] = None,
+        default_limit: Tuple[float, int] = DEFAULT_HOST_LIMIT
+    ):
+        """
+        Initialize limiter.
+        
+        Args:
+            host_limits: (requests per second, burst) by domain, merged over DEFAULT_HOST_LIMITS
+            default_limit: (requests per second, burst) for other hosts
+        """
+        self.host_limits = dict(DEFAULT_HOST_LIMITS)
+        if host_limits:
+            self.host_limits.update(host_limits)
+        self.default_limit = default_limit
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._lock = threading.Lock()
+    
+    def _host_key(self, url: str) -> str:
+        """Get the bucket key of a URL (or bare host): its configured domain, or the host itself."""
+        host = urlparse(url).hostname if "://" in url else url
+        host = (host or "").lower()
+        for domain in self.host_limits:
+            if host == domain or host.endswith("." + domain):
+                return domain
+        return host[4:] if host.startswith("www.") else host
+    
+    def bucket(self, url: str) -> TokenBucket:
+        """Get (or create) the token bucket for the host of a URL."""
+        key = self._host_key(url)
+        with self._lock:
+            if key not in self._buckets:
+                rate, capacity = self.host_limits.get(key, self.default_limit)
+                self._buckets[key] = TokenBucket(rate, capacity)
+            return self._buckets[key]
+    
+    def acquire(self, url: str) -> float:
+        """
+        Wait for permission to send a request to the host of a URL (blocking).
+        
+        Args:
+            url: URL about to be requested (or a host name)
+            
+        Returns:
+            Seconds waited
+        """
+        return self.bucket(url).acquire()
+    
+    async def acquire_async(self, url: str) -> float:
+        """
+        Async version of acquire (awaits instead of sleeping the thread).
+        
+        Args:
+            url: URL about to be requested (or a host name)
+            
+        Returns:
+            Seconds waited
+        """
+        return await self.bucket(url).acquire_async()
+
+
+# Global rate limiter shared by all scrapers
+rate_limiter = HostRateLimiter()
@@ -4,15 +4,15 @@ Service for fetching financial ratios from multiple sources.
 This service coordinates all scrapers and aggregates the data.
 """
 
+import asyncio
 import time
 import logging
-from typing import List, Optional
-from app.models.schemas import AnalysisResponse, RatioResult, SourceValue
-from app.scrapers.finviz import FinvizScraper
-from app.scrapers.yahoo import YahooScraper
-from app.scrapers.macrotrends import MacrotrendsScraper
-from app.scrapers.morningstar import MorningstarScraper
-from app.scrapers.quickfs import QuickFSScraper
+from typing import Any, AsyncIterator, Dict, List, Optional, Set, Tuple
+from app.models.schemas import AnalysisResponse, BatchAnalysisResponse, RatioResult, SourceValue
+from app.scrapers.registry import scraper_registry
+from app.services.cache import MISSING, scraper_cache
+from app.services.executor import ScraperTask, scraper_executor
+from app.services.singleflight import analysis_flight
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -92,154 +92,220 @@ def evaluate_status(metric: str, consensus: Optional[float], target: str) -> str
         return "Fail"
 
 
-def fetch_analysis(ticker: str) -> AnalysisResponse:
+# Layout of the analysis: (metric, target, [(source, scraper call name or None), ...])
+# A None call name means the source is not implemented yet (value stays None)
+RATIO_DEFINITIONS = [
+    ("Gross Margin", ">60%", [
+        ("Finviz", "Finviz Gross Margin"),
+        ("Morningstar", "Morningstar Gross Margin"),
+        ("Macrotrends", "Macrotrends Gross Margin"),
+    ]),
+    ("ROIC", ">10-12%", [
+        ("Finviz", "Finviz ROIC"),  # Same page as Finviz Gross Margin (shared snapshot)
+        ("QuickFS", "QuickFS ROIC"),
+        ("Morningstar", None),  # TODO: Add Morningstar scraper
+        ("Koyfin", None),  # TODO: Add Koyfin scraper
+    ]),
+    ("FCF Margin", ">20%", [
+        ("QuickFS", "QuickFS FCF Margin"),  # Same page as QuickFS ROIC (shared via page_cache)
+        ("Koyfin", None),  # TODO: Add Koyfin scraper
+        ("Macrotrends", "Macrotrends FCF Margin"),
+    ]),
+    ("Interest Coverage", "≥3-4x", [
+        ("Morningstar", None),  # TODO: Add Morningstar scraper
+        ("Koyfin", None),  # TODO: Add Koyfin scraper
+        ("Yahoo Finance", "Yahoo Interest Coverage"),
+    ]),
+    ("P/E Ratio", "Info Only", [
+        ("Finviz", "Finviz P/E Ratio"),
+        ("Yahoo Finance", "Yahoo P/E Ratio"),
+        ("Morningstar", None),  # TODO: Add Morningstar scraper
+    ]),
+]
+
+# Maximum time to wait for all scrapers of one analysis (seconds)
+# Scrapers still running after this keep going in the background and fill the cache
+ANALYSIS_TIMEOUT = 60
+
+# Maximum number of tickers analyzed at the same time in a batch
+# Their scraper calls share the executor (and its per-source limits), so more
+# analyses at once would only queue up and hit ANALYSIS_TIMEOUT while waiting
+BATCH_CONCURRENCY = 8
+
+# scraper_cache key of each scraper call (must match the keys used in the scrapers)
+# Used to serve expired values right away while they are refreshed in the background
+CACHE_KEYS = {
+    "Finviz Gross Margin": "finviz_gross_margin_{ticker}",
+    "Macrotrends Gross Margin": "macrotrends_gross_margin_{ticker}",
+    "Morningstar Gross Margin": "morningstar_gross_margin_{ticker}",
+    "Finviz ROIC": "finviz_roic_{ticker}",
+    "QuickFS ROIC": "quickfs_roic_{ticker}",
+    "QuickFS FCF Margin": "quickfs_fcf_margin_{ticker}",
+    "Macrotrends FCF Margin": "macrotrends_fcf_margin_{ticker}",
+    "Yahoo Interest Coverage": "yahoo_interest_coverage_{ticker}",
+    "Finviz P/E Ratio": "finviz_pe_{ticker}",
+    "Yahoo P/E Ratio": "yahoo_pe_{ticker}",
+}
+
+
+def build_scraper_tasks(ticker_upper: str) -> Dict[str, ScraperTask]:
     """
-    Fetch financial analysis for a ticker from all available sources.
-    
-    This is the main function that coordinates all scrapers.
-    Currently implements Finviz for Gross Margin.
-    More scrapers will be added incrementally.
+    Build all scraper calls needed for one ticker.
     
     Args:
-        ticker: Stock ticker symbol (e.g., "PLTR", "NVDA")
+        ticker_upper: Cleaned ticker symbol (e.g., "PLTR")
         
     Returns:
-        AnalysisResponse with all ratios and their status
+        Scraper calls by name (names match RATIO_DEFINITIONS)
     """
-    start_time = time.time()
-    ticker_upper = ticker.upper().strip()
-    
-    logger.info(f"🚀 Starting analysis for {ticker_upper}")
+    # Shared scraper instances (created once, keep-alive connections are reused)
+    finviz = scraper_registry.get("finviz")
+    yahoo = scraper_registry.get("yahoo")
+    macrotrends = scraper_registry.get("macrotrends")
+    morningstar = scraper_registry.get("morningstar")
+    quickfs = scraper_registry.get("quickfs")
     
-    # Initialize scrapers
-    finviz = FinvizScraper()
-    yahoo = YahooScraper()
-    macrotrends = MacrotrendsScraper()
-    morningstar = MorningstarScraper()
-    quickfs = QuickFSScraper()
-    
-    # Fetch Gross Margin from Finviz, Macrotrends, and Morningstar
-    logger.info(f"📊 Fetching Gross Margin...")
-    gm_start = time.time()
-    finviz_gross_margin = _time_scraper_call("Finviz Gross Margin", lambda: finviz.get_gross_margin(ticker_upper))
-    macrotrends_gross_margin = _time_scraper_call("Macrotrends Gross Margin", lambda: macrotrends.get_gross_margin(ticker_upper))
-    morningstar_gross_margin = _time_scraper_call("Morningstar Gross Margin", lambda: morningstar.get_gross_margin(ticker_upper))
-    logger.info(f"⏱️  Gross Margin total: {time.time() - gm_start:.2f}s")
-    
-    # Build Gross Margin ratio
-    gross_margin_values = [
-        SourceValue(source="Finviz", value=finviz_gross_margin),
-        SourceValue(source="Morningstar", value=morningstar_gross_margin),
-        SourceValue(source="Macrotrends", value=macrotrends_gross_margin)
-    ]
-    gross_margin_consensus = calculate_consensus(gross_margin_values)
-    gross_margin_spread = calculate_spread(gross_margin_values)
-    gross_margin_status = evaluate_status("Gross Margin", gross_margin_consensus, ">60%")
-    
-    # Fetch ROIC from QuickFS
-    logger.info(f"📊 Fetching ROIC...")
-    roic_start = time.time()
-    quickfs_roic = _time_scraper_call("QuickFS ROIC", lambda: quickfs.get_roic(ticker_upper))
-    logger.info(f"⏱️  ROIC total: {time.time() - roic_start:.2f}s")
-    
-    # Build ROIC ratio
-    roic_values = [
-        SourceValue(source="QuickFS", value=quickfs_roic),
-        SourceValue(source="Morningstar", value=None),  # TODO: Add Morningstar scraper
-        SourceValue(source="Koyfin", value=None)  # TODO: Add Koyfin scraper
-    ]
-    roic_consensus = calculate_consensus(roic_values)
-    roic_spread = calculate_spread(roic_values)
-    roic_status = evaluate_status("ROIC", roic_consensus, ">10-12%")
-    
-    # Build FCF Margin ratio
-    logger.info(f"📊 Fetching FCF Margin...")
-    fcf_start = time.time()
-    macrotrends_fcf_margin = _time_scraper_call("Macrotrends FCF Margin", lambda: macrotrends.get_fcf_margin(ticker_upper))
-    logger.info(f"⏱️  FCF Margin total: {time.time() - fcf_start:.2f}s")
-    fcf_margin_values = [
-        SourceValue(source="QuickFS", value=None),  # TODO: Add QuickFS scraper
-        SourceValue(source="Koyfin", value=None),  # TODO: Add Koyfin scraper
-        SourceValue(source="Macrotrends", value=macrotrends_fcf_margin)
-    ]
-    fcf_margin_consensus = calculate_consensus(fcf_margin_values)
-    fcf_margin_spread = calculate_spread(fcf_margin_values)
-    fcf_margin_status = evaluate_status("FCF Margin", fcf_margin_consensus, ">20%")
-    
-    # Build Interest Coverage ratio
-    logger.info(f"📊 Fetching Interest Coverage...")
-    ic_start = time.time()
-    yahoo_interest_coverage = _time_scraper_call("Yahoo Interest Coverage", lambda: yahoo.get_interest_coverage(ticker_upper))
-    logger.info(f"⏱️  Interest Coverage total: {time.time() - ic_start:.2f}s")
-    interest_coverage_values = [
-        SourceValue(source="Morningstar", value=None),  # TODO: Add Morningstar scraper
-        SourceValue(source="Koyfin", value=None),  # TODO: Add Koyfin scraper
-        SourceValue(source="Yahoo Finance", value=yahoo_interest_coverage)
-    ]
-    interest_coverage_consensus = calculate_consensus(interest_coverage_values)
-    interest_coverage_spread = calculate_spread(interest_coverage_values)
-    interest_coverage_status = evaluate_status("Interest Coverage", interest_coverage_consensus, "≥3-4x")
-    
-    # Fetch P/E Ratio from Finviz and Yahoo Finance
-    logger.info(f"📊 Fetching P/E Ratio...")
-    pe_start = time.time()
-    finviz_pe = _time_scraper_call("Finviz P/E Ratio", lambda: finviz.get_pe_ratio(ticker_upper))
-    yahoo_pe = _time_scraper_call("Yahoo P/E Ratio", lambda: yahoo.get_pe_ratio(ticker_upper))
-    logger.info(f"⏱️  P/E Ratio total: {time.time() - pe_start:.2f}s")
-    
-    # Build P/E Ratio
-    pe_values = [
-        SourceValue(source="Finviz", value=finviz_pe),
-        SourceValue(source="Yahoo Finance", value=yahoo_pe),
-        SourceValue(source="Morningstar", value=None)  # TODO: Add Morningstar scraper
-    ]
-    pe_consensus = calculate_consensus(pe_values)
-    pe_spread = calculate_spread(pe_values)
-    pe_status = evaluate_status("P/E Ratio", pe_consensus, "Info Only")
-    
-    # Build ratios list
-    ratios = [
-        RatioResult(
-            metric="Gross Margin",
-            values=gross_margin_values,
-            consensus=gross_margin_consensus,
-            spread=gross_margin_spread,
-            target=">60%",
-            status=gross_margin_status
+    # name: (source, sync call, async call or None)
+    # HTTP scrapers have async versions, awaited on the event loop by async analyses
+    calls = {
+        "Finviz Gross Margin": (
+            "Finviz",
+            lambda: finviz.get_gross_margin(ticker_upper),
+            lambda: finviz.get_gross_margin_async(ticker_upper),
         ),
-        RatioResult(
-            metric="ROIC",
-            values=roic_values,
-            consensus=roic_consensus,
-            spread=roic_spread,
-            target=">10-12%",
-            status=roic_status
+        "Macrotrends Gross Margin": (
+            "Macrotrends",
+            lambda: macrotrends.get_gross_margin(ticker_upper),
+            lambda: macrotrends.get_gross_margin_async(ticker_upper),
         ),
-        RatioResult(
-            metric="FCF Margin",
-            values=fcf_margin_values,
-            consensus=fcf_margin_consensus,
-            spread=fcf_margin_spread,
-            target=">20%",
-            status=fcf_margin_status
+        "Finviz ROIC": (
+            "Finviz",
+            lambda: finviz.get_roic(ticker_upper),
+            lambda: finviz.get_roic_async(ticker_upper),
         ),
-        RatioResult(
-            metric="Interest Coverage",
-            values=interest_coverage_values,
-            consensus=interest_coverage_consensus,
-            spread=interest_coverage_spread,
-            target="≥3-4x",
-            status=interest_coverage_status
+        "Morningstar Gross Margin": ("Morningstar", lambda: morningstar.get_gross_margin(ticker_upper), None),
+        "QuickFS ROIC": ("QuickFS", lambda: quickfs.get_roic(ticker_upper), None),
+        "QuickFS FCF Margin": ("QuickFS", lambda: quickfs.get_fcf_margin(ticker_upper), None),
+        "Macrotrends FCF Margin": (
+            "Macrotrends",
+            lambda: macrotrends.get_fcf_margin(ticker_upper),
+            lambda: macrotrends.get_fcf_margin_async(ticker_upper),
         ),
-        RatioResult(
-            metric="P/E Ratio",
-            values=pe_values,
-            consensus=pe_consensus,
-            spread=pe_spread,
-            target="Info Only",
-            status=pe_status
+        "Yahoo Interest Coverage": ("Yahoo Finance", lambda: yahoo.get_interest_coverage(ticker_upper), None),
+        "Finviz P/E Ratio": (
+            "Finviz",
+            lambda: finviz.get_pe_ratio(ticker_upper),
+            lambda: finviz.get_pe_ratio_async(ticker_upper),
+        ),
+        "Yahoo P/E Ratio": ("Yahoo Finance", lambda: yahoo.get_pe_ratio(ticker_upper), None),
+    }
+    
+    # Wrap each call with timing/logging (bind loop variables as defaults)
+    # The key lets the executor share one in-flight call between concurrent analyses
+    return {
+        name: ScraperTask(
+            source,
+            lambda name=name, func=func: _time_scraper_call(name, func),
+            key=f"{name}:{ticker_upper}",
+            async_func=(
+                (lambda name=name, async_func=async_func: _time_scraper_call_async(name, async_func))
+                if async_func else None
+            )
         )
-    ]
+        for name, (source, func, async_func) in calls.items()
+    }
+
+
+def _serve_stale(
+    ticker_upper: str,
+    tasks: Dict[str, ScraperTask]
+) -> Tuple[Dict[str, Optional[float]], Dict[str, ScraperTask]]:
+    """
+    Stale-while-revalidate: use expired cached values instead of waiting for a scrape.
+    
+    For each call whose cache entry has expired but is still within the cache's
+    max staleness, the old value is used right away and the call is started in
+    the background to refresh the cache. Calls with no usable value are left to
+    run normally (synchronous refresh).
+    
+    Args:
+        ticker_upper: Cleaned ticker symbol
+        tasks: Scraper calls by name
+        
+    Returns:
+        (stale values by call name, calls that still need to run)
+    """
+    stale_results = {}
+    remaining = {}
+    for name, task in tasks.items():
+        key_format = CACHE_KEYS.get(name)
+        if key_format is not None:
+            cache_key = key_format.format(ticker=ticker_upper)
+            if scraper_cache.lookup(cache_key) is MISSING:
+                stale = scraper_cache.get_stale(cache_key)
+                if stale is not None:
+                    value, age = stale
+                    logger.info(f"   ♻️ STALE {name}: {age / 3600:.1f}h old → {value}, refreshing in background")
+                    scraper_executor.submit(task)  # Deduplicated by task key
+                    stale_results[name] = value
+                    continue
+        remaining[name] = task
+    return stale_results, remaining
+
+
+def _build_ratio(metric: str, target: str, values: List[SourceValue]) -> RatioResult:
+    """
+    Build a RatioResult from source values (consensus, spread and status).
+    
+    Args:
+        metric: Metric name (e.g., "Gross Margin")
+        target: Target threshold string (e.g., ">60%")
+        values: Values from each source
+        
+    Returns:
+        RatioResult for the metric
+    """
+    consensus = calculate_consensus(values)
+    return RatioResult(
+        metric=metric,
+        values=values,
+        consensus=consensus,
+        spread=calculate_spread(values),
+        target=target,
+        status=evaluate_status(metric, consensus, target)
+    )
+
+
+def _build_analysis(
+    ticker_upper: str,
+    results: Dict[str, Optional[float]],
+    start_time: float,
+    stale: Optional[Set[str]] = None
+) -> AnalysisResponse:
+    """
+    Assemble the AnalysisResponse from scraper results.
+    
+    Args:
+        ticker_upper: Cleaned ticker symbol
+        results: Scraper results by call name (missing names count as None)
+        start_time: Time the analysis started (time.time())
+        stale: Call names whose value is an expired cached value being refreshed
+        
+    Returns:
+        AnalysisResponse with all ratios and their status
+    """
+    stale = stale or set()
+    ratios = []
+    for metric, target, slots in RATIO_DEFINITIONS:
+        values = [
+            SourceValue(
+                source=source,
+                value=results.get(call_name) if call_name else None,
+                stale=call_name in stale
+            )
+            for source, call_name in slots
+        ]
+        ratios.append(_build_ratio(metric, target, values))
     
     # Calculate overall score (count Pass statuses, excluding P/E)
     overall_score = sum(1 for r in ratios if r.status == "Pass" and r.metric != "P/E Ratio")
@@ -247,9 +313,6 @@ def fetch_analysis(ticker: str) -> AnalysisResponse:
     
     total_time = time.time() - start_time
     logger.info(f"✅ Analysis complete for {ticker_upper} in {total_time:.2f}s")
-    logger.info(f"📈 Performance breakdown:")
-    logger.info(f"   - Total time: {total_time:.2f}s")
-    logger.info(f"   - Average per scraper: {total_time / 8:.2f}s")  # Approximate
     
     return AnalysisResponse(
         ticker=ticker_upper,
@@ -260,6 +323,236 @@ def fetch_analysis(ticker: str) -> AnalysisResponse:
     )
 
 
+def fetch_analysis(ticker: str) -> AnalysisResponse:
+    """
+    Fetch financial analysis for a ticker from all available sources.
+    
+    This is the main function that coordinates all scrapers.
+    All scraper calls run concurrently on the shared scraper executor,
+    so total time is roughly the time of the slowest source.
+    Concurrent calls for the same ticker are coalesced into one scrape.
+    
+    Args:
+        ticker: Stock ticker symbol (e.g., "PLTR", "NVDA")
+        
+    Returns:
+        AnalysisResponse with all ratios and their status
+    """
+    ticker_upper = ticker.upper().strip()
+    
+    # Concurrent requests for the same ticker share one analysis
+    return analysis_flight.do(ticker_upper, lambda: _run_analysis(ticker_upper))
+
+
+def _run_analysis(ticker_upper: str) -> AnalysisResponse:
+    """Run all scrapers for a ticker and build the response (no deduplication)."""
+    start_time = time.time()
+    logger.info(f"🚀 Starting analysis for {ticker_upper}")
+    
+    tasks = build_scraper_tasks(ticker_upper)
+    stale_results, tasks = _serve_stale(ticker_upper, tasks)
+    results = scraper_executor.run_all(tasks, timeout=ANALYSIS_TIMEOUT)
+    results.update(stale_results)
+    
+    return _build_analysis(ticker_upper, results, start_time, stale=set(stale_results))
+
+
+async def fetch_analysis_async(ticker: str) -> AnalysisResponse:
+    """
+    Async version of fetch_analysis, used by the API routes.
+    
+    Scraper calls still run on the executor's worker threads, but the event
+    loop only awaits them, so the server keeps answering other requests
+    (health checks, other analyses) while scrapers are running.
+    
+    Args:
+        ticker: Stock ticker symbol (e.g., "PLTR", "NVDA")
+        
+    Returns:
+        AnalysisResponse with all ratios and their status
+    """
+    ticker_upper = ticker.upper().strip()
+    
+    # Concurrent requests for the same ticker share one analysis
+    return await analysis_flight.do_async(ticker_upper, lambda: _run_analysis_async(ticker_upper))
+
+
+async def _run_analysis_async(ticker_upper: str) -> AnalysisResponse:
+    """Async version of _run_analysis."""
+    start_time = time.time()
+    logger.info(f"🚀 Starting analysis for {ticker_upper}")
+    
+    tasks = build_scraper_tasks(ticker_upper)
+    stale_results, tasks = _serve_stale(ticker_upper, tasks)
+    results = await scraper_executor.run_all_async(tasks, timeout=ANALYSIS_TIMEOUT)
+    results.update(stale_results)
+    
+    return _build_analysis(ticker_upper, results, start_time, stale=set(stale_results))
+
+
+async def stream_analysis_async(ticker: str) -> AsyncIterator[Tuple[str, Dict[str, Any]]]:
+    """
+    Run an analysis and yield results as soon as each scraper call finishes.
+    
+    Used by the SSE route, so the page can show fast sources (Finviz, Yahoo)
+    right away instead of waiting for the slowest Selenium scraper.
+    
+    Events, in order:
+    - ("start", layout): ticker and the metrics/targets/sources to expect
+    - ("source", {metric, source, value, stale}): one per source value, when known
+    - ("ratio", RatioResult): when all sources of a metric are known
+    - ("done", AnalysisResponse): the full analysis, with the overall score
+    
+    Scraper calls are shared with concurrent analyses of the same ticker
+    (executor keys), like fetch_analysis_async.
+    
+    Args:
+        ticker: Stock ticker symbol (e.g., "PLTR", "NVDA")
+        
+    Yields:
+        (event name, JSON-serializable data)
+    """
+    ticker_upper = ticker.upper().strip()
+    start_time = time.time()
+    logger.info(f"🚀 Starting streamed analysis for {ticker_upper}")
+    
+    yield "start", {
+        "ticker": ticker_upper,
+        "ratios": [
+            {"metric": metric, "target": target, "sources": [source for source, _ in slots]}
+            for metric, target, slots in RATIO_DEFINITIONS
+        ],
+    }
+    
+    tasks = build_scraper_tasks(ticker_upper)
+    stale_results, tasks = _serve_stale(ticker_upper, tasks)
+    results: Dict[str, Optional[float]] = dict(stale_results)
+    stale = set(stale_results)
+    pending = {
+        asyncio.ensure_future(scraper_executor.run_async(task)): name
+        for name, task in tasks.items()
+    }
+    
+    # Metrics still waiting for sources, and which call names they wait for
+    waiting = {
+        metric: {call_name for _, call_name in slots if call_name in tasks}
+        for metric, _, slots in RATIO_DEFINITIONS
+    }
+    
+    def source_events(done_names: Set[str]):
+        """Events for every source value / ratio completed by these call names."""
+        events = []
+        for metric, target, slots in RATIO_DEFINITIONS:
+            for source, call_name in slots:
+                if call_name in done_names:
+                    events.append(("source", {
+                        "metric": metric,
+                        "source": source,
+                        "value": results.get(call_name),
+                        "stale": call_name in stale,
+                    }))
+            if metric in waiting and not (waiting[metric] - results.keys()):
+                del waiting[metric]
+                values = [
+                    SourceValue(
+                        source=source,
+                        value=results.get(call_name) if call_name else None,
+                        stale=call_name in stale
+                    )
+                    for source, call_name in slots
+                ]
+                events.append(("ratio", _build_ratio(metric, target, values).model_dump()))
+        return events
+    
+    # Stale values (and ratios that need no scraping at all) are known right away
+    for event in source_events(set(stale_results)):
+        yield event
+    
+    deadline = start_time + ANALYSIS_TIMEOUT
+    try:
+        while pending:
+            remaining = deadline - time.time()
+            if remaining <= 0:
+                break
+            done, _ = await asyncio.wait(pending, timeout=remaining, return_when=asyncio.FIRST_COMPLETED)
+            done_names = set()
+            for future in done:
+                name = pending.pop(future)
+                results[name] = future.result() if not future.cancelled() and future.exception() is None else None
+                done_names.add(name)
+            for event in source_events(done_names):
+                yield event
+        
+        # Calls past the timeout count as None (they keep running and fill the cache)
+        timed_out = set(pending.values())
+        for name in timed_out:
+            results[name] = None
+        for event in source_events(timed_out):
+            yield event
+    finally:
+        for future in pending:
+            # Only stops waiting (e.g., the client disconnected): scraper calls run in their own
+            # threads/tasks, keep going for the other analyses sharing them and fill the cache
+            future.cancel()
+    
+    yield "done", _build_analysis(ticker_upper, results, start_time, stale=stale).model_dump()
+
+
+async def fetch_batch_async(tickers: List[str]) -> BatchAnalysisResponse:
+    """
+    Analyze many tickers in one call (used by POST /api/analyze/batch).
+    
+    Up to BATCH_CONCURRENCY analyses run at once. All their scraper calls go
+    through the shared executor, so per-source limits still apply across the
+    whole batch, and sources answer for several tickers at the same time
+    instead of one ticker after another.
+    
+    Args:
+        tickers: Ticker symbols (duplicates and blanks are ignored)
+        
+    Returns:
+        BatchAnalysisResponse with results and errors by ticker
+    """
+    start_time = time.time()
+    ticker_list = list(dict.fromkeys(t.upper().strip() for t in tickers if t and t.strip()))
+    logger.info(f"📦 Starting batch analysis of {len(ticker_list)} tickers")
+    
+    # Yahoo Finance data of the batch is prefetched in parallel alongside the analyses
+    # (their Yahoo getters then read it, or wait for it, instead of loading it themselves)
+    yahoo_keys = [key for name, key in CACHE_KEYS.items() if name.startswith("Yahoo")]
+    yahoo_tickers = [
+        t for t in ticker_list
+        if any(scraper_cache.lookup(key.format(ticker=t)) is MISSING for key in yahoo_keys)
+    ]
+    yahoo_prefetch = asyncio.ensure_future(asyncio.to_thread(scraper_registry.get("yahoo").prefetch, yahoo_tickers))
+    
+    semaphore = asyncio.Semaphore(BATCH_CONCURRENCY)
+    
+    async def analyze(ticker_upper: str) -> AnalysisResponse:
+        async with semaphore:
+            return await fetch_analysis_async(ticker_upper)
+    
+    outcomes = await asyncio.gather(*(analyze(t) for t in ticker_list), return_exceptions=True)
+    try:
+        await yahoo_prefetch
+    except Exception as e:
+        logger.error(f"   ❌ Yahoo Finance prefetch failed: {e}")
+    
+    results = {}
+    errors = {}
+    for ticker_upper, outcome in zip(ticker_list, outcomes):
+        if isinstance(outcome, Exception):
+            logger.error(f"   ❌ {ticker_upper}: {outcome}")
+            errors[ticker_upper] = str(outcome)
+        else:
+            results[ticker_upper] = outcome
+    
+    total_time = time.time() - start_time
+    logger.info(f"✅ Batch analysis of {len(ticker_list)} tickers complete in {total_time:.2f}s")
+    
+    return BatchAnalysisResponse(results=results, errors=errors, execution_time=round(total_time, 2))
+
+
 def _time_scraper_call(scraper_name: str, scraper_func) -> Optional[float]:
     """
     Execute a scraper call and log the execution time.
@@ -283,3 +576,26 @@ def _time_scraper_call(scraper_name: str, scraper_func) -> Optional[float]:
         logger.error(f"   ❌ {scraper_name}: {elapsed:.2f}s → ERROR: {e}")
         return None
 
+
+async def _time_scraper_call_async(scraper_name: str, scraper_func) -> Optional[float]:
+    """
+    Async version of _time_scraper_call.
+    
+    Args:
+        scraper_name: Name of the scraper for logging
+        scraper_func: Function returning an awaitable (lambda)
+        
+    Returns:
+        Result from scraper_func
+    """
+    start = time.time()
+    try:
+        result = await scraper_func()
+        elapsed = time.time() - start
+        cache_status = "💾 CACHED" if elapsed < 0.1 else "🌐 LIVE"
+        logger.info(f"   {cache_status} {scraper_name}: {elapsed:.2f}s → {result if result is not None else 'None'}")
+        return result
+    except Exception as e:
+        elapsed = time.time() - start
+        logger.error(f"   ❌ {scraper_name}: {elapsed:.2f}s → ERROR: {e}")
+        return None
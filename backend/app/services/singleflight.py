@@ -0,0 +1,154 @@
+"""
+Single-flight request coalescing.
+
+When several users ask for the same ticker at the same moment, they all miss
+the cache and would each start their own scrape (duplicate Selenium sessions,
+duplicate hits against rate-limited sites). With single-flight, the first
+caller does the work and later callers for the same key wait for its result.
+
+Used at two levels:
+- analysis_flight: whole analyses, keyed by ticker
+- the scraper executor: individual scraper calls, keyed by call name + ticker
+"""
+
+from concurrent.futures import Future
+from typing import Any, Awaitable, Callable, Dict, Optional, Set, Tuple
+import asyncio
+import threading
+
+
+async def await_shared(future: Future) -> Any:
+    """
+    Await a future shared with other callers, from async code.
+    
+    If this caller is cancelled (e.g., a client disconnected), only its wait
+    stops: the shared future is not cancelled, so other callers still get the result.
+    
+    Args:
+        future: Shared concurrent.futures.Future
+        
+    Returns:
+        Result of the future
+    """
+    return await asyncio.shield(asyncio.wrap_future(future))
+
+
+class SingleFlight:
+    """Deduplicates concurrent calls that share the same key."""
+    
+    def __init__(self):
+        self._calls: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+        self._tasks: Set[asyncio.Future] = set()  # Async leader calls running (strong references)
+    
+    def in_flight(self, key: str) -> Optional[Future]:
+        """Get the future of the call currently running for a key (None if idle)."""
+        with self._lock:
+            return self._calls.get(key)
+    
+    def _forget(self, key: str, future: Future) -> None:
+        """Remove a finished call (only if it's still the registered one)."""
+        with self._lock:
+            if self._calls.get(key) is future:
+                del self._calls[key]
+    
+    def share(self, key: str, start: Callable[[], Future]) -> Future:
+        """
+        Get the in-flight future for a key, or start a new call.
+        
+        Args:
+            key: Deduplication key (e.g., "Finviz Gross Margin:PLTR")
+            start: Function starting the call and returning its future
+                   (only called if nothing is in flight for the key)
+                   
+        Returns:
+            Future shared by every caller of this key
+        """
+        with self._lock:
+            future = self._calls.get(key)
+            if future is not None:
+                return future
+            future = start()
+            self._calls[key] = future
+        future.add_done_callback(lambda f: self._forget(key, f))
+        return future
+    
+    def _lead(self, key: str) -> Tuple[Future, bool]:
+        """Register a new call for a key, or return the existing one."""
+        with self._lock:
+            future = self._calls.get(key)
+            if future is not None:
+                return future, False
+            future = Future()
+            self._calls[key] = future
+            return future, True
+    
+    def do(self, key: str, func: Callable[[], Any]) -> Any:
+        """
+        Run func, unless a call with the same key is already running.
+        
+        The first caller runs func in its own thread; others block until it
+        finishes and get the same result (or the same exception).
+        
+        Args:
+            key: Deduplication key (e.g., ticker)
+            func: Function to run
+            
+        Returns:
+            Result of func (from this call or the in-flight one)
+        """
+        future, leader = self._lead(key)
+        if not leader:
+            return future.result()
+        
+        try:
+            future.set_result(func())
+        except BaseException as e:
+            future.set_exception(e)
+        finally:
+            self._forget(key, future)
+        return future.result()
+    
+    async def do_async(self, key: str, func: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Async version of do: await func(), unless a call with the same key is running.
+        
+        Sync and async callers share the same in-flight calls.
+        
+        The call runs as its own task: cancelling a caller (even the first
+        one) only stops its wait, and the other callers still get the result.
+        
+        Args:
+            key: Deduplication key (e.g., ticker)
+            func: Function returning an awaitable (e.g., lambda: fetch_async(ticker))
+            
+        Returns:
+            Result of func (from this call or the in-flight one)
+        """
+        future, leader = self._lead(key)
+        if leader:
+            try:
+                task = asyncio.ensure_future(func())
+            except BaseException as e:
+                future.set_exception(e)
+                self._forget(key, future)
+                raise
+            self._tasks.add(task)
+            task.add_done_callback(lambda t: self._settle(key, future, t))
+        return await await_shared(future)
+    
+    def _settle(self, key: str, future: Future, task: asyncio.Future) -> None:
+        """Pass an async call's outcome to its shared future (never a CancelledError)."""
+        self._tasks.discard(task)
+        if task.cancelled():
+            # Only happens if the event loop itself is shutting down
+            future.set_exception(RuntimeError(f"Call {key} was cancelled"))
+        elif task.exception() is not None:
+            future.set_exception(task.exception())
+        else:
+            future.set_result(task.result())
+        self._forget(key, future)
+
+
+# Global single-flight group for whole analyses (keyed by ticker)
+analysis_flight = SingleFlight()
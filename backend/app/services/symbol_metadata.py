@@ -0,0 +1,262 @@
+"""
+Symbol metadata index: what each source needs to build a ticker's URL.
+
+Some sources need more than the ticker in their URLs:
+- Macrotrends: a company slug (/stocks/charts/NVDA/nvidia/...)
+- Morningstar: the exchange code (/stocks/xnys/ibm/...)
+
+Guessing them wrong costs a redirect, or a whole Selenium page load that finds
+nothing. This index keeps, per ticker, the exchange code, the Macrotrends slug
+and the company name, in a dict (constant-time lookups). It learns:
+- from redirects (the URL a site sent us to has the right slug/exchange)
+- from Yahoo Finance info (exchange and company name)
+- from a bulk file (JSON or CSV) loaded at startup
+
+The FastAPI lifespan in app/main.py opens the JSON file the index is saved to,
+so what it learned survives restarts. Without it (scripts, tests), the index
+lives in memory only. Saves are batched: changes are written SAVE_DELAY
+seconds after the first one (a batch analysis learns many tickers at once),
+and close() writes what is left.
+"""
+
+from typing import Any, Dict, Optional
+from urllib.parse import urlparse
+import csv
+import json
+import logging
+import os
+import tempfile
+import threading
+
+logger = logging.getLogger(__name__)
+
+# Time between a change and the save of the index file (changes meanwhile are saved together)
+SAVE_DELAY = 2.0
+
+# Fields kept for each ticker
+FIELDS = ("exchange", "macrotrends_slug", "name")
+
+# Known symbols (used until learned or loaded otherwise)
+DEFAULT_SYMBOLS: Dict[str, Dict[str, str]] = {
+    "PLTR": {"exchange": "xnas", "macrotrends_slug": "palantir-technologies"},
+    "NVDA": {"exchange": "xnas", "macrotrends_slug": "nvidia"},
+    "MSFT": {"exchange": "xnas", "macrotrends_slug": "microsoft"},
+    "AAPL": {"exchange": "xnas", "macrotrends_slug": "apple"},
+}
+
+# Yahoo Finance exchange codes -> Morningstar exchange codes (MIC)
+YAHOO_EXCHANGES = {
+    "NMS": "xnas",  # NASDAQ Global Select
+    "NGM": "xnas",  # NASDAQ Global Market
+    "NCM": "xnas",  # NASDAQ Capital Market
+    "NAS": "xnas",
+    "NYQ": "xnys",  # NYSE
+    "ASE": "xase",  # NYSE American
+    "PCX": "arcx",  # NYSE Arca
+    "BTS": "bats",  # Cboe BZX
+}
+
+
+class SymbolMetadataIndex:
+    """Ticker -> {exchange, macrotrends_slug, name}, optionally saved to a JSON file."""
+    
+    def __init__(self, symbols: Optional[Dict[str, Dict[str, str]]] = None, save_delay: float = SAVE_DELAY):
+        """
+        Initialize index (in memory until open() is called).
+        
+        Args:
+            symbols: Initial entries by ticker (default: DEFAULT_SYMBOLS)
+            save_delay: Time between a change and the save of the file (seconds)
+        """
+        source = DEFAULT_SYMBOLS if symbols is None else symbols
+        self._symbols: Dict[str, Dict[str, str]] = {ticker.upper(): dict(entry) for ticker, entry in source.items()}
+        self._path: Optional[str] = None
+        self.save_delay = save_delay
+        self._lock = threading.Lock()
+        self._save_lock = threading.Lock()  # One file write at a time
+        self._save_timer: Optional[threading.Timer] = None
+    
+    def open(self, path: str) -> int:
+        """
+        Load the index saved at path (if any) and save every change there from now on.
+        
+        Args:
+            path: JSON file (parent directory is created if needed)
+            
+        Returns:
+            Number of tickers loaded from the file
+        """
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        loaded = self.load_file(path) if os.path.exists(path) else 0
+        with self._lock:
+            self._path = path
+        return loaded
+    
+    def close(self) -> None:
+        """Save pending changes and stop saving (the entries stay in memory)."""
+        self.flush()
+        with self._lock:
+            self._path = None
+    
+    def flush(self) -> None:
+        """Save pending changes now (no-op if there are none)."""
+        with self._lock:
+            timer, self._save_timer = self._save_timer, None
+            if timer is None or self._path is None:
+                return
+            timer.cancel()
+            path = self._path
+            symbols = {ticker: dict(entry) for ticker, entry in self._symbols.items()}
+        
+        # Written outside the lock: lookups and updates don't wait for the disk
+        with self._save_lock:
+            self._write(path, symbols)
+    
+    def get(self, ticker: str) -> Dict[str, str]:
+        """
+        Get everything known about a ticker.
+        
+        Args:
+            ticker: Stock ticker symbol (e.g., 'PLTR')
+            
+        Returns:
+            Copy of the entry (e.g., {"exchange": "xnas", "name": "Palantir"}), empty if unknown
+        """
+        return dict(self._symbols.get(ticker.upper().strip(), {}))
+    
+    def exchange(self, ticker: str) -> Optional[str]:
+        """Get the Morningstar exchange code of a ticker (e.g., 'xnys'), None if unknown."""
+        return self._symbols.get(ticker.upper().strip(), {}).get("exchange")
+    
+    def macrotrends_slug(self, ticker: str) -> Optional[str]:
+        """Get the Macrotrends company slug of a ticker (e.g., 'nvidia'), None if unknown."""
+        return self._symbols.get(ticker.upper().strip(), {}).get("macrotrends_slug")
+    
+    def update(self, ticker: str, **fields: Optional[str]) -> bool:
+        """
+        Set fields of a ticker (None/empty values are ignored), saving the index if it changed.
+        
+        Args:
+            ticker: Stock ticker symbol
+            fields: exchange, macrotrends_slug and/or name
+            
+        Returns:
+            True if something changed
+        """
+        changes = {field: str(value) for field, value in fields.items() if field in FIELDS and value}
+        if not ticker or not changes:
+            return False
+        ticker = ticker.upper().strip()
+        with self._lock:
+            entry = self._symbols.get(ticker, {})
+            if all(entry.get(field) == value for field, value in changes.items()):
+                return False
+            self._symbols[ticker] = dict(entry, **changes)
+            self._schedule_save_locked()
+        return True
+    
+    def learn_from_url(self, url: str) -> bool:
+        """
+        Learn from the final URL of a page (after redirects).
+        
+        Args:
+            url: e.g., https://www.macrotrends.net/stocks/charts/IBM/ibm/financial-statements
+                 or https://www.morningstar.com/stocks/xnys/ibm/key-metrics
+                 
+        Returns:
+            True if something new was learned
+        """
+        parsed = urlparse(url)
+        host = (parsed.hostname or "").lower()
+        parts = [part for part in parsed.path.split("/") if part]
+        
+        # /stocks/charts/{TICKER}/{slug}/{page}
+        if host.endswith("macrotrends.net") and len(parts) >= 4 and parts[:2] == ["stocks", "charts"]:
+            return self.update(parts[2], macrotrends_slug=parts[3].lower())
+        # /stocks/{exchange}/{ticker}/{page}
+        if host.endswith("morningstar.com") and len(parts) >= 3 and parts[0] == "stocks":
+            return self.update(parts[2], exchange=parts[1].lower())
+        return False
+    
+    def learn_from_yahoo(self, ticker: str, info: Dict[str, Any]) -> bool:
+        """
+        Learn the exchange and company name from Yahoo Finance info.
+        
+        Args:
+            ticker: Stock ticker symbol
+            info: yfinance Ticker.info
+            
+        Returns:
+            True if something new was learned
+        """
+        return self.update(
+            ticker,
+            exchange=YAHOO_EXCHANGES.get(str(info.get("exchange", "")).upper()),
+            name=info.get("longName") or info.get("shortName")
+        )
+    
+    def load_file(self, path: str) -> int:
+        """
+        Bulk-load symbols from a file (entries are merged over the current ones).
+        
+        Formats:
+        - JSON: {"IBM": {"exchange": "xnys", "macrotrends_slug": "ibm", "name": "IBM"}, ...}
+        - CSV: header row with "ticker" and any of exchange, macrotrends_slug, name
+        
+        Args:
+            path: .json or .csv file
+            
+        Returns:
+            Number of tickers loaded (0 if the file can't be read)
+        """
+        try:
+            with open(path, newline="") as f:
+                if path.lower().endswith(".csv"):
+                    rows = {row.get("ticker", ""): row for row in csv.DictReader(f)}
+                else:
+                    rows = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"Error loading symbol metadata from {path}: {e}")
+            return 0
+        
+        loaded = 0
+        with self._lock:
+            for ticker, row in rows.items():
+                entry = {field: str(row[field]) for field in FIELDS if isinstance(row, dict) and row.get(field)}
+                if ticker and entry:
+                    ticker = ticker.upper().strip()
+                    self._symbols[ticker] = dict(self._symbols.get(ticker, {}), **entry)
+                    loaded += 1
+            if loaded and self._path != path:
+                self._schedule_save_locked()
+        return loaded
+    
+    def _schedule_save_locked(self) -> None:
+        """Save the index to its file after save_delay, if open (caller holds the lock)."""
+        if self._path is None or self._save_timer is not None:
+            return
+        self._save_timer = threading.Timer(self.save_delay, self.flush)
+        self._save_timer.daemon = True
+        self._save_timer.start()
+    
+    def _write(self, path: str, symbols: Dict[str, Dict[str, str]]) -> None:
+        """Write entries to path through a temporary file of its own (atomic: readers never see a partial file)."""
+        temp_path = None
+        try:
+            with tempfile.NamedTemporaryFile(
+                "w", dir=os.path.dirname(os.path.abspath(path)), prefix=".symbols-", suffix=".tmp", delete=False
+            ) as f:
+                temp_path = f.name
+                json.dump(symbols, f, indent=1, sort_keys=True)
+            os.replace(temp_path, path)
+        except OSError as e:
+            logger.error(f"Error saving symbol metadata to {path}: {e}")
+            if temp_path is not None and os.path.exists(temp_path):
+                os.remove(temp_path)
+    
+    def __len__(self) -> int:
+        return len(self._symbols)
+
+
+# Global index used by the scrapers
+symbol_index = SymbolMetadataIndex()
@@ -0,0 +1,97 @@
+"""
+Benchmark: bytes and time saved by the per-source request blocklists.
+
+Loads each Selenium source page twice in a pooled Chrome, without and with its
+blocklist (browser cache disabled, so both loads download everything they
+request), and reports from the DevTools network events:
+- requests made and requests blocked
+- bytes downloaded (encoded, i.e. as transferred)
+- time until the page finished loading
+
+Requires Chrome and network access to the sites.
+
+Usage (from backend/):
+    python -m benchmarks.bench_blocking [--ticker PLTR] [--url URL ...]
+"""
+
+import argparse
+import json
+import time
+
+from app.scrapers import koyfin, morningstar, quickfs
+from app.scrapers.browser_pool import browser_pool
+
+
+def page_load_stats(entries):
+    """
+    Summarize the performance log of one page load.
+    
+    Args:
+        entries: driver.get_log("performance") entries
+        
+    Returns:
+        {"requests", "blocked", "bytes"}
+    """
+    stats = {"requests": 0, "blocked": 0, "bytes": 0}
+    for entry in entries:
+        try:
+            message = json.loads(entry["message"])["message"]
+        except (KeyError, TypeError, ValueError):
+            continue
+        params = message.get("params", {})
+        if message.get("method") == "Network.requestWillBeSent":
+            stats["requests"] += 1
+        elif message.get("method") == "Network.loadingFailed" and params.get("blockedReason"):
+            stats["blocked"] += 1
+        elif message.get("method") == "Network.loadingFinished":
+            stats["bytes"] += int(params.get("encodedDataLength", 0))
+    return stats
+
+
+def load(url, blocked_urls):
+    """Load a page with a blocklist; returns its stats and load time."""
+    with browser_pool.driver(blocked_urls=blocked_urls) as driver:
+        driver.execute_cdp_cmd("Network.setCacheDisabled", {"cacheDisabled": True})
+        driver.get_log("performance")  # Drop events of the previous page
+        start = time.perf_counter()
+        driver.get(url)
+        elapsed = time.perf_counter() - start
+        time.sleep(1)  # Let late requests show up in the log
+        stats = page_load_stats(driver.get_log("performance"))
+        driver.execute_cdp_cmd("Network.setCacheDisabled", {"cacheDisabled": False})
+    stats["seconds"] = elapsed
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--ticker", default="PLTR")
+    parser.add_argument("--url", nargs="*", help="Other pages to measure (with the default blocklist)")
+    args = parser.parse_args()
+    
+    ticker = args.ticker.upper()
+    pages = [
+        ("Morningstar", f"https://www.morningstar.com/stocks/xnas/{ticker.lower()}/key-metrics", morningstar.BLOCKED_URLS),
+        ("QuickFS", f"https://quickfs.net/company/{ticker}", quickfs.BLOCKED_URLS),
+        ("Koyfin", f"https://app.koyfin.com/company/{ticker}/overview", koyfin.BLOCKED_URLS),
+    ]
+    pages += [(url, url, morningstar.DEFAULT_BLOCKED_URLS) for url in args.url or []]
+    
+    print(f"{'Page':<14} {'Requests':>15} {'Blocked':>8} {'Downloaded':>21} {'Load time':>17}")
+    try:
+        browser_pool.start(warm=1)
+        for name, url, blocked_urls in pages:
+            full = load(url, [])
+            lean = load(url, blocked_urls)
+            saved = 1 - lean["bytes"] / full["bytes"] if full["bytes"] else 0
+            print(
+                f"{name[:14]:<14} {full['requests']:>6} -> {lean['requests']:<6} {lean['blocked']:>8} "
+                f"{full['bytes'] / 1024:>7.0f}KB -> {lean['bytes'] / 1024:>6.0f}KB ({saved:>4.0%}) "
+                f"{full['seconds']:>5.1f}s -> {lean['seconds']:.1f}s"
+            )
+    finally:
+        browser_pool.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""
+Benchmark: full BeautifulSoup trees vs. partial parsing (PARSE_ONLY XPath).
+
+For each scraper with a PARSE_ONLY filter, parses its fixture page both ways,
+checks the scraper reads the same value from both trees, and reports parse
+time and peak memory. Memory is the peak of Python allocations (tracemalloc),
+i.e. mostly the BeautifulSoup tree; lxml's short-lived C buffers aren't counted.
+
+Usage (from backend/):
+    python -m benchmarks.bench_parsing [--repeat 20]
+"""
+
+import argparse
+import os
+import time
+import tracemalloc
+
+from app.scrapers.base import parse_html
+from app.scrapers.finviz import FinvizScraper
+from app.scrapers.macrotrends import MacrotrendsScraper
+from app.scrapers.morningstar import MorningstarScraper
+from benchmarks.fixtures import generate_fixtures
+
+FIXTURES_DIR = generate_fixtures.FIXTURES_DIR
+
+finviz = FinvizScraper()
+macrotrends = MacrotrendsScraper()
+morningstar = MorningstarScraper()
+
+# (name, fixture file, parse filter, function reading the value from the tree)
+CASES = [
+    ("Finviz quote", "finviz_quote.html", FinvizScraper.PARSE_ONLY,
+     lambda soup: finviz._parse_gross_margin(finviz._build_snapshot(soup))),
+    ("Macrotrends statements", "macrotrends_financial_statements.html", MacrotrendsScraper.PARSE_ONLY,
+     lambda soup: round(macrotrends._parse_gross_margin(macrotrends._parse_statement(soup)), 2)),
+    ("Morningstar key metrics", "morningstar_key_metrics.html", MorningstarScraper.PARSE_ONLY,
+     lambda soup: morningstar._find_table_row_value(soup, "Gross Profit Margin", column_index=1)),
+]
+
+
+def load_fixture(name: str) -> bytes:
+    """Read a fixture page (generated first if missing)."""
+    path = os.path.join(FIXTURES_DIR, name)
+    if not os.path.exists(path):
+        generate_fixtures.main()
+    with open(path, "rb") as f:
+        return f.read()
+
+
+def measure(html: bytes, parse_only, repeat: int):
+    """
+    Parse a page several times.
+    
+    Returns:
+        (best parse time in ms, peak traced memory in MB, parsed tree)
+    """
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        parse_html(html, parse_only)
+        times.append(time.perf_counter() - start)
+    
+    tracemalloc.start()
+    soup = parse_html(html, parse_only)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return min(times) * 1000, peak / (1024 * 1024), soup
+
+
+def run(repeat: int = 20):
+    """Run all cases and return rows of results."""
+    results = []
+    for name, fixture, parse_only, read_value in CASES:
+        html = load_fixture(fixture)
+        full_ms, full_mb, full_soup = measure(html, None, repeat)
+        part_ms, part_mb, part_soup = measure(html, parse_only, repeat)
+        full_value = read_value(full_soup)
+        part_value = read_value(part_soup)
+        if full_value != part_value:
+            raise AssertionError(f"{name}: full parse read {full_value}, partial parse read {part_value}")
+        results.append({
+            "name": name,
+            "size_kb": len(html) / 1024,
+            "full_ms": full_ms,
+            "partial_ms": part_ms,
+            "full_mb": full_mb,
+            "partial_mb": part_mb,
+            "value": part_value,
+        })
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=20, help="Parses per measurement (best time is kept)")
+    args = parser.parse_args()
+    
+    print(f"{'Page':<26} {'Size':>7} {'Full':>9} {'Partial':>9} {'Speedup':>8} {'Full mem':>9} {'Part mem':>9}  Value")
+    for r in run(args.repeat):
+        print(
+            f"{r['name']:<26} {r['size_kb']:>5.0f}KB {r['full_ms']:>7.1f}ms {r['partial_ms']:>7.1f}ms "
+            f"{r['full_ms'] / r['partial_ms']:>7.1f}x {r['full_mb']:>7.1f}MB {r['partial_mb']:>7.1f}MB  {r['value']}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,308 @@
+"""
+Benchmark suite: every scraper's extraction path over the fixture corpus.
+
+For each source page in benchmarks/fixtures, runs what the scraper does once
+the page is downloaded/rendered (parse the HTML or JSON, then read the
+metrics) and reports:
+- parse and extraction latency (best of --repeat runs, ms) and throughput (pages/s)
+- peak Python allocations (tracemalloc, MB)
+- the values read, which must not change
+
+Results are compared with benchmarks/baselines.json and any regression makes
+the run exit with status 1:
+- a value differs from the baseline (parser broken)
+- latency is more than --tolerance above the baseline (default 50%) AND more
+  than MIN_SLOWDOWN_MS above it, after scaling by a CPU calibration loop so
+  baselines recorded on another machine still compare (the absolute floor
+  keeps scheduler noise on few-ms metrics from counting)
+- peak allocations are more than 20% above the baseline
+A slowdown must show up again in CONFIRM_RUNS more runs to count, so a noisy
+machine doesn't fail the suite. Baselines are the medians of BASELINE_RUNS
+runs, not one lucky or unlucky run.
+
+Usage (from backend/):
+    python -m benchmarks.bench_scrapers [--repeat 20] [--tolerance 0.5]
+    python -m benchmarks.bench_scrapers --update-baselines [--runs 5]  # After an intended change
+"""
+
+import argparse
+import functools
+import json
+import os
+import statistics
+import sys
+import time
+import tracemalloc
+
+from bs4 import BeautifulSoup
+
+from app.scrapers.base import parse_html
+from app.scrapers.finviz import FinvizScraper
+from app.scrapers.koyfin import KoyfinScraper
+from app.scrapers.macrotrends import MacrotrendsScraper
+from app.scrapers.morningstar import GROSS_MARGIN_JSON_KEYS, JSON_NEWEST_FIRST, MorningstarScraper
+from app.scrapers.network_capture import find_json_number
+from app.scrapers.quickfs import QuickFSScraper
+from benchmarks.fixtures import generate_fixtures
+
+FIXTURES_DIR = generate_fixtures.FIXTURES_DIR
+BASELINES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baselines.json")
+
+# Allowed increase of peak allocations over the baseline (allocations barely vary between runs)
+MEMORY_TOLERANCE = 0.2
+
+# Runs repeated to confirm a latency regression
+CONFIRM_RUNS = 2
+
+# Smallest latency increase counted as a regression, whatever the tolerance (ms)
+MIN_SLOWDOWN_MS = 10
+
+# Runs whose medians are saved as baselines
+BASELINE_RUNS = 5
+
+finviz = FinvizScraper()
+macrotrends = MacrotrendsScraper()
+morningstar = MorningstarScraper()
+quickfs = QuickFSScraper()
+koyfin = KoyfinScraper()
+
+
+def load_fixture(name: str) -> bytes:
+    """Read a fixture page (generated first if missing)."""
+    path = os.path.join(FIXTURES_DIR, name)
+    if not os.path.exists(path):
+        generate_fixtures.main()
+    with open(path, "rb") as f:
+        return f.read()
+
+
+def _rendered(html: bytes) -> BeautifulSoup:
+    """Parse a rendered page the way the Selenium scrapers do (whole page, lxml)."""
+    return BeautifulSoup(html, "lxml")
+
+
+@functools.lru_cache(maxsize=None)
+def _income_statement():
+    """Income statement matrix, needed with the cash flow page for FCF Margin (parsed once)."""
+    return macrotrends._parse_statement(parse_html(load_fixture("macrotrends_financial_statements.html")))
+
+
+def _macrotrends_fcf_margin(soup):
+    return round(macrotrends._parse_fcf_margin(macrotrends._parse_statement(soup), _income_statement()), 2)
+
+
+def _finviz_metrics(soup):
+    snapshot = finviz._build_snapshot(soup)
+    return [finviz._parse_gross_margin(snapshot), finviz._parse_pe_ratio(snapshot), finviz._parse_roic(snapshot)]
+
+
+# (name, fixture file, parse function (bytes -> tree), extraction function (tree -> values))
+CASES = [
+    ("Finviz quote", "finviz_quote.html",
+     lambda html: parse_html(html, FinvizScraper.PARSE_ONLY),
+     _finviz_metrics),
+    ("Macrotrends income", "macrotrends_financial_statements.html",
+     lambda html: parse_html(html, MacrotrendsScraper.PARSE_ONLY),
+     lambda soup: round(macrotrends._parse_gross_margin(macrotrends._parse_statement(soup)), 2)),
+    ("Macrotrends cash flow", "macrotrends_cash_flow_statement.html",
+     lambda html: parse_html(html, MacrotrendsScraper.PARSE_ONLY),
+     _macrotrends_fcf_margin),
+    ("Morningstar page", "morningstar_key_metrics.html",
+     lambda html: parse_html(html, MorningstarScraper.PARSE_ONLY),
+     lambda soup: morningstar._find_table_row_value(soup, "Gross Profit Margin", column_index=1)),
+    ("Morningstar JSON", "morningstar_key_metrics.json",
+     lambda data: [json.loads(data)],
+     lambda payloads: find_json_number(payloads, GROSS_MARGIN_JSON_KEYS, JSON_NEWEST_FIRST)),
+    ("QuickFS page", "quickfs_company.html",
+     _rendered,
+     lambda soup: [quickfs._find_metric_value(soup, "Return on Invested Capital"), quickfs._find_metric_value(soup, "FCF Margin")]),
+    ("Koyfin page", "koyfin_overview.html",
+     _rendered,
+     lambda soup: koyfin._find_metric_value(soup, "Return on Invested Capital")),
+]
+
+
+def calibrate(repeat: int = 3) -> float:
+    """Time a fixed pure-Python workload (best of repeat, ms), to compare timings across machines."""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        sorted(str(i * 7919 % 100003) for i in range(100000))
+        times.append(time.perf_counter() - start)
+    return min(times) * 1000
+
+
+def measure(html: bytes, parse, extract, repeat: int) -> dict:
+    """
+    Run parse + extraction of one page several times.
+    
+    Returns:
+        Dict with parse_ms, extract_ms (best times), peak_mb and the value read
+    """
+    parse_times, extract_times = [], []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        tree = parse(html)
+        parsed = time.perf_counter()
+        value = extract(tree)
+        parse_times.append(parsed - start)
+        extract_times.append(time.perf_counter() - parsed)
+    
+    tracemalloc.start()
+    extract(parse(html))
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {
+        "parse_ms": min(parse_times) * 1000,
+        "extract_ms": min(extract_times) * 1000,
+        "peak_mb": peak / (1024 * 1024),
+        "value": value,
+    }
+
+
+def run(repeat: int = 20) -> dict:
+    """
+    Run all cases.
+    
+    Returns:
+        {"calibration_ms": ..., "cases": {name: measure() result + size_kb and calibration_ms}}
+    """
+    cases = {}
+    for name, fixture, parse, extract in CASES:
+        html = load_fixture(fixture)
+        # Calibrated right before each case: CPU speed may drift during the run
+        calibration_ms = calibrate()
+        cases[name] = dict(measure(html, parse, extract, repeat), size_kb=len(html) / 1024, calibration_ms=calibration_ms)
+    return {"calibration_ms": min(case["calibration_ms"] for case in cases.values()), "cases": cases}
+
+
+def median_results(runs: list) -> dict:
+    """
+    Combine several run() outputs into one (median of each measurement, per case).
+    
+    Raises:
+        ValueError: If a case read different values in different runs
+    """
+    cases = {}
+    for name, first in runs[0]["cases"].items():
+        measured = [run_results["cases"][name] for run_results in runs]
+        if any(case["value"] != first["value"] for case in measured):
+            raise ValueError(f"{name}: values differ between runs")
+        cases[name] = dict(first, **{
+            metric: statistics.median(case[metric] for case in measured)
+            for metric in ("parse_ms", "extract_ms", "peak_mb", "calibration_ms")
+        })
+    return {"calibration_ms": min(case["calibration_ms"] for case in cases.values()), "cases": cases}
+
+
+def compare(results: dict, baselines: dict, tolerance: float = 0.5, check_performance: bool = True) -> list:
+    """
+    Compare results with baselines.
+    
+    Args:
+        results: run() output
+        baselines: Saved run() output
+        tolerance: Allowed latency increase (0.5 = 50% slower than the baseline), and
+            at least MIN_SLOWDOWN_MS
+        check_performance: False to only check the values read (e.g., in unit tests)
+        
+    Returns:
+        Regressions as (case name, metric, message), empty if none
+    """
+    regressions = []
+    for name, result in results["cases"].items():
+        baseline = baselines.get("cases", {}).get(name)
+        if baseline is None:
+            regressions.append((name, "value", f"{name}: no baseline (run with --update-baselines)"))
+            continue
+        # Latency baselines scaled to this machine's (current) speed
+        speed = result["calibration_ms"] / baseline["calibration_ms"]
+        if result["value"] != baseline["value"]:
+            regressions.append((name, "value", f"{name}: read {result['value']}, baseline read {baseline['value']}"))
+        if not check_performance:
+            continue
+        for metric in ("parse_ms", "extract_ms"):
+            expected = baseline[metric] * speed
+            limit = max(expected * (1 + tolerance), expected + MIN_SLOWDOWN_MS)
+            if result[metric] > limit:
+                message = f"{name}: {metric} {result[metric]:.2f} > {limit:.2f} (baseline {baseline[metric]:.2f})"
+                regressions.append((name, metric, message))
+        limit = baseline["peak_mb"] * (1 + MEMORY_TOLERANCE)
+        if result["peak_mb"] > limit:
+            message = f"{name}: peak_mb {result['peak_mb']:.2f} > {limit:.2f} (baseline {baseline['peak_mb']:.2f})"
+            regressions.append((name, "peak_mb", message))
+    return regressions
+
+
+def load_baselines(path: str = BASELINES_PATH) -> dict:
+    """Read saved baselines (empty if none yet)."""
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        return json.load(f)
+
+
+def save_baselines(results: dict, path: str = BASELINES_PATH) -> None:
+    """Save results as the new baselines (rounded, so diffs stay readable)."""
+    baselines = {
+        "calibration_ms": round(results["calibration_ms"], 3),
+        "cases": {
+            name: {
+                "parse_ms": round(r["parse_ms"], 3),
+                "extract_ms": round(r["extract_ms"], 3),
+                "peak_mb": round(r["peak_mb"], 3),
+                "calibration_ms": round(r["calibration_ms"], 3),
+                "value": r["value"],
+            }
+            for name, r in results["cases"].items()
+        },
+    }
+    with open(path, "w") as f:
+        json.dump(baselines, f, indent=2)
+        f.write("\n")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=20, help="Runs per page (best time is kept)")
+    parser.add_argument("--tolerance", type=float, default=0.5, help="Allowed latency increase over the baseline")
+    parser.add_argument("--update-baselines", action="store_true", help="Save the medians of --runs runs as the new baselines")
+    parser.add_argument("--runs", type=int, default=BASELINE_RUNS, help="Runs recorded with --update-baselines")
+    args = parser.parse_args()
+    
+    runs = args.runs if args.update_baselines else 1
+    results = median_results([run(args.repeat) for _ in range(runs)])
+    print(f"{'Page':<22} {'Size':>7} {'Parse':>9} {'Extract':>9} {'Pages/s':>8} {'Peak':>8}  Value")
+    for name, r in results["cases"].items():
+        pages_per_second = 1000 / (r["parse_ms"] + r["extract_ms"])
+        print(
+            f"{name:<22} {r['size_kb']:>5.0f}KB {r['parse_ms']:>7.2f}ms {r['extract_ms']:>7.2f}ms "
+            f"{pages_per_second:>8.1f} {r['peak_mb']:>6.1f}MB  {r['value']}"
+        )
+    print(f"Calibration: {results['calibration_ms']:.1f}ms" + (f" (medians of {runs} runs)" if runs > 1 else ""))
+    
+    if args.update_baselines:
+        save_baselines(results)
+        print(f"Baselines saved to {BASELINES_PATH}")
+        return
+    
+    baselines = load_baselines()
+    if not baselines:
+        print("No baselines yet: run with --update-baselines")
+        return
+    regressions = compare(results, baselines, args.tolerance)
+    for _ in range(CONFIRM_RUNS):
+        if all(metric in ("value", "peak_mb") for _, metric, _ in regressions):
+            break
+        # Latency can be noise: keep only the slowdowns seen again
+        seen_again = {(name, metric) for name, metric, _ in compare(run(args.repeat), baselines, args.tolerance)}
+        regressions = [r for r in regressions if r[1] in ("value", "peak_mb") or r[:2] in seen_again]
+    for _, _, message in regressions:
+        print(f"REGRESSION {message}")
+    if regressions:
+        sys.exit(1)
+    print("No regression against the baselines")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""
+Benchmark: fixed-sleep page waits vs. readiness predicates, per source.
+
+Loads each Selenium source page both ways and reports the time until the page
+source was read, and whether the metric was found in it:
+- Old: "normal" page load strategy, document.readyState == "complete", fixed
+  sleeps, then a wait for the metric label (or any table)
+- New: "eager" page load strategy, then polling the source's readiness
+  predicate (the metric row shows a value, see page_wait.py)
+  
+Requires Chrome and network access to the sites.
+
+Usage (from backend/):
+    python -m benchmarks.bench_waits [--ticker PLTR] [--runs 2]
+"""
+
+import argparse
+import statistics
+import time
+
+from bs4 import BeautifulSoup
+from selenium.common.exceptions import TimeoutException
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.webdriver.support.ui import WebDriverWait
+
+from app.scrapers import koyfin, morningstar, quickfs
+from app.scrapers.browser_pool import BrowserPool
+from app.scrapers.page_wait import wait_until_ready
+
+
+def legacy_wait(driver, labels, settle, miss_sleep):
+    """The waits the scrapers used before readiness predicates."""
+    try:
+        WebDriverWait(driver, 10).until(lambda d: d.execute_script("return document.readyState") == "complete")
+        time.sleep(settle)
+        try:
+            WebDriverWait(driver, 8).until(EC.any_of(
+                *[EC.presence_of_element_located((By.XPATH, f"//*[contains(text(), '{label}')]")) for label in labels],
+                EC.presence_of_element_located((By.TAG_NAME, "table"))
+            ))
+        except TimeoutException:
+            time.sleep(miss_sleep)
+    except TimeoutException:
+        time.sleep(2)
+
+
+def load(pool, blocked_urls, url, wait):
+    """Load a page and wait; returns (seconds until page_source was read, page_source)."""
+    with pool.driver(blocked_urls=blocked_urls) as driver:
+        start = time.perf_counter()
+        driver.get(url)
+        wait(driver)
+        page_source = driver.page_source
+        return time.perf_counter() - start, page_source
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--ticker", default="PLTR")
+    parser.add_argument("--runs", type=int, default=2, help="Page loads per source and wait")
+    args = parser.parse_args()
+    
+    ticker = args.ticker.upper()
+    ms, qfs, kf = morningstar.MorningstarScraper(), quickfs.QuickFSScraper(), koyfin.KoyfinScraper()
+    # name, URL, blocklist, old wait (labels, settle, miss sleep), new predicate, value read from page_source
+    sources = [
+        (
+            "Morningstar", f"{ms.BASE_URL}/xnas/{ticker.lower()}/key-metrics", morningstar.BLOCKED_URLS,
+            (["Gross Profit Margin"], 0, 1), morningstar.GROSS_MARGIN_READY,
+            lambda soup: ms._find_table_row_value(soup, "Gross Profit Margin", column_index=1)
+        ),
+        (
+            "QuickFS", f"{qfs.BASE_URL}/{ticker}", quickfs.BLOCKED_URLS,
+            (["ROIC", "Return on Invested Capital"], 3, 0), quickfs.ROIC_READY,
+            lambda soup: qfs._find_metric_value(soup, "ROIC")
+        ),
+        (
+            "Koyfin", f"{kf.BASE_URL}/{ticker}/overview", koyfin.BLOCKED_URLS,
+            (["ROIC", "Return on Invested Capital"], 3, 0), koyfin.ROIC_READY,
+            lambda soup: kf._find_metric_value(soup, "ROIC")
+        ),
+    ]
+    
+    old_pool = BrowserPool(max_size=1, page_load_strategy="normal")
+    new_pool = BrowserPool(max_size=1, page_load_strategy="eager")
+    print(f"{'Source':<12} {'Old wait':>10} {'New wait':>10} {'Saved':>7}  Value (old / new)")
+    try:
+        old_pool.start(warm=1)
+        new_pool.start(warm=1)
+        for name, url, blocked_urls, (labels, settle, miss_sleep), ready, read_value in sources:
+            old_times, new_times = [], []
+            for _ in range(args.runs):
+                elapsed, old_source = load(old_pool, blocked_urls, url, lambda d: legacy_wait(d, labels, settle, miss_sleep))
+                old_times.append(elapsed)
+                elapsed, new_source = load(new_pool, blocked_urls, url, lambda d: wait_until_ready(d, ready))
+                new_times.append(elapsed)
+            old, new = statistics.median(old_times), statistics.median(new_times)
+            old_value = read_value(BeautifulSoup(old_source, "lxml"))
+            new_value = read_value(BeautifulSoup(new_source, "lxml"))
+            print(f"{name:<12} {old:>9.2f}s {new:>9.2f}s {old - new:>6.2f}s  {old_value} / {new_value}")
+    finally:
+        old_pool.shutdown()
+        new_pool.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+"""
+Network capture vs. DOM scraping, against a local stand-in page.
+
+Serves a small page that behaves like Morningstar's key metrics page: the
+table is built by JavaScript from an XHR JSON response (same URL shape as the
+real data API), while slow scripts keep the page "loading" much longer. Then
+loads it with a pooled Chrome both ways and reports the time until the value
+is known:
+- DOM: wait for the rendered table, parse page_source
+- Network capture: return as soon as the JSON response has arrived
+
+Requires Chrome (same as the Selenium scrapers).
+
+Usage (from backend/):
+    python -m benchmarks.capture_standin [--data-delay 0.5] [--slow-delay 3]
+"""
+
+import argparse
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support.ui import WebDriverWait
+
+from app.scrapers.base import parse_html
+from app.scrapers.browser_pool import browser_pool
+from app.scrapers.morningstar import DATA_URL_PATTERN, GROSS_MARGIN_JSON_KEYS, JSON_NEWEST_FIRST, MorningstarScraper
+from app.scrapers.network_capture import capture_json, find_json_number
+
+PAGE = """<!DOCTYPE html><html><head><title>Stand-in key metrics</title></head><body>
+<div id="metrics">Loading...</div>
+<script>
+fetch('/api-global/sal-service/v1/stock/keyMetrics/STANDIN')
+  .then(r => r.json())
+  .then(data => {
+    const rows = data.rows.map(r => '<tr><td>' + r.label + '</td><td>' + r.values[0] + '</td></tr>');
+    document.getElementById('metrics').innerHTML = '<table>' + rows.join('') + '</table>';
+  });
+</script>
+<script src="/slow-analytics.js"></script>
+<img src="/slow-banner.png">
+</body></html>"""
+
+DATA = {
+    "grossMargin": [80.81, 80.62, 78.56],  # Latest year first, like Morningstar's
+    "rows": [{"label": "Gross Profit Margin %", "values": [80.81, 80.62, 78.56]}],
+}
+
+
+def make_handler(data_delay: float, slow_delay: float):
+    """Request handler: page, delayed JSON data, and slow third-party-like resources."""
+    
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.startswith("/api-global/"):
+                time.sleep(data_delay)
+                body, content_type = json.dumps(DATA).encode(), "application/json"
+            elif self.path.startswith("/slow-"):
+                time.sleep(slow_delay)
+                body, content_type = b"", "application/javascript"
+            else:
+                body, content_type = PAGE.encode(), "text/html"
+            self.send_response(200)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        
+        def log_message(self, format, *args):
+            pass
+    
+    return Handler
+
+
+def load_with_dom(url: str):
+    """Old way: wait for the rendered table, then parse page_source."""
+    start = time.perf_counter()
+    with browser_pool.driver() as driver:
+        driver.get(url)
+        WebDriverWait(driver, 15).until(lambda d: d.find_elements(By.TAG_NAME, "table"))
+        soup = parse_html(driver.page_source, MorningstarScraper.PARSE_ONLY)
+    value = MorningstarScraper()._find_table_row_value(soup, "Gross Profit Margin", column_index=1)
+    return value, time.perf_counter() - start
+
+
+def load_with_capture(url: str):
+    """New way: return as soon as the JSON data response has arrived."""
+    start = time.perf_counter()
+    payloads = capture_json(
+        url,
+        DATA_URL_PATTERN,
+        lambda p: find_json_number(p, GROSS_MARGIN_JSON_KEYS, JSON_NEWEST_FIRST) is not None,
+        parse_only=MorningstarScraper.PARSE_ONLY
+    )
+    return find_json_number(payloads, GROSS_MARGIN_JSON_KEYS, JSON_NEWEST_FIRST), time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--data-delay", type=float, default=0.5, help="Seconds before the JSON data is served")
+    parser.add_argument("--slow-delay", type=float, default=3.0, help="Seconds before the slow resources are served")
+    args = parser.parse_args()
+    
+    server = ThreadingHTTPServer(("127.0.0.1", 0), make_handler(args.data_delay, args.slow_delay))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_port}/stocks/xnas/standin/key-metrics"
+    
+    try:
+        browser_pool.start(warm=1)
+        load_with_dom(url)  # Warm-up (browser caches, first navigation)
+        for name, load in (("DOM (rendered table)", load_with_dom), ("Network capture (JSON)", load_with_capture)):
+            value, elapsed = load(url)
+            print(f"{name:<24} {elapsed:>6.2f}s  value={value}")
+    finally:
+        browser_pool.shutdown()
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
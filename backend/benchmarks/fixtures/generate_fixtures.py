@@ -0,0 +1,189 @@
+"""
+Generate the synthetic fixture pages used by the benchmarks.
+
+These are NOT saved copies of the real sites (we don't commit their pages).
+They mimic the shape that matters for parsing cost: page size, a large <head>
+with scripts and styles, navigation/news markup around the data, and the
+data itself in the same elements our scrapers read (Finviz "snapshot-td2"
+cells, the Macrotrends statement scripts, Morningstar, QuickFS and Koyfin
+rendered tables, the Morningstar key metrics JSON).
+
+To benchmark on real pages instead, save them in this folder under the same
+file names (e.g., from the browser: "Save page as... HTML only").
+
+Usage (from backend/):
+    python -m benchmarks.fixtures.generate_fixtures
+"""
+
+import json
+import os
+import random
+
+FIXTURES_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def _head(rng: random.Random, title: str, scripts: int) -> str:
+    """Large <head> like real pages (inline scripts, styles, meta tags)."""
+    parts = [f"<head><title>{title}</title>"]
+    for i in range(40):
+        parts.append(f'<meta name="meta-{i}" content="{"x" * rng.randint(20, 80)}">')
+    for i in range(scripts):
+        body = ";".join(f"var v{i}_{j}={rng.randint(0, 10**6)}" for j in range(120))
+        parts.append(f"<script>{body}</script>")
+    for i in range(10):
+        rules = "".join(f".c{i}-{j}{{margin:{j}px;padding:{j % 7}px}}" for j in range(80))
+        parts.append(f"<style>{rules}</style>")
+    parts.append("</head>")
+    return "".join(parts)
+
+
+def _chrome(rng: random.Random, links: int, news: int) -> str:
+    """Navigation menus and a news list around the data."""
+    parts = ['<div class="header"><ul class="nav">']
+    for i in range(links):
+        parts.append(f'<li class="nav-item"><a href="/page/{i}"><span>Menu entry {i}</span></a></li>')
+    parts.append('</ul></div><div class="news"><table class="news-table">')
+    for i in range(news):
+        parts.append(
+            f'<tr><td class="news-date">Oct-{i % 28 + 1:02d}-25</td>'
+            f'<td><a href="/news/{i}">Headline number {i} about the company {"lorem " * rng.randint(3, 9)}</a></td></tr>'
+        )
+    parts.append("</table></div>")
+    return "".join(parts)
+
+
+def finviz_quote(rng: random.Random) -> str:
+    """Quote page: 12 x 6 snapshot table of label/value cells."""
+    labels = ["Gross Margin", "P/E", "Forward P/E", "ROIC", "Oper. Margin", "Profit Margin"]
+    labels += [f"Metric {i}" for i in range(66)]
+    cells = []
+    for i, label in enumerate(labels):
+        value = {"Gross Margin": "80.81%", "P/E": "406.95", "ROIC": "12.34%"}.get(label, f"{rng.uniform(0, 100):.2f}")
+        cells.append(f'<td class="snapshot-td2 cursor-pointer" align="left">{label}</td>'
+                     f'<td class="snapshot-td2" align="left"><b>{value}</b></td>')
+    rows = "".join(f"<tr class=\"table-dark-row\">{''.join(cells[r * 6:(r + 1) * 6])}</tr>" for r in range(12))
+    body = _chrome(rng, 300, 100) + f'<table class="snapshot-table2">{rows}</table>' + _chrome(rng, 200, 100)
+    return f"<!DOCTYPE html><html>{_head(rng, 'PLTR Stock Quote', 60)}<body>{body}</body></html>"
+
+
+def _macrotrends_statement(rng: random.Random, title: str, items: list, latest: dict) -> str:
+    """Statement page: 15 years x N line items, as the originalData JSON the grid is built from."""
+    years = [f"{2024 - y}-12-31" for y in range(15)]
+    rows = []
+    for item in items:
+        row = {
+            "field_name": f"<a href='/stocks/charts/PLTR/palantir-technologies/{item.lower().replace(' ', '-')}'>{item}</a>",
+            "popup_icon": "<div class='ajax-chart' data-toggle='popover'><i class='fas fa-chart-bar'></i></div>",
+        }
+        for year in years:
+            row[year] = f"{rng.uniform(100, 3000):.5f}"
+        row[years[0]] = latest.get(item, row[years[0]])
+        rows.append(row)
+    script = f"<script>var originalData = {json.dumps(rows)};</script>"
+    body = _chrome(rng, 400, 60) + '<div id="contenttablejqxgrid"></div>' + script + _chrome(rng, 300, 60)
+    return f"<!DOCTYPE html><html>{_head(rng, title, 80)}<body>{body}</body></html>"
+
+
+def macrotrends_financial_statements(rng: random.Random) -> str:
+    """Income statement page (80.54% gross margin in 2024)."""
+    items = ["Revenue", "Cost Of Goods Sold", "Gross Profit"] + [f"Line Item {i}" for i in range(27)]
+    latest = {"Revenue": "2865.50700", "Gross Profit": "2307.85800"}
+    return _macrotrends_statement(rng, "Palantir Financial Statements", items, latest)
+
+
+def macrotrends_cash_flow_statement(rng: random.Random) -> str:
+    """Cash flow statement page, without a Free Cash Flow line (39.09% FCF margin in 2024)."""
+    items = ["Net Income/Loss", "Cash Flow From Operating Activities", "Net Change In Property, Plant, And Equipment"]
+    items += [f"Cash Flow Item {i}" for i in range(30)]
+    latest = {"Cash Flow From Operating Activities": "1150.00000", "Net Change In Property, Plant, And Equipment": "-30.00000"}
+    return _macrotrends_statement(rng, "Palantir Cash Flow Statement", items, latest)
+
+
+def morningstar_key_metrics(rng: random.Random) -> str:
+    """Rendered key metrics page: several year-by-year tables inside many divs."""
+    tables = []
+    for t in range(6):
+        rows = ["<tr><th></th>" + "".join(f"<th>{2025 - y}</th>" for y in range(10)) + "</tr>"]
+        labels = ["Gross Profit Margin %"] if t == 0 else []
+        labels += [f"Ratio {t}-{i}" for i in range(25)]
+        for label in labels:
+            values = ["80.81"] if label == "Gross Profit Margin %" else [f"{rng.uniform(-50, 100):.2f}"]
+            values += [f"{rng.uniform(-50, 100):.2f}" for _ in range(9)]
+            rows.append(f"<tr><td>{label}</td>" + "".join(f"<td>{v}</td>" for v in values) + "</tr>")
+        tables.append(f'<div class="mds-table"><table>{"".join(rows)}</table></div>')
+    widgets = "".join(
+        f'<div class="widget w{i}"><div><span>Widget {i}</span><div>{"text " * rng.randint(5, 30)}</div></div></div>'
+        for i in range(800)
+    )
+    body = _chrome(rng, 300, 50) + widgets[: len(widgets) // 2] + "".join(tables) + widgets[len(widgets) // 2:]
+    return f"<!DOCTYPE html><html>{_head(rng, 'PLTR Key Metrics', 100)}<body>{body}</body></html>"
+
+
+def morningstar_key_metrics_json(rng: random.Random) -> str:
+    """Key metrics API response (network capture): yearly lists under nested sections."""
+    sections = {}
+    for s in range(8):
+        sections[f"section{s}"] = {
+            "columnDefs": [str(2025 - y) for y in range(10)],
+            "rows": [
+                {"label": f"Ratio {s}-{i}", f"ratio{s}x{i}": [round(rng.uniform(-50, 100), 2) for _ in range(10)]}
+                for i in range(25)
+            ],
+        }
+    # Same order as columnDefs (and the page's table): latest year first
+    sections["section3"]["rows"][7]["grossMargin"] = [80.81] + [round(rng.uniform(60, 80), 2) for _ in range(9)]
+    return json.dumps({"ticker": "PLTR", "currency": "USD", "data": sections})
+
+
+def quickfs_company(rng: random.Random) -> str:
+    """Rendered company page: 20 years x 40 rows overview table (latest year last)."""
+    header = "<tr><th></th>" + "".join(f"<th>{2005 + y}</th>" for y in range(20)) + "</tr>"
+    labels = [f"Metric {i}" for i in range(38)]
+    labels[12:12] = ["Return on Invested Capital"]
+    labels[25:25] = ["FCF Margin"]
+    rows = [header]
+    for label in labels:
+        values = [f"{rng.uniform(-20, 60):.1f}%" for _ in range(19)]
+        values.append({"Return on Invested Capital": "18.4%", "FCF Margin": "27.2%"}.get(label, f"{rng.uniform(-20, 60):.1f}%"))
+        rows.append(f"<tr><td>{label}</td>" + "".join(f"<td>{v}</td>" for v in values) + "</tr>")
+    body = _chrome(rng, 200, 40) + f'<div class="overview"><table>{"".join(rows)}</table></div>' + _chrome(rng, 100, 20)
+    return f"<!DOCTYPE html><html>{_head(rng, 'PLTR | QuickFS', 60)}<body>{body}</body></html>"
+
+
+def koyfin_overview(rng: random.Random) -> str:
+    """Rendered overview page: many dashboard cards and a key statistics table."""
+    stats = [f"Statistic {i}" for i in range(30)]
+    stats[9:9] = ["Return on Invested Capital"]
+    rows = "".join(
+        f"<tr><td>{label}</td><td>{'14.9%' if label == 'Return on Invested Capital' else f'{rng.uniform(0, 50):.2f}'}</td></tr>"
+        for label in stats
+    )
+    cards = [
+        f'<div class="card c{i}"><div class="card-title">Card {i}</div><div class="card-body">{"data " * rng.randint(5, 25)}</div></div>'
+        for i in range(600)
+    ]
+    body = _chrome(rng, 200, 30) + "".join(cards[:200]) + f'<table class="key-stats">{rows}</table>' + "".join(cards[200:])
+    return f"<!DOCTYPE html><html>{_head(rng, 'PLTR Overview | Koyfin', 120)}<body>{body}</body></html>"
+
+
+FIXTURES = {
+    "finviz_quote.html": finviz_quote,
+    "macrotrends_financial_statements.html": macrotrends_financial_statements,
+    "macrotrends_cash_flow_statement.html": macrotrends_cash_flow_statement,
+    "morningstar_key_metrics.html": morningstar_key_metrics,
+    "morningstar_key_metrics.json": morningstar_key_metrics_json,
+    "quickfs_company.html": quickfs_company,
+    "koyfin_overview.html": koyfin_overview,
+}
+
+
+def main():
+    for name, build in FIXTURES.items():
+        html = build(random.Random(name))  # Seeded: same output every run
+        with open(os.path.join(FIXTURES_DIR, name), "w") as f:
+            f.write(html)
+        print(f"{name}: {len(html) / 1024:.0f} KB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,225 @@
+"""
+Load test: end-to-end analyses per second and latency, offline (replay mode).
+
+Runs fetch_analysis (or fetch_analysis_async) for many distinct tickers at
+increasing concurrency, with every scraper call served from recorded
+cassettes (see app/scrapers/replay.py) plus an injected latency per kind of
+call. Everything else is the real backend: executor and per-source limits,
+browser pool, caches, single-flight, parsing.
+
+Each analysis is a cold one: every concurrency level uses new synthetic
+tickers (LT00001, LT00002, ...) aliased to the recorded tickers' cassettes,
+and the caches are cleared between levels.
+
+Reports per concurrency level: analyses/s, latency (p50 / p95 / max, s),
+values found per analysis, and the calls with no cassette.
+
+Cassettes:
+- Recorded from real runs: GROSS_REPLAY_MODE=record, then analyze the
+  recorded tickers once (e.g., through the API or fetch_analysis)
+- Or --fixtures: synthetic cassettes built from the benchmark fixture pages
+  (benchmarks/fixtures) for PLTR, no recording needed
+  
+Site rate limits are lifted by default (they would cap throughput at a few
+pages per second per site, whatever the backend does); --rate-limits keeps them.
+
+Usage (from backend/):
+    python -m benchmarks.load_test --fixtures [--concurrency 1,4,8,16] [--analyses 32]
+    python -m benchmarks.load_test --cassettes .cache/cassettes --recorded PLTR,NVDA --latency "http=0.3,browser=3,yahoo=0.5"
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import statistics
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+
+from app.scrapers.browser_pool import browser_pool
+from app.scrapers.morningstar import MorningstarScraper
+from app.scrapers.replay import CASSETTE_DIR, REPLAY, CassetteStore, cassettes
+from app.services import ratio_fetcher
+from app.services.cache import page_cache, scraper_cache, yahoo_cache
+from app.services.executor import scraper_executor
+from app.services.rate_limiter import rate_limiter
+from app.services.symbol_metadata import symbol_index
+from benchmarks.bench_scrapers import load_fixture
+
+# Latency added to replayed calls by default (about what the real sites take)
+DEFAULT_LATENCY = "http=0.3,browser=3,yahoo=0.5"
+
+# Token bucket used for every site when rate limits are lifted
+UNLIMITED = (1e9, 10**9)
+
+_ticker_count = 0
+
+
+def write_fixture_cassettes(directory: str, ticker: str = "PLTR") -> None:
+    """
+    Build synthetic cassettes for one ticker from the fixture pages.
+    
+    The fixtures have no QuickFS data response and no Yahoo data, so small
+    synthetic ones are added (same values as the QuickFS fixture page).
+    
+    Args:
+        directory: Cassette folder
+        ticker: Ticker of the fixture pages
+    """
+    store = CassetteStore(directory=directory)
+    slug = symbol_index.macrotrends_slug(ticker) or ticker.lower()
+    statements = "https://www.macrotrends.net/stocks/charts"
+    html = {"content-type": "text/html; charset=utf-8"}
+    store.record_http(f"https://finviz.com/quote.ashx?t={ticker}", 200, html, load_fixture("finviz_quote.html"))
+    store.record_http(f"{statements}/{ticker}/{slug}/financial-statements", 200, html,
+                      load_fixture("macrotrends_financial_statements.html"))
+    store.record_http(f"{statements}/{ticker}/{slug}/cash-flow-statement", 200, html,
+                      load_fixture("macrotrends_cash_flow_statement.html"))
+    
+    exchange = symbol_index.exchange(ticker) or "xnas"
+    store.record_browser_page(
+        f"{MorningstarScraper.BASE_URL}/{exchange}/{ticker.lower()}/key-metrics",
+        load_fixture("morningstar_key_metrics.html").decode("utf-8"),
+        [{
+            "url": f"https://api-global.morningstar.com/sal-service/v1/stock/keyMetrics/{ticker}",
+            "mime_type": "application/json",
+            "body": load_fixture("morningstar_key_metrics.json").decode("utf-8"),
+        }]
+    )
+    store.record_browser_page(
+        f"https://quickfs.net/company/{ticker}",
+        load_fixture("quickfs_company.html").decode("utf-8"),
+        [{
+            "url": f"https://api.quickfs.net/stocks/{ticker}/ovr/",
+            "mime_type": "application/json",
+            "body": json.dumps({"roic": [0.112, 0.153, 0.184], "fcf_margin": [0.201, 0.244, 0.272]}),
+        }]
+    )
+    
+    store.record_yfinance(ticker, "info", {"exchange": "NMS", "longName": "Palantir Technologies Inc.", "trailingPE": 406.95})
+    years = pd.to_datetime(["2024-12-31", "2023-12-31", "2022-12-31"])
+    store.record_yfinance(ticker, "financials", pd.DataFrame(
+        [[310.4, 120.0, -161.2], [5.2, 4.9, 4.7]],
+        index=["EBIT", "Interest Expense"],
+        columns=years
+    ))
+
+
+def new_tickers(count: int, recorded: list) -> list:
+    """Synthetic tickers answered by the recorded tickers' cassettes (round-robin)."""
+    global _ticker_count
+    tickers = []
+    for i in range(count):
+        _ticker_count += 1
+        ticker, source = f"LT{_ticker_count:05d}", recorded[i % len(recorded)]
+        cassettes.alias(ticker, source)
+        # Same URLs as the recorded ticker (Macrotrends slug, Morningstar exchange)
+        symbol_index.update(ticker, **symbol_index.get(source))
+        tickers.append(ticker)
+    return tickers
+
+
+def _values_found(analysis) -> int:
+    """Number of source values an analysis got (10 when every scraper call worked)."""
+    return sum(1 for ratio in analysis.ratios for value in ratio.values if value.value is not None)
+
+
+def run_level(concurrency: int, tickers: list, use_async: bool) -> dict:
+    """
+    Analyze tickers, concurrency at a time (cold caches).
+    
+    Returns:
+        {"seconds", "latencies", "values"} (latency and values per analysis)
+    """
+    for cache in (scraper_cache, page_cache, yahoo_cache):
+        cache.clear()
+    
+    def timed(ticker):
+        start = time.perf_counter()
+        analysis = ratio_fetcher.fetch_analysis(ticker)
+        return time.perf_counter() - start, _values_found(analysis)
+    
+    async def timed_async(ticker, semaphore):
+        async with semaphore:
+            start = time.perf_counter()
+            analysis = await ratio_fetcher.fetch_analysis_async(ticker)
+            return time.perf_counter() - start, _values_found(analysis)
+    
+    async def run_async():
+        semaphore = asyncio.Semaphore(concurrency)
+        return await asyncio.gather(*(timed_async(ticker, semaphore) for ticker in tickers))
+    
+    start = time.perf_counter()
+    if use_async:
+        results = asyncio.run(run_async())
+    else:
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            results = list(pool.map(timed, tickers))
+    return {
+        "seconds": time.perf_counter() - start,
+        "latencies": [latency for latency, _ in results],
+        "values": [values for _, values in results],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--cassettes", default=CASSETTE_DIR, help="Cassette folder")
+    parser.add_argument("--fixtures", action="store_true", help="Use synthetic cassettes built from the fixture pages")
+    parser.add_argument("--recorded", default="PLTR", help="Tickers with cassettes (comma-separated)")
+    parser.add_argument("--concurrency", default="1,4,8,16", help="Analyses at the same time, per level")
+    parser.add_argument("--analyses", type=int, default=32, help="Analyses per level")
+    parser.add_argument("--latency", default=DEFAULT_LATENCY, help="Injected latency (see replay.parse_latency)")
+    parser.add_argument("--async", dest="use_async", action="store_true", help="Use fetch_analysis_async (API path)")
+    parser.add_argument("--workers", type=int, help="Executor worker threads (default: the app's)")
+    parser.add_argument("--browsers", type=int, help="Browser pool size (default: the app's)")
+    parser.add_argument("--rate-limits", action="store_true", help="Keep the sites' rate limits")
+    args = parser.parse_args()
+    
+    logging.getLogger().setLevel(logging.WARNING)  # One log line per scraper call and request otherwise
+    recorded = [ticker.strip().upper() for ticker in args.recorded.split(",") if ticker.strip()]
+    directory = args.cassettes
+    if args.fixtures:
+        directory = tempfile.mkdtemp(prefix="gross-cassettes-")
+        recorded = ["PLTR"]
+        write_fixture_cassettes(directory, "PLTR")
+    cassettes.configure(mode=REPLAY, directory=directory, latency=args.latency)
+    
+    if not args.rate_limits:
+        rate_limiter.host_limits = {host: UNLIMITED for host in rate_limiter.host_limits}
+        rate_limiter.default_limit = UNLIMITED
+        rate_limiter._buckets.clear()
+    if args.workers:
+        scraper_executor.max_workers = args.workers
+    if args.browsers:
+        browser_pool.max_size = args.browsers
+    
+    print(f"Cassettes: {directory} ({', '.join(recorded)}), latency: {args.latency}, "
+          f"{'async' if args.use_async else 'sync'} analyses, "
+          f"{scraper_executor.max_workers} workers, {browser_pool.max_size} browsers")
+    print(f"{'Concurrency':>11} {'Analyses/s':>11} {'p50':>7} {'p95':>7} {'Max':>7} {'Values':>7}")
+    try:
+        for concurrency in [int(c) for c in args.concurrency.split(",")]:
+            result = run_level(concurrency, new_tickers(args.analyses, recorded), args.use_async)
+            latencies = sorted(result["latencies"])
+            p95 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))]
+            print(
+                f"{concurrency:>11} {len(latencies) / result['seconds']:>11.2f} "
+                f"{statistics.median(latencies):>6.2f}s {p95:>6.2f}s {latencies[-1]:>6.2f}s "
+                f"{statistics.mean(result['values']):>7.1f}"
+            )
+    finally:
+        browser_pool.shutdown()
+        scraper_executor.shutdown(wait=False)
+    
+    if cassettes.misses:
+        print(f"{len(cassettes.misses)} calls had no cassette (failed like network errors):")
+        for miss in sorted(cassettes.misses)[:20]:
+            print(f"   {miss}")
+
+
+if __name__ == "__main__":
+    main()
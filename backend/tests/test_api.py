@@ -0,0 +1,178 @@
+"""
+Tests for the API routes.
+
+Scrapers are replaced by fake scraper calls so these run offline.
+"""
+
+import asyncio
+import json
+import time
+
+import httpx
+import pytest
+
+from app.main import app
+from app.scrapers.registry import scraper_registry
+from app.services import ratio_fetcher
+from app.services.cache import SimpleCache
+from app.services.executor import DEFAULT_SOURCE_LIMITS, ScraperExecutor, ScraperTask
+
+
+def _fake_tasks(delay: float):
+    """Build fake scraper calls that sleep for `delay` seconds and return 50.0."""
+    def build(ticker_upper):
+        return {
+            call_name: ScraperTask(source, lambda: time.sleep(delay) or 50.0)
+            for _, _, slots in ratio_fetcher.RATIO_DEFINITIONS
+            for source, call_name in slots
+            if call_name
+        }
+    return build
+
+
+def test_health_stays_responsive_during_analysis(monkeypatch):
+    """A slow analysis must not block other requests on the same worker."""
+    monkeypatch.setattr(ratio_fetcher, "build_scraper_tasks", _fake_tasks(1.0))
+    
+    async def scenario():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            analysis = asyncio.ensure_future(client.get("/api/analyze/PLTR"))
+            await asyncio.sleep(0.1)
+            
+            start = time.time()
+            health = await client.get("/api/health")
+            health_time = time.time() - start
+            
+            response = await analysis
+            return health, health_time, response
+    
+    health, health_time, response = asyncio.run(scenario())
+    
+    assert health.status_code == 200
+    assert health_time < 0.5
+    assert response.status_code == 200
+    data = response.json()
+    assert data["ticker"] == "PLTR"
+    assert data["ratios"][0]["consensus"] == 50.0
+
+
+def test_expired_values_are_served_stale_and_refreshed(monkeypatch):
+    """An expired cached value is returned right away (marked stale) while a refresh runs."""
+    cache = SimpleCache(ttl_seconds=0.05, max_stale_seconds=60)
+    monkeypatch.setattr(ratio_fetcher, "scraper_cache", cache)
+    build_fake_tasks = _fake_tasks(0.2)
+    
+    def build(ticker_upper):
+        tasks = build_fake_tasks(ticker_upper)
+        # The refresh stores a new value, like the real scraper would
+        tasks["Finviz Gross Margin"] = ScraperTask(
+            "Finviz",
+            lambda: cache.set("finviz_gross_margin_STALE", 81.0),
+            key="Finviz Gross Margin:STALE"
+        )
+        return tasks
+    
+    monkeypatch.setattr(ratio_fetcher, "build_scraper_tasks", build)
+    cache.set("finviz_gross_margin_STALE", 80.0)
+    time.sleep(0.1)
+    
+    data = ratio_fetcher.fetch_analysis("STALE")
+    
+    gross_margin = data.ratios[0].values[0]
+    assert gross_margin.value == 80.0
+    assert gross_margin.stale
+    assert not data.ratios[0].values[1].stale
+    time.sleep(0.1)
+    assert cache.get_stale("finviz_gross_margin_STALE")[0] == 81.0
+
+
+def test_batch_analysis_runs_tickers_concurrently(monkeypatch):
+    """A batch takes about as long as one analysis, not one per ticker."""
+    monkeypatch.setattr(ratio_fetcher, "build_scraper_tasks", _fake_tasks(0.3))
+    # Generous source limits, so the sources themselves aren't the bottleneck here
+    executor = ScraperExecutor(max_workers=64, source_limits={source: 16 for source in DEFAULT_SOURCE_LIMITS})
+    monkeypatch.setattr(ratio_fetcher, "scraper_executor", executor)
+    prefetched = []
+    monkeypatch.setattr(scraper_registry.get("yahoo"), "prefetch", prefetched.extend)
+    tickers = ["AAA", "BBB", "CCC", "DDD", "aaa"]
+    
+    async def scenario():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            start = time.time()
+            response = await client.post("/api/analyze/batch", json={"tickers": tickers})
+            return response, time.time() - start
+    
+    response, elapsed = asyncio.run(scenario())
+    
+    assert response.status_code == 200
+    data = response.json()
+    assert sorted(data["results"]) == ["AAA", "BBB", "CCC", "DDD"]
+    assert data["errors"] == {}
+    assert data["results"]["CCC"]["ratios"][0]["consensus"] == 50.0
+    assert elapsed < 0.9  # Sequential would be 4 x 0.3s
+    assert prefetched == ["AAA", "BBB", "CCC", "DDD"]  # Yahoo data prefetched for the batch
+    executor.shutdown()
+
+
+def test_batch_analysis_rejects_invalid_tickers():
+    async def scenario():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return await client.post("/api/analyze/batch", json={"tickers": ["PLTR", "WAYTOOLONGTICKER"]})
+    
+    assert asyncio.run(scenario()).status_code == 400
+
+
+def _slow_except_finviz_gross_margin(ticker_upper):
+    """Fake scraper calls: Finviz Gross Margin answers at once, the others take 0.5s."""
+    tasks = _fake_tasks(0.5)(ticker_upper)
+    tasks["Finviz Gross Margin"] = ScraperTask("Finviz", lambda: 70.0)
+    return tasks
+
+
+def test_stream_yields_fast_sources_first(monkeypatch):
+    """Fast sources are yielded before slow ones finish."""
+    monkeypatch.setattr(ratio_fetcher, "build_scraper_tasks", _slow_except_finviz_gross_margin)
+    
+    async def scenario():
+        start = time.time()
+        return [
+            (event, data, time.time() - start)
+            async for event, data in ratio_fetcher.stream_analysis_async("fast")
+        ]
+    
+    events = asyncio.run(scenario())
+    names = [name for name, _, _ in events]
+    
+    assert names[0] == "start"
+    assert names[-1] == "done"
+    assert names.count("ratio") == len(ratio_fetcher.RATIO_DEFINITIONS)
+    
+    first_source = next(e for e in events if e[0] == "source")
+    assert first_source[1] == {"metric": "Gross Margin", "source": "Finviz", "value": 70.0, "stale": False}
+    assert first_source[2] < 0.3
+    assert events[-1][2] >= 0.5
+
+
+def test_stream_route_sends_server_sent_events(monkeypatch):
+    monkeypatch.setattr(ratio_fetcher, "build_scraper_tasks", _slow_except_finviz_gross_margin)
+    
+    async def scenario():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return await client.get("/api/analyze/STRM/stream")
+    
+    response = asyncio.run(scenario())
+    
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+    blocks = [block.split("\n") for block in response.text.strip().split("\n\n")]
+    events = [(lines[0][len("event: "):], json.loads(lines[1][len("data: "):])) for lines in blocks]
+    
+    assert events[0][0] == "start"
+    assert events[-1][0] == "done"
+    done = events[-1][1]
+    assert done["ticker"] == "STRM"
+    assert done["ratios"][0]["consensus"] == pytest.approx((70.0 + 50.0 + 50.0) / 3)
@@ -0,0 +1,91 @@
+"""
+Tests for the async HTTP fetch layer.
+
+Requests are answered by an in-process httpx transport, so these run offline.
+The HTML below is a small synthetic stand-in for a Finviz quote page.
+"""
+
+import asyncio
+import time
+
+import httpx
+
+from app.scrapers import async_http, base
+from app.scrapers.async_http import AsyncHttpClient
+from app.scrapers.finviz import FinvizScraper
+from app.services.cache import SimpleCache
+from app.services.rate_limiter import HostRateLimiter
+
+QUOTE_PAGE = b"""
+<html><body><table>
+<tr><td class="snapshot-td2">P/E</td><td class="snapshot-td2">406.95</td>
+<td class="snapshot-td2">Gross Margin</td><td class="snapshot-td2">80.81%</td></tr>
+</table></body></html>
+"""
+
+
+def _no_rate_limit(monkeypatch):
+    monkeypatch.setattr(async_http, "rate_limiter", HostRateLimiter(default_limit=(1000, 1000)))
+
+
+def test_many_fetches_run_concurrently_on_one_loop(monkeypatch):
+    _no_rate_limit(monkeypatch)
+    
+    async def handler(request):
+        await asyncio.sleep(0.2)
+        return httpx.Response(200, content=request.url.path.encode())
+    
+    client = AsyncHttpClient(transport=httpx.MockTransport(handler))
+    
+    async def scenario():
+        start = time.time()
+        bodies = await asyncio.gather(*(client.fetch(f"https://site.test/{i}") for i in range(100)))
+        elapsed = time.time() - start
+        await client.aclose()
+        return bodies, elapsed
+    
+    bodies, elapsed = asyncio.run(scenario())
+    
+    assert bodies == [f"/{i}".encode() for i in range(100)]
+    assert elapsed < 1.0
+
+
+def test_fetch_retries_then_gives_up(monkeypatch):
+    _no_rate_limit(monkeypatch)
+    calls = []
+    
+    def handler(request):
+        calls.append(request.url)
+        return httpx.Response(503 if len(calls) == 1 else 200, content=b"ok")
+    
+    client = AsyncHttpClient(transport=httpx.MockTransport(handler))
+    assert asyncio.run(client.fetch("https://site.test/", retries=2)) == b"ok"
+    assert len(calls) == 2
+    
+    failing = AsyncHttpClient(transport=httpx.MockTransport(lambda request: httpx.Response(500)))
+    assert asyncio.run(failing.fetch("https://site.test/", retries=1)) is None
+
+
+def test_finviz_async_getters_share_one_download(monkeypatch):
+    _no_rate_limit(monkeypatch)
+    monkeypatch.setattr(base, "page_cache", SimpleCache(ttl_seconds=60))
+    monkeypatch.setattr(base, "scraper_cache", SimpleCache(ttl_seconds=60))
+    requests = []
+    
+    def handler(request):
+        requests.append(request.url)
+        return httpx.Response(200, content=QUOTE_PAGE)
+    
+    monkeypatch.setattr(base, "async_http_client", AsyncHttpClient(transport=httpx.MockTransport(handler)))
+    scraper = FinvizScraper()
+    
+    async def scenario():
+        return await asyncio.gather(
+            scraper.get_gross_margin_async("pltr"),
+            scraper.get_pe_ratio_async("PLTR"),
+        )
+    
+    assert asyncio.run(scenario()) == [80.81, 406.95]
+    assert len(requests) == 1
+    # The sync getters read the same caches
+    assert scraper.get_gross_margin("PLTR") == 80.81
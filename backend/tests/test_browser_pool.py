@@ -0,0 +1,124 @@
+"""
+Tests for the shared browser pool.
+
+Chrome is replaced by a fake driver so these run without a browser installed.
+"""
+
+import threading
+import time
+
+import pytest
+
+from app.scrapers.browser_pool import BrowserPool
+
+
+class FakeDriver:
+    """Minimal stand-in for a Chrome WebDriver."""
+    
+    def __init__(self):
+        self.alive = True
+        self.quit_called = False
+        self.cdp_commands = []
+    
+    @property
+    def current_url(self):
+        if not self.alive:
+            raise RuntimeError("browser crashed")
+        return "about:blank"
+    
+    def quit(self):
+        self.quit_called = True
+    
+    def execute_cdp_cmd(self, command, params):
+        self.cdp_commands.append((command, params))
+        return {}
+
+
+class FakeBrowserPool(BrowserPool):
+    """Browser pool creating FakeDriver instances."""
+    
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.created = []
+    
+    def _create_driver(self):
+        driver = FakeDriver()
+        self.created.append(driver)
+        return driver
+
+
+def test_start_prewarms_browsers():
+    pool = FakeBrowserPool(max_size=3)
+    pool.start(warm=2)
+    
+    assert len(pool.created) == 2
+    with pool.driver() as driver:
+        assert driver in pool.created
+    assert len(pool.created) == 2
+
+
+def test_browser_is_reused_and_recycled_after_max_navigations():
+    pool = FakeBrowserPool(max_size=1, max_navigations=2)
+    
+    with pool.driver() as first:
+        pass
+    with pool.driver() as second:
+        pass
+    with pool.driver() as third:
+        pass
+    
+    assert first is second
+    assert first.quit_called
+    assert third is not first
+
+
+def test_dead_browser_is_replaced():
+    pool = FakeBrowserPool(max_size=1)
+    with pool.driver() as driver:
+        pass
+    driver.alive = False
+    
+    with pool.driver() as replacement:
+        assert replacement is not driver
+    assert driver.quit_called
+
+
+def test_error_during_page_load_discards_browser():
+    pool = FakeBrowserPool(max_size=1)
+    with pytest.raises(ValueError):
+        with pool.driver() as driver:
+            raise ValueError("page load failed")
+    
+    assert driver.quit_called
+    with pool.driver() as replacement:
+        assert replacement is not driver
+
+
+def test_checkout_waits_when_pool_is_full():
+    pool = FakeBrowserPool(max_size=1, checkout_timeout=0.2)
+    browser = pool.checkout()
+    
+    with pytest.raises(TimeoutError):
+        pool.checkout()
+    
+    # Once the browser is given back, a waiting caller gets it
+    threading.Timer(0.05, pool.checkin, args=(browser,)).start()
+    pool.checkout_timeout = 2
+    start = time.time()
+    assert pool.checkout() is browser
+    assert time.time() - start < 1
+    assert len(pool.created) == 1
+
+
+def test_blocklist_is_set_per_page_load_only_when_it_changes():
+    pool = FakeBrowserPool(max_size=1)
+    
+    with pool.driver(blocked_urls=["*.png", "*.woff2"]) as driver:
+        pass
+    with pool.driver(blocked_urls=["*.png", "*.woff2"]):
+        pass
+    with pool.driver():
+        pass
+    
+    blocklists = [params["urls"] for command, params in driver.cdp_commands if command == "Network.setBlockedURLs"]
+    assert blocklists == [["*.png", "*.woff2"], []]
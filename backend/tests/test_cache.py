@@ -0,0 +1,215 @@
+"""
+Tests for the in-memory scraper cache.
+"""
+
+import threading
+import time
+
+from app.services.cache import FETCH_FAILED, MISSING, NOT_AVAILABLE, SimpleCache
+
+
+def test_get_returns_value_until_expired():
+    cache = SimpleCache(ttl_seconds=0.1)
+    cache.set("finviz_pe_PLTR", 406.95)
+    
+    assert cache.get("finviz_pe_PLTR") == 406.95
+    time.sleep(0.15)
+    assert cache.get("finviz_pe_PLTR") is None
+
+
+def test_get_or_set_loads_once_for_concurrent_callers():
+    """Several getters asking for the same page share one load."""
+    cache = SimpleCache(ttl_seconds=60)
+    calls = []
+    
+    def loader():
+        calls.append(1)
+        time.sleep(0.1)
+        return "<parsed page>"
+    
+    results = []
+    threads = [
+        threading.Thread(target=lambda: results.append(cache.get_or_set("https://finviz.com/quote.ashx?t=PLTR", loader)))
+        for _ in range(5)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    
+    assert len(calls) == 1
+    assert results == ["<parsed page>"] * 5
+
+
+def test_concurrent_callers_share_a_failed_load():
+    """Callers waiting for a load that fails get its None instead of loading one after another."""
+    cache = SimpleCache(ttl_seconds=60)
+    calls = []
+    
+    def loader():
+        calls.append(1)
+        time.sleep(0.1)
+        return None
+    
+    threads = [threading.Thread(target=cache.get_or_set, args=("url", loader)) for _ in range(5)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    
+    assert len(calls) == 1
+
+
+def test_get_or_set_does_not_cache_failed_loads():
+    cache = SimpleCache(ttl_seconds=60)
+    assert cache.get_or_set("url", lambda: None) is None
+    assert cache.get_or_set("url", lambda: "page") == "page"
+    
+    cache.set_failed("down")
+    assert cache.get_or_set("down", lambda: "page") is None  # Known failure: not loaded again
+
+
+def test_negative_entries_are_kept_apart_from_misses():
+    cache = SimpleCache(ttl_seconds=60, not_available_ttl=60, failed_ttl=0.1)
+    cache.set_not_available("yahoo_interest_coverage_PLTR")
+    cache.set_failed("morningstar_gross_margin_PLTR")
+    
+    assert cache.lookup("unknown_key") is MISSING
+    assert cache.lookup("yahoo_interest_coverage_PLTR") is None
+    assert cache.get_kind("yahoo_interest_coverage_PLTR") == NOT_AVAILABLE
+    assert cache.get_kind("morningstar_gross_margin_PLTR") == FETCH_FAILED
+    
+    # Failed fetches use their own (shorter) TTL
+    time.sleep(0.15)
+    assert cache.lookup("morningstar_gross_margin_PLTR") is MISSING
+    assert cache.lookup("yahoo_interest_coverage_PLTR") is None
+
+
+def test_scraper_does_not_refetch_known_empty_value(monkeypatch):
+    """A page without the metric is fetched once, then served from the cache."""
+    from bs4 import BeautifulSoup
+    from app.scrapers import base
+    from app.scrapers import finviz as finviz_module
+    
+    cache = SimpleCache(ttl_seconds=60, not_available_ttl=60, failed_ttl=60)
+    monkeypatch.setattr(base, "scraper_cache", cache)
+    fetches = []
+    
+    def fake_quote_page(self, ticker):
+        fetches.append(ticker)
+        return BeautifulSoup("<table><tr><td class='snapshot-td2'>Employees</td></tr></table>", "lxml")
+    
+    monkeypatch.setattr(finviz_module.FinvizScraper, "_get_quote_page", fake_quote_page)
+    scraper = finviz_module.FinvizScraper()
+    
+    assert scraper.get_gross_margin("ZZZZ") is None
+    assert scraper.get_gross_margin("ZZZZ") is None
+    assert fetches == ["ZZZZ"]
+    assert cache.get_kind("finviz_gross_margin_ZZZZ") == NOT_AVAILABLE
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = SimpleCache(ttl_seconds=60, max_entries=2)
+    cache.set("a", 1.0)
+    cache.set("b", 2.0)
+    cache.get("a")  # "b" is now the least recently used
+    cache.set("c", 3.0)
+    
+    assert cache.lookup("b") is MISSING
+    assert cache.get("a") == 1.0
+    assert cache.get("c") == 3.0
+    assert cache.stats()["evictions"] == 1
+
+
+def test_byte_budget_is_respected():
+    cache = SimpleCache(ttl_seconds=60, max_bytes=2000)
+    for i in range(50):
+        cache.set(f"key_{i}", "x" * 200)
+    
+    stats = cache.stats()
+    assert stats["bytes"] <= 2000
+    assert 0 < stats["entries"] < 50
+    assert cache.get("key_49") == "x" * 200
+
+
+def test_sweep_removes_expired_entries():
+    cache = SimpleCache(ttl_seconds=0.05)
+    for i in range(10):
+        cache.set(f"key_{i}", i)
+    time.sleep(0.1)
+    cache.set("fresh", 1)
+    
+    assert cache.sweep() == 10
+    assert cache.stats()["entries"] == 1
+    assert cache.stats()["bytes"] > 0
+
+
+def test_background_sweeper():
+    cache = SimpleCache(ttl_seconds=0.05)
+    cache.set("key", 1)
+    cache.start_sweeper(interval_seconds=0.05)
+    time.sleep(0.3)
+    cache.stop_sweeper()
+    
+    assert cache.stats()["entries"] == 0
+
+
+def test_concurrent_writers_keep_accounting_consistent():
+    cache = SimpleCache(ttl_seconds=60, max_entries=100)
+    
+    def writer(offset):
+        for i in range(500):
+            cache.set(f"key_{(offset + i) % 300}", i)
+            cache.get(f"key_{i % 300}")
+    
+    threads = [threading.Thread(target=writer, args=(n * 37,)) for n in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    
+    stats = cache.stats()
+    assert stats["entries"] == 100
+    assert stats["bytes"] == sum(cache._sizes.values())
+
+
+def test_stale_values_are_kept_until_max_stale():
+    cache = SimpleCache(ttl_seconds=0.05, max_stale_seconds=0.2)
+    cache.set("key", 1.0)
+    cache.set_failed("failed")
+    time.sleep(0.1)
+    
+    # Expired: normal reads miss, but the value can still be served stale
+    assert cache.lookup("key") is MISSING
+    value, age = cache.get_stale("key")
+    assert value == 1.0
+    assert age >= 0.05
+    assert cache.get_stale("failed") is None  # Negative results are never served stale
+    assert cache.sweep() == 1  # Only the failed entry goes
+    
+    time.sleep(0.2)
+    assert cache.get_stale("key") is None
+    assert cache.sweep() == 1
+
+
+def test_failed_refresh_keeps_the_stale_value(monkeypatch):
+    """A background refresh failing after expiry doesn't take the stale value away."""
+    from app.scrapers import base
+    from app.scrapers.finviz import FinvizScraper
+    
+    cache = SimpleCache(ttl_seconds=0.05, max_stale_seconds=60)
+    monkeypatch.setattr(base, "scraper_cache", cache)
+    cache.set("finviz_gross_margin_PLTR", 20.0)
+    time.sleep(0.1)
+    
+    scraper = FinvizScraper()
+    assert scraper._parse_and_cache("finviz_gross_margin_PLTR", None, lambda page: 21.0) is None  # Site down
+    assert scraper._parse_and_cache("finviz_gross_margin_PLTR", "<page>", lambda page: None) is None  # Not on the page
+    
+    assert cache.get_stale("finviz_gross_margin_PLTR")[0] == 20.0
+    assert cache.lookup("finviz_gross_margin_PLTR") is MISSING  # Still refreshed on next read
+    
+    # Once the value can't be served anymore, failures are remembered as usual
+    cache.max_stale = 0
+    cache.set_failed("finviz_gross_margin_PLTR")
+    assert cache.get_kind("finviz_gross_margin_PLTR") == FETCH_FAILED
@@ -0,0 +1,121 @@
+"""
+Tests for the background cache warmer.
+
+Scraper calls are replaced by fake calls reading and writing a test cache, so
+these run offline.
+"""
+
+import threading
+import time
+from datetime import datetime
+
+from app.services import cache_warmer, ratio_fetcher
+from app.services.cache import MISSING, SimpleCache
+from app.services.cache_warmer import MARKET_TIMEZONE, CacheWarmer, load_watchlist
+from app.services.executor import ScraperExecutor, ScraperTask
+from app.services.rate_limiter import HostRateLimiter
+
+
+def _fake_scrapers(monkeypatch, cache, calls):
+    """One fake call per cache key: like a scraper, it only fetches when the cache has nothing."""
+    keys = {"Fast": "fast_{ticker}", "Slow": "slow_{ticker}", "Empty": "empty_{ticker}", "Cold": "cold_{ticker}"}
+    
+    def scrape(key):
+        if cache.lookup(key) is MISSING:
+            calls.append(key)
+            cache.set(key, 2.0)
+        return cache.get(key)
+    
+    def build(ticker_upper):
+        return {
+            name: ScraperTask("Finviz", lambda key=key_format.format(ticker=ticker_upper): scrape(key), key=f"{name}:{ticker_upper}")
+            for name, key_format in keys.items()
+        }
+    
+    monkeypatch.setattr(ratio_fetcher, "build_scraper_tasks", build)
+    monkeypatch.setattr(ratio_fetcher, "CACHE_KEYS", keys)
+    monkeypatch.setattr(cache_warmer, "scraper_cache", cache)
+    monkeypatch.setattr(cache_warmer, "scraper_executor", ScraperExecutor(max_workers=2))
+    monkeypatch.setattr(cache_warmer, "rate_limiter", HostRateLimiter(default_limit=(1000, 1000)))
+
+
+def test_load_watchlist(tmp_path):
+    path = tmp_path / "watchlist.txt"
+    path.write_text("# Dashboard\nnvda\nMSFT  # Microsoft\n\n")
+    
+    assert load_watchlist("PLTR, nvda,", str(path)) == ["PLTR", "NVDA", "MSFT"]
+    assert load_watchlist(None, str(tmp_path / "missing.txt")) == []
+
+
+def test_warms_during_market_hours_only():
+    warmer = CacheWarmer()
+    
+    assert warmer.in_warm_hours(datetime(2026, 10, 19, 8, 45, tzinfo=MARKET_TIMEZONE))  # Monday, before the open
+    assert warmer.in_warm_hours(datetime(2026, 10, 19, 15, 59, tzinfo=MARKET_TIMEZONE))
+    assert not warmer.in_warm_hours(datetime(2026, 10, 19, 17, 0, tzinfo=MARKET_TIMEZONE))
+    assert not warmer.in_warm_hours(datetime(2026, 10, 17, 11, 0, tzinfo=MARKET_TIMEZONE))  # Saturday
+    assert CacheWarmer(all_day=True).in_warm_hours(datetime(2026, 10, 17, 3, 0, tzinfo=MARKET_TIMEZONE))
+
+
+def test_refreshes_cold_and_expiring_values_only(monkeypatch):
+    cache = SimpleCache(ttl_seconds=1, failed_ttl=60)
+    calls = []
+    _fake_scrapers(monkeypatch, cache, calls)
+    warmer = CacheWarmer(refresh_ahead=0.5, yield_seconds=0)
+    warmer.watchlist = ["PLTR"]
+    
+    cache.set("slow_PLTR", 1.0)
+    time.sleep(0.6)
+    cache.set("fast_PLTR", 1.0)  # Expires in 1s: not due yet
+    cache.set_failed("empty_PLTR")  # Retried only once expired
+    
+    assert warmer.warm_once() == 2
+    
+    assert calls == ["cold_PLTR", "slow_PLTR"]  # Soonest expiry first
+    assert cache.get("slow_PLTR") == 2.0  # Refreshed before it expired
+    assert cache.get("fast_PLTR") == 1.0
+    assert warmer.due_calls() == []
+
+
+def test_failed_refresh_keeps_the_current_value(monkeypatch):
+    """A warm pass during an outage leaves fresh values alone and retries on the next pass."""
+    cache = SimpleCache(ttl_seconds=60, failed_ttl=60)
+    _fake_scrapers(monkeypatch, cache, [])
+    
+    def outage(ticker_upper):
+        def scrape(key):
+            if cache.lookup(key) is MISSING:
+                cache.set_failed(key)  # Like a scraper whose page didn't load
+            return cache.get(key)
+        return {"Fast": ScraperTask("Finviz", lambda: scrape(f"fast_{ticker_upper}"), key=f"Fast:{ticker_upper}")}
+    
+    monkeypatch.setattr(ratio_fetcher, "build_scraper_tasks", outage)
+    cache.set("fast_PLTR", 80.0)
+    warmer = CacheWarmer(refresh_ahead=120, yield_seconds=0)  # Due right away
+    warmer.watchlist = ["PLTR"]
+    
+    assert warmer.warm_once() == 1
+    
+    assert cache.get("fast_PLTR") == 80.0
+    assert len(warmer.due_calls()) == 1  # Retried on the next pass
+
+
+def test_yields_to_interactive_calls(monkeypatch):
+    cache = SimpleCache(ttl_seconds=60)
+    calls = []
+    _fake_scrapers(monkeypatch, cache, calls)
+    monkeypatch.setattr(cache_warmer, "TURN_POLL_INTERVAL", 0.01)
+    for key in ("fast_KO", "slow_KO", "empty_KO"):
+        cache.set(key, 1.0)
+    warmer = CacheWarmer(refresh_ahead=10, yield_seconds=0.1)
+    warmer.watchlist = ["KO"]
+    
+    analysis = cache_warmer.scraper_executor.submit(ScraperTask("Finviz", lambda: time.sleep(0.3)))
+    warmed = threading.Event()
+    threading.Thread(target=lambda: warmer.warm_once() and warmed.set()).start()
+    
+    time.sleep(0.2)
+    assert calls == []  # Waits while the analysis runs
+    analysis.result()
+    assert warmed.wait(2)
+    assert calls == ["cold_KO"]
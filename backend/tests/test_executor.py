@@ -0,0 +1,69 @@
+"""
+Tests for the concurrent scraper executor.
+
+These run offline - scraper calls are replaced by small sleeps.
+"""
+
+import threading
+import time
+
+from app.services.executor import ScraperExecutor, ScraperTask
+
+
+def test_run_all_runs_calls_concurrently():
+    """Total time should be close to the slowest call, not the sum."""
+    executor = ScraperExecutor(max_workers=4)
+    tasks = {
+        f"call {i}": ScraperTask(f"Source {i}", lambda i=i: (time.sleep(0.2), i)[1])
+        for i in range(4)
+    }
+    
+    start = time.time()
+    results = executor.run_all(tasks)
+    elapsed = time.time() - start
+    executor.shutdown()
+    
+    assert results == {f"call {i}": i for i in range(4)}
+    assert elapsed < 0.6
+
+
+def test_source_limit_is_respected():
+    """No more than the configured number of calls per source run at once."""
+    executor = ScraperExecutor(max_workers=8, source_limits={"Morningstar": 2})
+    lock = threading.Lock()
+    running = [0]
+    peak = [0]
+    
+    def call():
+        with lock:
+            running[0] += 1
+            peak[0] = max(peak[0], running[0])
+        time.sleep(0.05)
+        with lock:
+            running[0] -= 1
+        return 1.0
+    
+    tasks = {f"call {i}": ScraperTask("Morningstar", call) for i in range(6)}
+    results = executor.run_all(tasks)
+    executor.shutdown()
+    
+    assert all(value == 1.0 for value in results.values())
+    assert peak[0] == 2
+
+
+def test_failed_and_slow_calls_return_none():
+    """Errors and calls past the timeout don't break the other results."""
+    executor = ScraperExecutor(max_workers=4)
+    
+    def fail():
+        raise RuntimeError("boom")
+    
+    tasks = {
+        "ok": ScraperTask("Finviz", lambda: 42.0),
+        "error": ScraperTask("Yahoo Finance", fail),
+        "slow": ScraperTask("QuickFS", lambda: time.sleep(1) or 1.0),
+    }
+    results = executor.run_all(tasks, timeout=0.3)
+    executor.shutdown(wait=False)
+    
+    assert results == {"ok": 42.0, "error": None, "slow": None}
@@ -0,0 +1,143 @@
+"""
+Tests for the Macrotrends statement matrix.
+"""
+
+import asyncio
+import json
+import threading
+import time
+
+from app.scrapers import base, macrotrends
+from app.scrapers.base import parse_html
+from app.scrapers.macrotrends import MacrotrendsScraper
+from app.services.cache import SimpleCache
+
+
+def statement_page(rows):
+    """Statement page with its grid data in the originalData script."""
+    data = [
+        dict({"field_name": f"<a href='/stocks/charts/PLTR/palantir/x'>{name}</a>", "popup_icon": "<i></i>"}, **values)
+        for name, values in rows.items()
+    ]
+    return f"<html><head><script>var x = 1;</script></head><body><script>var originalData = {json.dumps(data)};</script></body></html>"
+
+
+FINANCIALS = statement_page({
+    "Revenue": {"2024-12-31": "2865.50700", "2023-12-31": "2225.01200"},
+    "Cost Of Goods Sold": {"2024-12-31": "557.64900", "2023-12-31": "431.10500"},
+    "Gross Profit": {"2024-12-31": "2307.85800", "2023-12-31": "1793.90700"},
+})
+
+CASH_FLOW = statement_page({
+    "Cash Flow From Operating Activities": {"2024-12-31": "1153.89700", "2023-12-31": "712.18200"},
+    "Net Change In Property, Plant, And Equipment": {"2024-12-31": "-12.40000", "2023-12-31": ""},
+})
+
+
+def test_statement_is_parsed_into_a_matrix():
+    scraper = MacrotrendsScraper()
+    matrix = scraper._parse_statement(parse_html(FINANCIALS, MacrotrendsScraper.PARSE_ONLY))
+    
+    assert matrix["Revenue"] == {"2024-12-31": 2865.507, "2023-12-31": 2225.012}
+    assert set(matrix) == {"Revenue", "Cost Of Goods Sold", "Gross Profit"}
+
+
+def test_table_is_read_when_there_is_no_data_script():
+    scraper = MacrotrendsScraper()
+    page = parse_html(
+        "<table><tr><th>Annual</th><th>2024-12-31</th><th>2023-12-31</th></tr>"
+        "<tr><td>Revenue</td><td>$2,865.51</td><td>$2,225.01</td></tr></table>",
+        MacrotrendsScraper.PARSE_ONLY
+    )
+    
+    assert scraper._parse_statement(page) == {"Revenue": {"2024-12-31": 2865.51, "2023-12-31": 2225.01}}
+    assert scraper._parse_statement(parse_html("<p>No data</p>")) is None
+
+
+def test_margins_are_computed_from_the_latest_common_year():
+    scraper = MacrotrendsScraper()
+    financials = scraper._parse_statement(parse_html(FINANCIALS))
+    cash_flow = scraper._parse_statement(parse_html(CASH_FLOW))
+    
+    assert round(scraper._parse_gross_margin(financials), 2) == 80.54
+    # No Free Cash Flow row: Operating Cash Flow - |Capex|, 2023 has no capex value
+    assert round(scraper._parse_fcf_margin(cash_flow, financials), 2) == round((1153.897 - 12.4) / 2865.507 * 100, 2)
+    
+    # Gross Profit missing: Revenue - Cost Of Goods Sold
+    del financials["Gross Profit"]
+    assert round(scraper._parse_gross_margin(financials), 2) == 80.54
+
+
+def test_each_statement_is_downloaded_once_for_all_metrics(monkeypatch):
+    """Gross Margin and FCF Margin share the income statement; both pages load concurrently."""
+    cache = SimpleCache(ttl_seconds=60, not_available_ttl=60, failed_ttl=60)
+    monkeypatch.setattr(base, "scraper_cache", cache)
+    pages = {"financial-statements": FINANCIALS, "cash-flow-statement": CASH_FLOW}
+    downloads = []
+    active = []
+    overlap = threading.Event()
+    
+    def fake_metric_page(self, ticker, metric):
+        downloads.append(metric)
+        active.append(metric)
+        if len(active) > 1:
+            overlap.set()
+        time.sleep(0.05)
+        active.remove(metric)
+        return parse_html(pages[metric], MacrotrendsScraper.PARSE_ONLY)
+    
+    monkeypatch.setattr(MacrotrendsScraper, "_get_metric_page", fake_metric_page)
+    scraper = MacrotrendsScraper()
+    
+    assert scraper.get_fcf_margin("MTST") is not None
+    assert round(scraper.get_gross_margin("MTST"), 2) == 80.54
+    assert sorted(downloads) == ["cash-flow-statement", "financial-statements"]
+    assert overlap.is_set()
+    assert cache.get("macrotrends_financial-statements_MTST")["Revenue"]["2024-12-31"] == 2865.507
+
+
+def test_async_getters_share_the_cached_statements(monkeypatch):
+    cache = SimpleCache(ttl_seconds=60, not_available_ttl=60, failed_ttl=60)
+    monkeypatch.setattr(base, "scraper_cache", cache)
+    pages = {"financial-statements": FINANCIALS, "cash-flow-statement": CASH_FLOW}
+    downloads = []
+    
+    async def fake_metric_page_async(self, ticker, metric):
+        downloads.append(metric)
+        return parse_html(pages[metric], MacrotrendsScraper.PARSE_ONLY)
+    
+    monkeypatch.setattr(MacrotrendsScraper, "_get_metric_page_async", fake_metric_page_async)
+    scraper = MacrotrendsScraper()
+    
+    async def run():
+        fcf_margin = await scraper.get_fcf_margin_async("MTSA")
+        gross_margin = await scraper.get_gross_margin_async("MTSA")
+        return fcf_margin, gross_margin
+    
+    fcf_margin, gross_margin = asyncio.run(run())
+    
+    assert fcf_margin is not None and round(gross_margin, 2) == 80.54
+    assert sorted(downloads) == ["cash-flow-statement", "financial-statements"]
+
+
+def test_refresh_reloads_the_statements_in_the_pool_threads(monkeypatch):
+    """Inside scraper_cache.bypass() (cache warmer), the statements loaded concurrently are downloaded again."""
+    cache = SimpleCache(ttl_seconds=60, not_available_ttl=60, failed_ttl=60)
+    monkeypatch.setattr(base, "scraper_cache", cache)
+    monkeypatch.setattr(macrotrends, "scraper_cache", cache)
+    pages = {"financial-statements": FINANCIALS, "cash-flow-statement": CASH_FLOW}
+    downloads = []
+    
+    def fake_metric_page(self, ticker, metric):
+        downloads.append(metric)
+        return parse_html(pages[metric], MacrotrendsScraper.PARSE_ONLY)
+    
+    monkeypatch.setattr(MacrotrendsScraper, "_get_metric_page", fake_metric_page)
+    scraper = MacrotrendsScraper()
+    
+    scraper.get_fcf_margin("MTSR")
+    with cache.bypass():
+        scraper.get_fcf_margin("MTSR")
+    scraper.get_fcf_margin("MTSR")
+    
+    assert sorted(downloads) == ["cash-flow-statement"] * 2 + ["financial-statements"] * 2
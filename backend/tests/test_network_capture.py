@@ -0,0 +1,206 @@
+"""
+Tests for the DevTools network capture.
+
+Chrome is replaced by a fake driver replaying network events, so these run
+without a browser installed.
+"""
+
+import base64
+import json
+from contextlib import contextmanager
+
+from app.scrapers import morningstar, network_capture, quickfs
+from app.scrapers.base import parse_html
+from app.scrapers.morningstar import MorningstarScraper
+from app.scrapers.quickfs import QuickFSScraper
+from app.scrapers.network_capture import NetworkCapture, capture_json, find_json_number
+from app.services.cache import SimpleCache
+from app.services.rate_limiter import HostRateLimiter
+from app.services.symbol_metadata import SymbolMetadataIndex
+
+DATA_URL = "https://api-global.morningstar.com/sal-service/v1/stock/keyMetrics/0P0001J2G0"
+
+
+def _event(method, **params):
+    return {"message": json.dumps({"message": {"method": method, "params": params}})}
+
+
+class FakeDriver:
+    """Replays performance log events in batches (one batch per get_log call after navigation)."""
+    
+    def __init__(self, batches, bodies):
+        self.batches = list(batches)
+        self.bodies = bodies
+        self.current_url = "about:blank"
+        self.navigated = False
+        self.page_source = "<table><tr><td>Gross Profit Margin %</td><td>79.9</td></tr></table>"
+    
+    def execute_cdp_cmd(self, command, params):
+        if command == "Network.getResponseBody":
+            return self.bodies[params["requestId"]]
+        return {}
+    
+    def get_log(self, log_type):
+        if not self.navigated or not self.batches:
+            return []
+        return self.batches.pop(0)
+    
+    def get(self, url):
+        self.navigated = True
+        self.current_url = url
+
+
+class FakePool:
+    def __init__(self, driver):
+        self.fake_driver = driver
+    
+    @contextmanager
+    def driver(self, blocked_urls=None):
+        yield self.fake_driver
+
+
+def _data_events(request_id, url, mime_type="application/json"):
+    return [
+        _event("Network.responseReceived", requestId=request_id, response={"url": url, "mimeType": mime_type}),
+        _event("Network.loadingFinished", requestId=request_id),
+    ]
+
+
+def test_find_json_number_reads_latest_value():
+    payloads = [{"data": {"rows": [{"fcf_margin": [0.1, None, 0.25]}]}}, {"grossMargin": "80.81"}]
+    
+    assert find_json_number(payloads, ["fcfMargin"]) == 0.25
+    assert find_json_number(payloads, ["grossProfitMargin", "grossMargin"]) == 80.81
+    assert find_json_number(payloads, ["roic"]) is None
+    assert find_json_number(None, ["roic"]) is None
+
+
+def test_capture_keeps_only_matching_json_responses():
+    body = base64.b64encode(json.dumps({"grossMargin": 80.81}).encode()).decode()
+    driver = FakeDriver(
+        batches=[
+            _data_events("1", "https://www.morningstar.com/assets/app.js", "application/javascript")
+            + _data_events("2", "https://ads.example.com/sal-service/v1/stock/x", "text/html")
+            + _data_events("3", DATA_URL)
+        ],
+        bodies={"3": {"body": body, "base64Encoded": True}}
+    )
+    capture = NetworkCapture(driver, morningstar.DATA_URL_PATTERN)
+    capture.start()
+    driver.get("https://www.morningstar.com/stocks/xnas/pltr/key-metrics")
+    
+    assert capture.poll() == 1
+    assert capture.payloads == [{"grossMargin": 80.81}]
+
+
+def _fake_browser(monkeypatch, driver):
+    monkeypatch.setattr(network_capture, "browser_pool", FakePool(driver))
+    monkeypatch.setattr(network_capture, "rate_limiter", HostRateLimiter(default_limit=(1000, 1000)))
+    monkeypatch.setattr(network_capture, "symbol_index", SymbolMetadataIndex(symbols={}))
+    monkeypatch.setattr(network_capture, "page_cache", SimpleCache(ttl_seconds=60))
+
+
+def test_capture_returns_once_the_data_response_arrived(monkeypatch):
+    driver = FakeDriver(
+        batches=[[], _data_events("7", DATA_URL), _data_events("8", DATA_URL + "/late")],
+        bodies={"7": {"body": json.dumps({"grossMargin": [80.81, 78.5]})}}
+    )
+    _fake_browser(monkeypatch, driver)
+    
+    payloads = capture_json(
+        "https://www.morningstar.com/stocks/xnas/pltr/key-metrics",
+        morningstar.DATA_URL_PATTERN,
+        lambda p: find_json_number(p, morningstar.GROSS_MARGIN_JSON_KEYS) is not None,
+        timeout=1
+    )
+    
+    assert payloads == [{"grossMargin": [80.81, 78.5]}]
+    assert len(driver.batches) == 1  # Didn't wait for the later responses
+
+
+def test_timeout_keeps_rendered_page_for_dom_parsing(monkeypatch):
+    driver = FakeDriver(batches=[], bodies={})
+    _fake_browser(monkeypatch, driver)
+    url = "https://www.morningstar.com/stocks/xnas/pltr/key-metrics"
+    
+    assert capture_json(url, morningstar.DATA_URL_PATTERN, lambda p: bool(p), timeout=0.2) == []
+    assert network_capture.page_cache.get(url).find("td") is not None
+
+
+def test_timeout_waits_for_the_rendered_page_before_keeping_it(monkeypatch):
+    driver = FakeDriver(batches=[], bodies={})
+    _fake_browser(monkeypatch, driver)
+    checks = []
+    
+    def page_ready(d):
+        checks.append(d)
+        return len(checks) == 3
+    
+    capture_json("https://quickfs.net/company/PLTR", quickfs.DATA_URL_PATTERN, lambda p: bool(p), timeout=0.1, page_ready=page_ready)
+    
+    assert checks == [driver] * 3
+
+
+class FailingPool:
+    """Browser pool whose browsers can't load anything."""
+    
+    def __init__(self):
+        self.attempts = 0
+    
+    @contextmanager
+    def driver(self, blocked_urls=None):
+        self.attempts += 1
+        raise RuntimeError("Chrome crashed")
+        yield
+
+
+def test_failed_page_is_loaded_once_for_all_getters(monkeypatch):
+    pool = FailingPool()
+    _fake_browser(monkeypatch, None)
+    monkeypatch.setattr(network_capture, "browser_pool", pool)
+    monkeypatch.setattr(morningstar, "browser_pool", pool)
+    monkeypatch.setattr(morningstar, "page_cache", network_capture.page_cache)
+    monkeypatch.setattr(morningstar, "scraper_cache", SimpleCache(ttl_seconds=60))
+    monkeypatch.setattr(morningstar, "NETWORK_CAPTURE", True)
+    scraper = MorningstarScraper()
+    
+    assert scraper.get_gross_margin("FAIL") is None
+    assert scraper._get_key_metrics_data("FAIL") is None
+    assert pool.attempts == 1  # No second capture, no DOM fallback render
+
+
+def test_quickfs_json_fractions_are_read_as_percentages(monkeypatch):
+    """The QuickFS API gives ratios as fractions, whatever their size."""
+    monkeypatch.setattr(quickfs, "NETWORK_CAPTURE", True)
+    monkeypatch.setattr(QuickFSScraper, "_get_company_data", lambda self, ticker: [{"roic": [0.1, 0.012], "fcf_margin": [1.8]}])
+    scraper = QuickFSScraper()
+    
+    assert round(scraper._find_json_metric("PLTR", quickfs.ROIC_JSON_KEYS), 6) == 1.2  # Small: still a fraction
+    assert round(scraper._find_json_metric("PLTR", quickfs.FCF_MARGIN_JSON_KEYS), 6) == 180.0
+
+
+def test_morningstar_reads_gross_margin_from_captured_json(monkeypatch):
+    driver = FakeDriver(batches=[_data_events("1", DATA_URL)], bodies={"1": {"body": json.dumps({"grossMargin": 80.81})}})
+    _fake_browser(monkeypatch, driver)
+    monkeypatch.setattr(morningstar, "page_cache", network_capture.page_cache)
+    monkeypatch.setattr(morningstar, "scraper_cache", SimpleCache(ttl_seconds=60))
+    monkeypatch.setattr(morningstar, "NETWORK_CAPTURE", True)
+    
+    assert MorningstarScraper().get_gross_margin("CAPT") == 80.81
+
+
+def test_json_and_table_paths_read_the_same_year():
+    """Morningstar's yearly lists run like its table columns: both paths return the latest year."""
+    years, series = ["2025", "2024", "2023"], [80.81, 81.25, 78.5]
+    page = parse_html(
+        "<table><tr><th></th>" + "".join(f"<th>{year}</th>" for year in years) + "</tr>"
+        "<tr><td>Gross Profit Margin %</td>" + "".join(f"<td>{value}</td>" for value in series) + "</tr></table>",
+        MorningstarScraper.PARSE_ONLY
+    )
+    payloads = [{"columnDefs": years, "rows": [{"label": "Gross Profit Margin %", "grossMargin": series}]}]
+    
+    from_table = MorningstarScraper()._find_table_row_value(page, "Gross Profit Margin", column_index=1)
+    from_json = find_json_number(payloads, morningstar.GROSS_MARGIN_JSON_KEYS, morningstar.JSON_NEWEST_FIRST)
+    
+    assert from_table == from_json == 80.81
+    assert find_json_number([{"roic": [0.1, 0.125]}], quickfs.ROIC_JSON_KEYS) == 0.125  # QuickFS: chronological
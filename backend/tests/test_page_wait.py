@@ -0,0 +1,74 @@
+"""
+Tests for the readiness predicate waits.
+
+Chrome is replaced by a fake driver whose page becomes ready after a few polls,
+so these run without a browser installed.
+"""
+
+import time
+from contextlib import contextmanager
+
+from selenium.common.exceptions import JavascriptException
+
+from app.scrapers import quickfs
+from app.scrapers.page_wait import METRIC_VALUE_SCRIPT, metric_value_present, wait_until_ready
+from app.scrapers.quickfs import QuickFSScraper
+from app.services.rate_limiter import HostRateLimiter
+
+PAGE = "<table><tr><td>ROIC</td><td>12.5%</td></tr></table>"
+
+
+class FakeDriver:
+    """Page whose data is rendered on the Nth poll (errors while navigating before that)."""
+    
+    def __init__(self, ready_after=3, errors=0):
+        self.ready_after = ready_after
+        self.errors = errors
+        self.scripts = []
+        self.page_source = PAGE
+    
+    def get(self, url):
+        pass
+    
+    def execute_script(self, script, *args):
+        self.scripts.append((script, args))
+        if len(self.scripts) <= self.errors:
+            raise JavascriptException("document unloaded while waiting for result")
+        return len(self.scripts) >= self.ready_after
+
+
+class FakePool:
+    def __init__(self, driver):
+        self.fake_driver = driver
+    
+    @contextmanager
+    def driver(self, blocked_urls=None):
+        yield self.fake_driver
+
+
+def test_returns_as_soon_as_the_data_is_rendered():
+    driver = FakeDriver(ready_after=3, errors=1)
+    
+    start = time.monotonic()
+    assert wait_until_ready(driver, metric_value_present("Return on Invested Capital", "ROIC"), timeout=5, interval=0.01)
+    
+    assert time.monotonic() - start < 1
+    assert len(driver.scripts) == 3
+    assert driver.scripts[-1] == (METRIC_VALUE_SCRIPT, (["return on invested capital", "roic"],))
+
+
+def test_gives_up_after_timeout():
+    driver = FakeDriver(ready_after=1000)
+    
+    assert not wait_until_ready(driver, metric_value_present("ROIC"), timeout=0.1, interval=0.01)
+
+
+def test_render_reads_the_page_without_fixed_sleeps(monkeypatch):
+    monkeypatch.setattr(quickfs, "browser_pool", FakePool(FakeDriver(ready_after=2)))
+    monkeypatch.setattr(quickfs, "rate_limiter", HostRateLimiter(default_limit=(1000, 1000)))
+    
+    start = time.monotonic()
+    soup = QuickFSScraper()._render_company_page("https://quickfs.net/company/WAIT")
+    
+    assert time.monotonic() - start < 1
+    assert QuickFSScraper()._find_metric_value(soup, "ROIC") == 12.5
@@ -0,0 +1,69 @@
+"""
+Tests for partial HTML parsing (PARSE_ONLY).
+"""
+
+from app.scrapers.base import parse_html
+from app.scrapers.finviz import FinvizScraper
+
+PAGE = """
+<html><head><script>var big = 1;</script></head><body>
+<div class="nav"><a href="/">Home</a></div>
+<table class="snapshot-table2"><tr>
+<td class="snapshot-td2 cursor-pointer">Gross Margin</td><td class="snapshot-td2"><b>80.81%</b></td>
+<td class="snapshot-td2 cursor-pointer">P/E</td><td class="snapshot-td2"><b>406.95</b></td>
+</tr></table>
+<table class="news-table"><tr><td>News</td></tr></table>
+</body></html>
+"""
+
+
+def test_only_matching_elements_are_kept():
+    soup = parse_html(PAGE, FinvizScraper.PARSE_ONLY)
+    
+    cells = soup.find_all("td")
+    assert [cell.get_text(strip=True) for cell in cells] == ["Gross Margin", "80.81%", "P/E", "406.95"]
+    assert soup.find("script") is None
+    assert soup.find("a") is None
+
+
+def test_scraper_reads_the_same_values_from_partial_tree():
+    scraper = FinvizScraper()
+    partial = parse_html(PAGE, FinvizScraper.PARSE_ONLY)
+    full = parse_html(PAGE)
+    
+    assert scraper._build_snapshot(partial) == scraper._build_snapshot(full)
+    assert scraper._parse_gross_margin(scraper._build_snapshot(partial)) == 80.81
+
+
+def test_whole_page_is_parsed_when_nothing_matches():
+    """If the layout changed, the scraper still gets the whole page."""
+    soup = parse_html("<html><body><p>Gross Margin: 75.5%</p></body></html>", FinvizScraper.PARSE_ONLY)
+    
+    assert soup.find("p") is not None
+
+
+def test_snapshot_indexes_every_label():
+    scraper = FinvizScraper()
+    snapshot = scraper._build_snapshot(parse_html(PAGE, FinvizScraper.PARSE_ONLY))
+    
+    assert snapshot == {"Gross Margin": "80.81%", "P/E": "406.95"}
+    assert scraper._parse_pe_ratio(snapshot) == 406.95
+    assert scraper._parse_roic(snapshot) is None
+    assert scraper._parse_roic({"ROI": "12.50%"}) is None  # Return on investment, not ROIC
+    assert scraper._parse_gross_margin({}) is None
+
+
+def test_all_metrics_share_one_download(monkeypatch):
+    scraper = FinvizScraper()
+    downloads = []
+    
+    def fake_quote_page(ticker):
+        downloads.append(ticker)
+        return parse_html(PAGE, FinvizScraper.PARSE_ONLY)
+    
+    monkeypatch.setattr(scraper, "_get_quote_page", fake_quote_page)
+    
+    assert scraper.get_metric("SNAP1", "P/E") == 406.95
+    assert scraper.get_metric("SNAP1", "Gross M.", "Gross Margin") == 80.81
+    assert scraper.get_metric("SNAP1", "Debt/Eq") is None
+    assert downloads == ["SNAP1"]
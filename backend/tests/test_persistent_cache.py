@@ -0,0 +1,86 @@
+"""
+Tests for the persistent (SQLite) cache tier.
+"""
+
+import os
+import sqlite3
+import threading
+import time
+
+import pytest
+
+from app.services.cache import MISSING, NOT_AVAILABLE, SimpleCache
+from app.services.persistent_cache import SQLiteCacheTier
+
+
+def test_values_survive_a_restart(tmp_path):
+    path = str(tmp_path / "cache.sqlite3")
+    cache = SimpleCache(ttl_seconds=60)
+    cache.attach_tier(SQLiteCacheTier(path))
+    cache.set("quickfs_roic_PLTR", 9.5)
+    cache.set_not_available("yahoo_interest_coverage_PLTR")
+    
+    # New process: empty memory, same file
+    restarted = SimpleCache(ttl_seconds=60)
+    restarted.attach_tier(SQLiteCacheTier(path))
+    
+    assert restarted.get("quickfs_roic_PLTR") == 9.5
+    assert restarted.lookup("yahoo_interest_coverage_PLTR") is None
+    assert restarted.get_kind("yahoo_interest_coverage_PLTR") == NOT_AVAILABLE
+    assert restarted.lookup("finviz_pe_PLTR") is MISSING
+
+
+def test_ttl_uses_original_fetch_time(tmp_path):
+    path = str(tmp_path / "cache.sqlite3")
+    cache = SimpleCache(ttl_seconds=0.1)
+    cache.attach_tier(SQLiteCacheTier(path))
+    cache.set("finviz_pe_PLTR", 406.95)
+    time.sleep(0.15)
+    
+    restarted = SimpleCache(ttl_seconds=0.1)
+    restarted.attach_tier(SQLiteCacheTier(path))
+    assert restarted.lookup("finviz_pe_PLTR") is MISSING
+    
+    restarted.sweep()
+    assert SQLiteCacheTier(path).count() == 0
+
+
+def test_non_serializable_values_stay_in_memory(tmp_path):
+    tier = SQLiteCacheTier(str(tmp_path / "cache.sqlite3"))
+    cache = SimpleCache(ttl_seconds=60)
+    cache.attach_tier(tier)
+    page = object()
+    cache.set("page", page)
+    
+    assert cache.get("page") is page
+    assert tier.count() == 0
+
+
+def test_clear_also_clears_disk(tmp_path):
+    path = str(tmp_path / "nested" / "cache.sqlite3")
+    cache = SimpleCache(ttl_seconds=60)
+    cache.attach_tier(SQLiteCacheTier(path))
+    cache.set("key", 1.0)
+    cache.clear()
+    
+    assert os.path.exists(path)
+    assert SQLiteCacheTier(path).count() == 0
+
+
+def test_close_closes_every_thread_connection(tmp_path):
+    tier = SQLiteCacheTier(str(tmp_path / "cache.sqlite3"))
+    threads = [threading.Thread(target=tier.set, args=(f"key{i}", i, time.time(), "value")) for i in range(3)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    connections = set(tier._connections)
+    
+    tier.close()
+    
+    assert len(connections) == 4  # Main thread (table creation) and the 3 writers
+    for connection in connections:
+        with pytest.raises(sqlite3.ProgrammingError):  # Closed
+            connection.execute("SELECT 1")
+    assert tier.count() == 3  # Reopened on next use
+    tier.close()
@@ -0,0 +1,71 @@
+"""
+Tests for the per-host rate limiter.
+"""
+
+import asyncio
+import threading
+import time
+
+from app.services.rate_limiter import HostRateLimiter, TokenBucket
+
+
+def test_bucket_allows_burst_then_steady_rate():
+    bucket = TokenBucket(rate=20, capacity=2)
+    
+    start = time.monotonic()
+    for _ in range(6):
+        bucket.acquire()
+    elapsed = time.monotonic() - start
+    
+    # 2 free tokens, then 4 more at 20/s
+    assert 0.18 <= elapsed < 0.35
+
+
+def test_limit_is_shared_across_threads():
+    """Threads hitting the same host share one bucket."""
+    limiter = HostRateLimiter(host_limits={"finviz.com": (20, 1)})
+    
+    def worker():
+        for _ in range(3):
+            limiter.acquire("https://finviz.com/quote.ashx?t=PLTR")
+    
+    start = time.monotonic()
+    threads = [threading.Thread(target=worker) for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.monotonic() - start
+    
+    # 9 requests, 1 free token, 8 more at 20/s
+    assert elapsed >= 0.38
+
+
+def test_hosts_are_matched_by_domain():
+    limiter = HostRateLimiter()
+    
+    assert limiter.bucket("https://www.macrotrends.net/stocks/charts/PLTR") is limiter.bucket("macrotrends.net")
+    assert limiter.bucket("https://elite.finviz.com/x") is limiter.bucket("https://finviz.com/y")
+    assert limiter.bucket("https://finviz.com/") is not limiter.bucket("https://quickfs.net/")
+
+
+def test_async_acquire_does_not_block_event_loop():
+    limiter = HostRateLimiter(host_limits={"quickfs.net": (5, 1)})
+    
+    async def scenario():
+        ticks = 0
+        
+        async def ticker():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.01)
+                ticks += 1
+        
+        task = asyncio.ensure_future(ticker())
+        for _ in range(3):
+            await limiter.acquire_async("https://quickfs.net/company/PLTR")
+        task.cancel()
+        return ticks
+    
+    # Waiting ~0.4s for tokens while the loop keeps running other tasks
+    assert asyncio.run(scenario()) > 10
@@ -0,0 +1,39 @@
+"""
+Tests for the shared scraper registry.
+"""
+
+from app.scrapers.registry import ScraperRegistry
+
+
+class FakeSession:
+    def __init__(self):
+        self.closed = False
+    
+    def close(self):
+        self.closed = True
+
+
+class FakeScraper:
+    def __init__(self):
+        self.session = FakeSession()
+
+
+def test_scrapers_are_created_once_and_shared():
+    registry = ScraperRegistry({"finviz": FakeScraper, "yahoo": FakeScraper})
+    
+    finviz = registry.get("finviz")
+    
+    assert registry.get("finviz") is finviz
+    assert registry.get("yahoo") is not finviz
+
+
+def test_shutdown_closes_sessions():
+    registry = ScraperRegistry({"finviz": FakeScraper})
+    registry.start()
+    finviz = registry.get("finviz")
+    
+    registry.shutdown()
+    
+    assert finviz.session.closed
+    # Used again after shutdown (e.g., a script): a new instance is created
+    assert registry.get("finviz") is not finviz
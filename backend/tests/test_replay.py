@@ -0,0 +1,169 @@
+"""
+Tests for the record/replay layer (cassettes).
+
+Cassettes are written in a temporary folder and the scrapers read them back
+in replay mode, so these run offline and without Chrome. Recording is tested
+with a fake Chrome driver.
+"""
+
+import asyncio
+import json
+import time
+
+import pandas as pd
+import pytest
+
+from app.scrapers import async_http, base, network_capture, quickfs, yahoo
+from app.scrapers.async_http import AsyncHttpClient
+from app.scrapers.browser_pool import BrowserPool
+from app.scrapers.finviz import FinvizScraper
+from app.scrapers.network_capture import capture_json, find_json_number
+from app.scrapers.quickfs import QuickFSScraper
+from app.scrapers.replay import REPLAY, RecordingDriver, ReplayDriver, cassettes, parse_latency
+from app.scrapers.yahoo import YahooScraper
+from app.services.cache import SimpleCache
+from app.services.rate_limiter import DEFAULT_HOST_LIMITS, HostRateLimiter
+from app.services.symbol_metadata import SymbolMetadataIndex
+
+QUOTE_PAGE = b"""
+<html><body><table>
+<tr><td class="snapshot-td2">P/E</td><td class="snapshot-td2">406.95</td>
+<td class="snapshot-td2">Gross Margin</td><td class="snapshot-td2">80.81%</td></tr>
+</table></body></html>
+"""
+
+COMPANY_PAGE = "<table><tr><td>ROIC</td><td>12.5%</td></tr></table>"
+
+
+@pytest.fixture
+def replaying(monkeypatch, tmp_path):
+    """Global cassette store in replay mode, on an empty temporary folder."""
+    monkeypatch.setattr(cassettes, "mode", REPLAY)
+    monkeypatch.setattr(cassettes, "directory", str(tmp_path))
+    monkeypatch.setattr(cassettes, "latency", parse_latency("0"))
+    monkeypatch.setattr(cassettes, "_loaded", {})
+    monkeypatch.setattr(cassettes, "_aliases", {})
+    monkeypatch.setattr(cassettes, "misses", set())
+    unlimited = HostRateLimiter({host: (1000, 1000) for host in DEFAULT_HOST_LIMITS}, default_limit=(1000, 1000))
+    for module in (base, async_http, network_capture, quickfs):
+        monkeypatch.setattr(module, "rate_limiter", unlimited)
+    monkeypatch.setattr(base, "page_cache", SimpleCache(ttl_seconds=60))
+    return cassettes
+
+
+def test_parse_latency():
+    assert parse_latency("0.3") == {"http": 0.3, "browser": 0.3, "yahoo": 0.3}
+    assert parse_latency("browser=4, http=0.2") == {"http": 0.2, "browser": 4.0, "yahoo": 0.0}
+    with pytest.raises(ValueError):
+        parse_latency("selenium=4")
+
+
+def test_replays_pages_and_redirects(replaying, monkeypatch):
+    symbols = SymbolMetadataIndex(symbols={})
+    monkeypatch.setattr(base, "symbol_index", symbols)
+    old_url = "https://www.macrotrends.net/stocks/charts/IBM/ibm/financial-statements"
+    new_url = "https://www.macrotrends.net/stocks/charts/IBM/international-business-machines/financial-statements"
+    replaying.record_http(old_url, 301, {"location": new_url}, b"")
+    replaying.record_http(new_url, 200, {"content-type": "text/html"}, QUOTE_PAGE)
+    
+    soup = FinvizScraper().fetch_page(old_url, retries=1)
+    
+    assert soup.find("td", string="P/E") is not None
+    assert symbols.macrotrends_slug("IBM") == "international-business-machines"  # Learned from the replayed redirect
+    assert FinvizScraper().fetch_page("https://finviz.com/quote.ashx?t=NONE", retries=1) is None
+    assert replaying.misses == {"http https://finviz.com/quote.ashx?t=NONE"}
+
+
+def test_async_replay_injects_latency(replaying):
+    url = "https://finviz.com/quote.ashx?t=PLTR"
+    replaying.record_http(url, 200, {"content-type": "text/html"}, QUOTE_PAGE)
+    replaying.latency = parse_latency("http=0.2")
+    client = AsyncHttpClient()
+    
+    async def scenario():
+        start = time.monotonic()
+        contents = await asyncio.gather(*(client.fetch(url, retries=1) for _ in range(10)))
+        elapsed = time.monotonic() - start
+        await client.aclose()
+        return contents, elapsed
+    
+    contents, elapsed = asyncio.run(scenario())
+    
+    assert contents == [QUOTE_PAGE] * 10
+    assert 0.2 <= elapsed < 1  # Replayed concurrently, each after the injected latency
+
+
+def test_browser_pages_replay_without_chrome(replaying, monkeypatch):
+    pool = BrowserPool(max_size=1)
+    monkeypatch.setattr(quickfs, "browser_pool", pool)
+    monkeypatch.setattr(network_capture, "browser_pool", pool)
+    url = "https://quickfs.net/company/PLTR"
+    data = {"url": "https://api.quickfs.net/stocks/PLTR/ovr/", "mime_type": "application/json", "body": '{"roic": [0.1, 0.125]}'}
+    replaying.record_browser_page(url, COMPANY_PAGE, [data])
+    
+    payloads = capture_json(url, quickfs.DATA_URL_PATTERN, lambda p: find_json_number(p, ("roic",)) is not None, timeout=1)
+    soup = QuickFSScraper()._render_company_page(url)
+    
+    assert find_json_number(payloads, ("roic",)) == 0.125
+    assert QuickFSScraper()._find_metric_value(soup, "ROIC") == 12.5
+    assert QuickFSScraper()._render_company_page("https://quickfs.net/company/NONE") is None
+    pool.shutdown()
+
+
+def test_yfinance_replay_and_aliases(replaying, monkeypatch):
+    monkeypatch.setattr(yahoo, "yahoo_cache", SimpleCache(ttl_seconds=60))
+    monkeypatch.setattr(yahoo, "symbol_index", SymbolMetadataIndex(symbols={}))
+    financials = pd.DataFrame(
+        [[1000.0, float("nan")], [-50.0, -40.0]],
+        index=["Operating Income", "Interest Expense"],
+        columns=pd.to_datetime(["2024-12-31", "2023-12-31"])
+    )
+    replaying.record_yfinance("PLTR", "info", {"trailingPE": 406.95, "exchange": "NMS"})
+    replaying.record_yfinance("PLTR", "financials", financials)
+    replaying.alias("LT00001", "PLTR")
+    
+    scraper = YahooScraper()
+    
+    assert scraper.get_info("LT00001") == {"trailingPE": 406.95, "exchange": "NMS"}
+    pd.testing.assert_frame_equal(scraper.get_financials("PLTR"), financials, check_freq=False)
+    assert scraper.get_info("NONE") is None  # Not recorded: fails like a network error
+
+
+class FakeChrome:
+    """Chrome driver whose page loads its data from one JSON response."""
+    
+    current_url = "https://quickfs.net/company/PLTR"
+    page_source = COMPANY_PAGE
+    
+    def get(self, url):
+        pass
+    
+    def get_log(self, log_type):
+        events = [
+            {"method": "Network.responseReceived", "params": {
+                "requestId": "7", "response": {"url": "https://api.quickfs.net/stocks/PLTR/ovr/", "mimeType": "application/json"},
+            }},
+            {"method": "Network.loadingFinished", "params": {"requestId": "7"}},
+        ]
+        return [{"message": json.dumps({"message": event})} for event in events]
+    
+    def execute_cdp_cmd(self, cmd, params):
+        return {"body": '{"roic": [0.125]}', "base64Encoded": False} if cmd == "Network.getResponseBody" else {}
+
+
+def test_recorded_browser_page_replays(replaying):
+    url = "https://quickfs.net/company/PLTR"
+    recorder = RecordingDriver(FakeChrome(), replaying)
+    capture = network_capture.NetworkCapture(recorder, quickfs.DATA_URL_PATTERN)
+    recorder.get(url)
+    capture.poll()
+    recorder.page_source
+    
+    driver = ReplayDriver(replaying)
+    driver.get(url)
+    replayed = network_capture.NetworkCapture(driver, quickfs.DATA_URL_PATTERN)
+    replayed.poll()
+    
+    assert replayed.payloads == capture.payloads == [{"roic": [0.125]}]
+    assert driver.page_source == COMPANY_PAGE
+    assert driver.current_url == url
@@ -0,0 +1,41 @@
+"""
+Tests for the scraper benchmark suite.
+
+Every scraper's extraction path must still read the baseline values from the
+fixture corpus (latency is only checked by the benchmark itself).
+"""
+
+from benchmarks import bench_scrapers
+
+
+def test_fixture_values_match_baselines():
+    results = bench_scrapers.run(repeat=1)
+    
+    assert bench_scrapers.compare(results, bench_scrapers.load_baselines(), check_performance=False) == []
+
+
+def test_slowdowns_and_changed_values_are_regressions():
+    results = {"calibration_ms": 50, "cases": {
+        "Page": {"parse_ms": 90, "extract_ms": 2, "peak_mb": 1, "calibration_ms": 50, "value": 80.81},
+    }}
+    baselines = {"calibration_ms": 25, "cases": {
+        # Baseline machine twice as fast: 30ms here is like 15ms there
+        "Page": {"parse_ms": 15, "extract_ms": 0.5, "peak_mb": 1, "calibration_ms": 25, "value": 80.5},
+    }}
+    
+    regressions = bench_scrapers.compare(results, baselines, tolerance=0.5)
+    
+    # extract_ms is 2x slower, but only by 1ms (below MIN_SLOWDOWN_MS): noise
+    assert [(name, metric) for name, metric, _ in regressions] == [("Page", "value"), ("Page", "parse_ms")]
+
+
+def test_baselines_are_medians_of_several_runs():
+    def one_run(parse_ms):
+        return {"calibration_ms": 50, "cases": {
+            "Page": {"parse_ms": parse_ms, "extract_ms": 2, "peak_mb": 1, "calibration_ms": 50, "value": 80.81},
+        }}
+    
+    combined = bench_scrapers.median_results([one_run(10), one_run(40), one_run(12)])
+    
+    assert combined["cases"]["Page"]["parse_ms"] == 12
+    assert combined["cases"]["Page"]["value"] == 80.81
@@ -0,0 +1,124 @@
+"""
+Tests for single-flight request coalescing.
+"""
+
+import asyncio
+import threading
+import time
+
+from app.services.executor import ScraperExecutor, ScraperTask
+from app.services.singleflight import SingleFlight
+
+
+def test_concurrent_calls_with_same_key_run_once():
+    flight = SingleFlight()
+    calls = []
+    
+    def scrape():
+        calls.append(1)
+        time.sleep(0.1)
+        return 80.81
+    
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(flight.do("NVDA", scrape))) for _ in range(5)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    
+    assert len(calls) == 1
+    assert results == [80.81] * 5
+    # Once finished, the next call scrapes again (the cache is responsible for reuse)
+    assert flight.do("NVDA", scrape) == 80.81
+    assert len(calls) == 2
+
+
+def test_async_callers_share_in_flight_call():
+    flight = SingleFlight()
+    calls = []
+    
+    async def scrape():
+        calls.append(1)
+        await asyncio.sleep(0.1)
+        return 42.0
+    
+    async def scenario():
+        return await asyncio.gather(*[flight.do_async("PLTR", scrape) for _ in range(10)])
+    
+    assert asyncio.run(scenario()) == [42.0] * 10
+    assert len(calls) == 1
+
+
+def test_errors_are_shared_and_not_remembered():
+    flight = SingleFlight()
+    
+    def fail():
+        raise RuntimeError("site down")
+    
+    try:
+        flight.do("AAPL", fail)
+        assert False, "expected RuntimeError"
+    except RuntimeError:
+        pass
+    assert flight.in_flight("AAPL") is None
+
+
+def test_executor_deduplicates_keyed_tasks():
+    executor = ScraperExecutor(max_workers=4)
+    calls = []
+    
+    def scrape():
+        calls.append(1)
+        time.sleep(0.1)
+        return 9.5
+    
+    first = executor.submit(ScraperTask("QuickFS", scrape, key="QuickFS ROIC:PLTR"))
+    second = executor.submit(ScraperTask("QuickFS", scrape, key="QuickFS ROIC:PLTR"))
+    other = executor.submit(ScraperTask("QuickFS", scrape, key="QuickFS ROIC:NVDA"))
+    
+    assert first is second
+    assert first.result() == second.result() == other.result() == 9.5
+    assert len(calls) == 2
+    executor.shutdown()
+
+
+def test_cancelled_caller_does_not_cancel_the_shared_call():
+    flight = SingleFlight()
+    
+    async def scrape():
+        await asyncio.sleep(0.1)
+        return 80.81
+    
+    async def scenario():
+        leader = asyncio.ensure_future(flight.do_async("PLTR", scrape))
+        await asyncio.sleep(0)
+        waiter = asyncio.ensure_future(flight.do_async("PLTR", scrape))
+        await asyncio.sleep(0.01)
+        leader.cancel()  # e.g., a streamed analysis whose client disconnected
+        return await waiter, leader.cancelled()
+    
+    assert asyncio.run(scenario()) == (80.81, True)
+    assert flight.in_flight("PLTR") is None
+
+
+def test_cancelled_async_task_still_serves_other_analyses():
+    executor = ScraperExecutor(max_workers=4)
+    
+    async def scrape():
+        await asyncio.sleep(0.1)
+        return 12.5
+    
+    def task():
+        return ScraperTask("Finviz", lambda: 0.0, key="Finviz ROIC:PLTR", async_func=scrape)
+    
+    async def scenario():
+        # Like stream_analysis_async when its client disconnects
+        cancelled = asyncio.ensure_future(executor.run_async(task()))
+        await asyncio.sleep(0.01)
+        other = asyncio.ensure_future(executor.run_all_async({"x": task()}))
+        await asyncio.sleep(0.01)
+        cancelled.cancel()
+        return await other
+    
+    assert asyncio.run(scenario()) == {"x": 12.5}
+    executor.shutdown()
@@ -0,0 +1,110 @@
+"""
+Tests for the symbol metadata index.
+"""
+
+import asyncio
+import json
+import os
+import time
+
+import httpx
+
+from app.scrapers import async_http, base, macrotrends, morningstar
+from app.scrapers.async_http import AsyncHttpClient
+from app.scrapers.macrotrends import MacrotrendsScraper
+from app.scrapers.morningstar import MorningstarScraper
+from app.services.cache import SimpleCache
+from app.services.rate_limiter import HostRateLimiter
+from app.services.symbol_metadata import SymbolMetadataIndex
+
+
+def test_learns_from_redirected_urls():
+    index = SymbolMetadataIndex(symbols={})
+    
+    assert index.learn_from_url("https://www.macrotrends.net/stocks/charts/IBM/ibm/financial-statements")
+    assert index.learn_from_url("https://www.morningstar.com/stocks/xnys/ibm/key-metrics")
+    assert not index.learn_from_url("https://www.morningstar.com/stocks/xnys/ibm/key-ratios")  # Nothing new
+    assert not index.learn_from_url("https://finviz.com/quote.ashx?t=IBM")
+    
+    assert index.get("ibm") == {"macrotrends_slug": "ibm", "exchange": "xnys"}
+
+
+def test_learns_exchange_and_name_from_yahoo_info():
+    index = SymbolMetadataIndex(symbols={})
+    index.learn_from_yahoo("KO", {"exchange": "NYQ", "longName": "The Coca-Cola Company"})
+    
+    assert index.exchange("KO") == "xnys"
+    assert index.get("KO")["name"] == "The Coca-Cola Company"
+
+
+def test_bulk_load_and_persistence(tmp_path):
+    listing = tmp_path / "listing.csv"
+    listing.write_text("ticker,exchange,macrotrends_slug,name\nIBM,xnys,ibm,IBM\nKO,xnys,,Coca-Cola\n")
+    path = str(tmp_path / "symbols.json")
+    
+    index = SymbolMetadataIndex(symbols={})
+    index.open(path)
+    assert index.load_file(str(listing)) == 2
+    index.learn_from_url("https://www.macrotrends.net/stocks/charts/KO/cocacola/financial-statements")
+    index.close()  # Writes the pending changes
+    
+    saved = json.loads(open(path).read())
+    assert saved["KO"] == {"exchange": "xnys", "macrotrends_slug": "cocacola", "name": "Coca-Cola"}
+    
+    reopened = SymbolMetadataIndex(symbols={})
+    assert reopened.open(path) == 2
+    assert reopened.macrotrends_slug("KO") == "cocacola"
+    assert reopened.load_file(str(tmp_path / "missing.json")) == 0
+
+
+def test_changes_are_saved_together(tmp_path, monkeypatch):
+    path = str(tmp_path / "symbols.json")
+    writes = []
+    index = SymbolMetadataIndex(symbols={}, save_delay=0.1)
+    index.open(path)
+    write = index._write
+    monkeypatch.setattr(index, "_write", lambda *args: writes.append(args) or write(*args))
+    
+    for i in range(20):
+        index.update(f"T{i}", exchange="xnys")
+    time.sleep(0.3)
+    
+    assert len(writes) == 1
+    assert len(json.loads(open(path).read())) == 20
+    assert os.listdir(tmp_path) == ["symbols.json"]  # No temporary file left
+
+
+def test_scraper_urls_use_the_index(monkeypatch):
+    index = SymbolMetadataIndex()
+    index.update("IBM", exchange="xnys", macrotrends_slug="ibm")
+    monkeypatch.setattr(macrotrends, "symbol_index", index)
+    monkeypatch.setattr(morningstar, "symbol_index", index)
+    
+    assert MorningstarScraper()._get_exchange("IBM") == "xnys"
+    assert MorningstarScraper()._get_exchange("ZZZZ") == "xnas"
+    assert MacrotrendsScraper()._get_company_name("NVDA") == "nvidia"
+    assert MacrotrendsScraper()._get_company_name("IBM") == "ibm"
+
+
+def test_async_download_learns_slug_from_redirect(monkeypatch):
+    index = SymbolMetadataIndex(symbols={})
+    monkeypatch.setattr(base, "symbol_index", index)
+    monkeypatch.setattr(macrotrends, "symbol_index", index)
+    monkeypatch.setattr(async_http, "rate_limiter", HostRateLimiter(default_limit=(1000, 1000)))
+    monkeypatch.setattr(base, "page_cache", SimpleCache(ttl_seconds=60))
+    requests = []
+    
+    def handler(request):
+        requests.append(request.url.path)
+        if "/cocacola/" not in request.url.path:
+            return httpx.Response(301, headers={"Location": "/stocks/charts/KO/cocacola/financial-statements"})
+        return httpx.Response(200, content=b"<table></table>")
+    
+    monkeypatch.setattr(base, "async_http_client", AsyncHttpClient(transport=httpx.MockTransport(handler)))
+    scraper = MacrotrendsScraper()
+    
+    asyncio.run(scraper._get_metric_page_async("KO", "financial-statements"))
+    
+    assert index.macrotrends_slug("KO") == "cocacola"
+    assert scraper._get_company_name("KO") == "cocacola"
+    assert requests == ["/stocks/charts/KO/ko/financial-statements", "/stocks/charts/KO/cocacola/financial-statements"]
@@ -0,0 +1,103 @@
+"""
+Tests for the Yahoo Finance data layer.
+
+yfinance is replaced by a fake module, so these run offline.
+"""
+
+import threading
+import time
+
+import pandas as pd
+
+from app.scrapers import yahoo as yahoo_module
+from app.scrapers.yahoo import YahooScraper
+from app.services.cache import FETCH_FAILED, SimpleCache
+from app.services.symbol_metadata import SymbolMetadataIndex
+
+FINANCIALS = pd.DataFrame(
+    {"2024-12-31": [1000.0, -50.0], "2023-12-31": [800.0, -40.0]},
+    index=["Operating Income", "Interest Expense"]
+)
+
+
+class FakeTicker:
+    """Counts the network round trips a yf.Ticker would make."""
+    
+    loads = []
+    
+    def __init__(self, ticker):
+        self.ticker = ticker
+    
+    @property
+    def info(self):
+        FakeTicker.loads.append((self.ticker, "info"))
+        time.sleep(0.05)
+        return {"trailingPE": 25.0, "exchange": "NYQ", "longName": f"{self.ticker} Inc."}
+    
+    @property
+    def financials(self):
+        FakeTicker.loads.append((self.ticker, "financials"))
+        time.sleep(0.05)
+        return FINANCIALS
+
+
+class FakeYFinance:
+    Ticker = FakeTicker
+
+
+def _fake_yahoo(monkeypatch):
+    FakeTicker.loads = []
+    monkeypatch.setattr(yahoo_module, "yf", FakeYFinance)
+    monkeypatch.setattr(yahoo_module, "yahoo_cache", SimpleCache(ttl_seconds=60))
+    monkeypatch.setattr(yahoo_module, "scraper_cache", SimpleCache(ttl_seconds=60))
+    monkeypatch.setattr(yahoo_module, "symbol_index", SymbolMetadataIndex(symbols={}))
+
+
+def test_getters_share_one_load_per_dataset(monkeypatch):
+    _fake_yahoo(monkeypatch)
+    scraper = YahooScraper()
+    results = {}
+    threads = [
+        threading.Thread(target=lambda: results.update(pe=scraper.get_pe_ratio("ko"))),
+        threading.Thread(target=lambda: results.update(coverage=scraper.get_interest_coverage("KO"))),
+        threading.Thread(target=lambda: results.update(info=scraper.get_info("KO"))),
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    
+    assert results["pe"] == 25.0
+    assert results["coverage"] == 20.0
+    assert sorted(FakeTicker.loads) == [("KO", "financials"), ("KO", "info")]
+
+
+def test_prefetch_loads_tickers_in_parallel(monkeypatch):
+    _fake_yahoo(monkeypatch)
+    scraper = YahooScraper()
+    
+    start = time.monotonic()
+    assert scraper.prefetch(["AAA", "BBB", "ccc", "AAA", "DDD", "EEE"], workers=5) == 5
+    assert time.monotonic() - start < 0.3  # 10 loads of 0.05 s, 5 tickers at a time
+    
+    # Getters read the prefetched data: no more round trips
+    loads = len(FakeTicker.loads)
+    assert scraper.get_pe_ratio("DDD") == 25.0
+    assert scraper.get_interest_coverage("EEE") == 20.0
+    assert len(FakeTicker.loads) == loads == 10
+
+
+def test_failed_load_is_not_cached_as_empty(monkeypatch):
+    _fake_yahoo(monkeypatch)
+    
+    class BrokenTicker(FakeTicker):
+        @property
+        def info(self):
+            raise ConnectionError("Yahoo unreachable")
+    
+    monkeypatch.setattr(FakeYFinance, "Ticker", BrokenTicker)
+    scraper = YahooScraper()
+    
+    assert scraper.get_info("ZZZ") is None
+    assert scraper.get_pe_ratio("ZZZ") is None
+    assert yahoo_module.scraper_cache.get_kind("yahoo_pe_ZZZ") == FETCH_FAILED
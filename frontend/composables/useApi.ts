@@ -39,6 +39,51 @@ export const useApi = () => {
     }
   }
 
+  /**
+   * Analyze a stock ticker, receiving results as they are scraped.
+   * Uses the Server-Sent Events endpoint, so fast sources (Finviz, Yahoo)
+   * arrive in under a second instead of after the slowest scraper.
+   * Returns a function that closes the stream.
+   */
+  const streamAnalysis = (ticker: string, handlers: AnalysisStreamHandlers): (() => void) => {
+    const url = `${apiBaseUrl}/api/analyze/${ticker.toUpperCase()}/stream`
+    console.log('Streaming from:', url)
+    
+    const source = new EventSource(url)
+    let finished = false
+    
+    const listen = <T>(event: string, handler: (data: T) => void) => {
+      source.addEventListener(event, (e: MessageEvent) => handler(JSON.parse(e.data) as T))
+    }
+    
+    listen<StreamStartEvent>('start', handlers.onStart)
+    listen<StreamSourceEvent>('source', handlers.onSource)
+    listen<RatioResult>('ratio', handlers.onRatio)
+    listen<AnalysisResponse>('done', (data) => {
+      finished = true
+      source.close()
+      handlers.onDone(data)
+    })
+    listen<{ detail: string }>('analysis_error', (data) => {
+      finished = true
+      source.close()
+      handlers.onError(data.detail)
+    })
+    
+    // Connection errors (EventSource would otherwise keep reconnecting)
+    source.onerror = () => {
+      if (finished) return
+      finished = true
+      source.close()
+      handlers.onError('Failed to fetch stock analysis. Make sure backend is running on http://localhost:8000')
+    }
+    
+    return () => {
+      finished = true
+      source.close()
+    }
+  }
+
   /**
    * Health check endpoint.
    * Tests if the backend is running.
@@ -57,6 +102,7 @@ export const useApi = () => {
 
   return {
     analyzeStock,
+    streamAnalysis,
     healthCheck,
   }
 }
@@ -6,41 +6,94 @@
  * - The analysis data we received from the API
  * - Loading states (is it fetching data?)
  * - Error states (did something go wrong?)
+ *
+ * Results are streamed: the table is shown as soon as the first source
+ * answers, and cells fill in while the slower scrapers are still running.
  */
 
 export const useStockAnalysis = () => {
-  const { analyzeStock } = useApi()
+  const { streamAnalysis } = useApi()
 
   // Reactive state - these values can change and the UI will update automatically
   const currentTicker = ref<string>('')
   const analysisData = ref<AnalysisResponse | null>(null)
   const isLoading = ref<boolean>(false)
   const error = ref<string | null>(null)
+  let closeStream: (() => void) | null = null
+
+  /**
+   * Find a metric row of the analysis being streamed.
+   */
+  const findRatio = (metric: string): RatioResult | undefined => {
+    return analysisData.value?.ratios.find(r => r.metric === metric)
+  }
 
   /**
    * Fetch analysis for a given ticker.
-   * This calls the backend API and stores the result.
+   * This streams results from the backend API into analysisData as they arrive.
+   * Resolves when the analysis is complete (or failed).
    */
-  const fetchAnalysis = async (ticker: string) => {
+  const fetchAnalysis = (ticker: string): Promise<void> => {
     if (!ticker || !ticker.trim()) {
       error.value = 'Please enter a valid ticker symbol'
-      return
+      return Promise.resolve()
     }
 
+    closeStream?.()
     isLoading.value = true
     error.value = null
+    analysisData.value = null
     currentTicker.value = ticker.toUpperCase().trim()
 
-    try {
-      const data = await analyzeStock(currentTicker.value)
-      analysisData.value = data
-      error.value = null
-    } catch (err: any) {
-      error.value = err.message || 'Failed to fetch analysis'
-      analysisData.value = null
-    } finally {
-      isLoading.value = false
-    }
+    return new Promise<void>((resolve) => {
+      const finish = () => {
+        closeStream = null
+        isLoading.value = false
+        resolve()
+      }
+
+      closeStream = streamAnalysis(currentTicker.value, {
+        // Empty table with every cell pending
+        onStart: (data) => {
+          analysisData.value = {
+            ticker: data.ticker,
+            ratios: data.ratios.map(r => ({
+              metric: r.metric,
+              values: r.sources.map(source => ({ source, value: null, pending: true })),
+              consensus: null,
+              spread: null,
+              target: r.target,
+              status: 'Pending',
+            })),
+            overall_score: 0,
+            max_score: 4,
+          }
+        },
+        onSource: (data) => {
+          const cell = findRatio(data.metric)?.values.find(v => v.source === data.source)
+          if (cell) {
+            cell.value = data.value
+            cell.stale = data.stale
+            cell.pending = false
+          }
+        },
+        onRatio: (data) => {
+          const ratio = findRatio(data.metric)
+          if (ratio) {
+            Object.assign(ratio, data)
+          }
+        },
+        onDone: (data) => {
+          analysisData.value = data
+          finish()
+        },
+        onError: (message) => {
+          error.value = message || 'Failed to fetch analysis'
+          analysisData.value = null
+          finish()
+        },
+      })
+    })
   }
 
   /**
@@ -48,6 +101,8 @@ export const useStockAnalysis = () => {
    * Resets everything to empty state.
    */
   const clearResults = () => {
+    closeStream?.()
+    closeStream = null
     currentTicker.value = ''
     analysisData.value = null
     error.value = null
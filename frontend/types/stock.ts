@@ -8,6 +8,8 @@
 export interface SourceValue {
   source: string
   value: number | null
+  stale?: boolean  // Expired cached value (being refreshed in the background)
+  pending?: boolean  // Frontend only: value not received yet (streamed analysis)
 }
 
 export interface RatioResult {
@@ -16,7 +18,7 @@ export interface RatioResult {
   consensus: number | null
   spread: number | null  // Spread (max - min) between sources to detect inconsistencies
   target: string
-  status: 'Pass' | 'Fail' | 'Info Only'
+  status: 'Pass' | 'Fail' | 'Info Only' | 'Pending'  // 'Pending' = still streaming (frontend only)
 }
 
 export interface AnalysisResponse {
@@ -27,3 +29,26 @@ export interface AnalysisResponse {
   execution_time?: number  // Time taken to fetch all data (in seconds)
 }
 
+/**
+ * Server-Sent Events sent by GET /api/analyze/{ticker}/stream, in order:
+ * one "start", then "source"/"ratio" events as scrapers finish, then "done".
+ */
+export interface StreamStartEvent {
+  ticker: string
+  ratios: { metric: string; target: string; sources: string[] }[]
+}
+
+export interface StreamSourceEvent {
+  metric: string
+  source: string
+  value: number | null
+  stale: boolean
+}
+
+export interface AnalysisStreamHandlers {
+  onStart: (data: StreamStartEvent) => void
+  onSource: (data: StreamSourceEvent) => void
+  onRatio: (data: RatioResult) => void
+  onDone: (data: AnalysisResponse) => void
+  onError: (message: string) => void
+}